@@ -11,7 +11,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import hashlib
+import time
 
 from oslo.config import cfg
 from oslo.serialization import jsonutils as json
@@ -39,17 +41,30 @@ opts = [
                 default=[],
                 help=_('Allowed keystone endpoints for auth_uri when '
                        'multi_cloud is enabled. At least one endpoint needs '
-                       'to be specified.'))
+                       'to be specified.')),
+    cfg.IntOpt('cache_ttl',
+               default=0,
+               help=_('Seconds for which the result of validating a signed '
+                      'request with keystone is reused for an identical '
+                      'request. Set to 0 to disable caching.'))
 ]
 cfg.CONF.register_opts(opts, group='ec2authtoken')
 
 
+# Maximum number of access keys for which the keystone endpoint that last
+# validated them is remembered, and of validated requests that are cached
+CACHE_SIZE = 1024
+
+
 class EC2Token(wsgi.Middleware):
     """Authenticate an EC2 request with keystone and convert to token."""
 
     def __init__(self, app, conf):
         self.conf = conf
         self.application = app
+        self._sessions = {}
+        self._access_auth_uris = collections.OrderedDict()
+        self._validated = collections.OrderedDict()
 
     def _conf_get(self, name):
         # try config from paste-deploy first
@@ -111,6 +126,32 @@ class EC2Token(wsgi.Middleware):
 
         return access
 
+    def _session(self, auth_uri):
+        """Return a session that keeps connections to auth_uri alive."""
+        session = self._sessions.get(auth_uri)
+        if session is None:
+            session = self._sessions[auth_uri] = requests.Session()
+        return session
+
+    @staticmethod
+    def _lru_set(cache, key, value):
+        cache.pop(key, None)
+        cache[key] = value
+        while len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def _ordered_auth_uris(self, access):
+        """
+        Return the allowed auth_uris, starting with the one that last
+        validated the given access key.
+        """
+        auth_uris = list(self._conf_get('allowed_auth_uris'))
+        last_uri = self._access_auth_uris.get(access)
+        if last_uri in auth_uris:
+            auth_uris.remove(last_uri)
+            auth_uris.insert(0, last_uri)
+        return auth_uris
+
     @webob.dec.wsgify(RequestClass=wsgi.Request)
     def __call__(self, req):
         if not self._conf_get('multi_cloud'):
@@ -121,16 +162,52 @@ class EC2Token(wsgi.Middleware):
             # This is safe for the following reasons:
             # 1. AWSAccessKeyId is a randomly generated sequence
             # 2. No secret is transferred to validate a request
+            access = self._get_access(req)
             last_failure = None
-            for auth_uri in self._conf_get('allowed_auth_uris'):
+            for auth_uri in self._ordered_auth_uris(access):
                 try:
                     LOG.debug("Attempt authorize on %s" % auth_uri)
-                    return self._authorize(req, auth_uri)
+                    result = self._authorize(req, auth_uri)
                 except exception.HeatAPIException as e:
                     LOG.debug("Authorize failed: %s" % e.__class__)
                     last_failure = e
+                else:
+                    if access:
+                        self._lru_set(self._access_auth_uris, access,
+                                      auth_uri)
+                    return result
             raise last_failure or exception.HeatAccessDeniedError()
 
+    def _validate(self, keystone_ec2_uri, creds):
+        """
+        Validate the signed credentials with keystone and return the result.
+
+        If the cache_ttl option is set, a successful result is reused for an
+        identical request until it expires. Since the credentials include
+        the signature and everything it covers, this never accepts a request
+        that keystone has not validated.
+        """
+        creds_json = json.dumps(creds)
+        cache_ttl = int(self._conf_get('cache_ttl'))
+        if cache_ttl:
+            key = hashlib.sha256(keystone_ec2_uri +
+                                 json.dumps(creds, sort_keys=True)).digest()
+            expiry, result = self._validated.get(key, (0, None))
+            if expiry > time.time():
+                LOG.debug("Using cached AWS authentication")
+                return result
+
+        headers = {'Content-Type': 'application/json'}
+        LOG.info(_LI('Authenticating with %s'), keystone_ec2_uri)
+        response = self._session(keystone_ec2_uri).post(keystone_ec2_uri,
+                                                        data=creds_json,
+                                                        headers=headers)
+        result = response.json()
+        if cache_ttl and 'access' in result:
+            self._lru_set(self._validated, key,
+                          (time.time() + cache_ttl, result))
+        return result
+
     def _authorize(self, req, auth_uri):
         # Read request signature and access id.
         # If we find X-Auth-User in the headers we ignore a key error
@@ -179,14 +256,8 @@ class EC2Token(wsgi.Middleware):
                                     'headers': req.headers,
                                     'body_hash': body_hash
                                     }}
-        creds_json = json.dumps(creds)
-        headers = {'Content-Type': 'application/json'}
-
         keystone_ec2_uri = self._conf_get_keystone_ec2_uri(auth_uri)
-        LOG.info(_LI('Authenticating with %s'), keystone_ec2_uri)
-        response = requests.post(keystone_ec2_uri, data=creds_json,
-                                 headers=headers)
-        result = response.json()
+        result = self._validate(keystone_ec2_uri, creds)
         try:
             token_id = result['access']['token']['id']
             tenant = result['access']['token']['tenant']['name']
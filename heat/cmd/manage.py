@@ -21,9 +21,11 @@ import sys
 
 from oslo.config import cfg
 
+from heat.common import context
 from heat.common.i18n import _
 from heat.db import api
 from heat.db import utils
+from heat.engine import watchrule
 from heat.openstack.common import log
 from heat import version
 
@@ -51,6 +53,14 @@ def purge_deleted():
     utils.purge_deleted(CONF.command.age, CONF.command.granularity)
 
 
+def prune_watch_data():
+    """
+    Roll up metric samples which are no longer evaluated into per-minute
+    aggregates, and delete expired aggregates
+    """
+    watchrule.prune_watch_data(context.get_admin_context())
+
+
 def add_command_parsers(subparsers):
     parser = subparsers.add_parser('db_version')
     parser.set_defaults(func=do_db_version)
@@ -69,6 +79,9 @@ def add_command_parsers(subparsers):
         choices=['days', 'hours', 'minutes', 'seconds'],
         help=_('Granularity to use for age argument, defaults to days.'))
 
+    parser = subparsers.add_parser('prune_watch_data')
+    parser.set_defaults(func=prune_watch_data)
+
 command_opt = cfg.SubCommandOpt('command',
                                 title='Commands',
                                 help='Show available commands.',
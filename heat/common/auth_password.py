@@ -14,19 +14,137 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import calendar
+import collections
+import hashlib
+import hmac
 import logging
+import os
+import time
 
 from keystoneclient import exceptions as keystone_exceptions
 from keystoneclient import session
 from oslo.config import cfg
+from oslo.serialization import jsonutils
+from oslo.utils import importutils
+from oslo.utils import timeutils
 from webob import exc
 
 from heat.common import context
+from heat.common.i18n import _LW
+from heat.openstack.common.crypto import utils as crypto_utils
+
+memcache = importutils.try_import('memcache')
 
 
 LOG = logging.getLogger(__name__)
 
 
+class _TokenCache(object):
+    """
+    Cache of the token info obtained for a set of credentials.
+
+    Entries are kept in process, up to a maximum number, or in memcached if
+    servers and a secret key are given. Each entry expires after the
+    configured time, or when its token does, whichever is sooner. Entries
+    kept in memcached are encrypted and signed with keys derived from the
+    secret key, which all of the processes sharing them must use.
+    """
+
+    KEY_PREFIX = 'heat-auth-password/'
+
+    def __init__(self, cache_time, max_entries, memcached_servers=None,
+                 secret_key=None):
+        self.cache_time = cache_time
+        self.max_entries = max_entries
+        self._secret_key = secret_key or os.urandom(16)
+        self._tokens = collections.OrderedDict()
+        self._memcache = None
+        if memcached_servers:
+            if memcache is None:
+                LOG.warn(_LW('python-memcached is not installed, caching '
+                             'tokens in process instead'))
+            elif not secret_key:
+                LOG.warn(_LW('memcache_secret_key is not set, caching '
+                             'tokens in process instead'))
+            else:
+                self._memcache = memcache.Client(memcached_servers)
+                hkdf = crypto_utils.HKDF()
+                prk = hkdf.extract(secret_key)
+                self._crypto = crypto_utils.SymmetricCrypto()
+                self._encryption_key = hkdf.expand(prk, b'encryption', 16)
+                self._signing_key = hkdf.expand(prk, b'signing', 32)
+
+    def key(self, username, password, tenant, auth_url):
+        """Return a salted hash of the credentials to use as the key."""
+        creds = '\0'.join(c or '' for c in (username, password,
+                                            tenant, auth_url))
+        return self.KEY_PREFIX + hmac.new(self._secret_key, creds,
+                                          hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def _token_expiry(token_info):
+        expires = (token_info.get('expires_at') or
+                   token_info.get('token', {}).get('expires'))
+        if not expires:
+            return None
+        expires = timeutils.normalize_time(timeutils.parse_isotime(expires))
+        return calendar.timegm(expires.timetuple())
+
+    def _seal(self, entry):
+        """Encrypt and sign an entry to be stored in memcached."""
+        data = self._crypto.encrypt(self._encryption_key,
+                                    jsonutils.dumps(entry))
+        return data, self._crypto.sign(self._signing_key, data)
+
+    def _unseal(self, sealed):
+        """Return the entry stored in memcached, if it has not been altered."""
+        try:
+            data, signature = sealed
+        except (TypeError, ValueError):
+            return None
+        if not hmac.compare_digest(
+                signature, self._crypto.sign(self._signing_key, data)):
+            LOG.warn(_LW('Ignoring cached token with an invalid signature'))
+            return None
+        return jsonutils.loads(self._crypto.decrypt(self._encryption_key,
+                                                    data))
+
+    def get(self, key):
+        if self._memcache is not None:
+            entry = self._unseal(self._memcache.get(key))
+        else:
+            entry = self._tokens.pop(key, None)
+        if entry is None:
+            return None
+        expiry, token_info = entry
+        if expiry <= time.time():
+            return None
+        if self._memcache is None:
+            # move the entry to the end, so the least recently used is evicted
+            self._tokens[key] = entry
+        return token_info
+
+    def set(self, key, token_info):
+        now = time.time()
+        expiry = now + self.cache_time
+        token_expiry = self._token_expiry(token_info)
+        if token_expiry is not None:
+            expiry = min(expiry, token_expiry)
+        if expiry <= now:
+            return
+
+        entry = (expiry, dict(token_info))
+        if self._memcache is not None:
+            self._memcache.set(key, self._seal(entry),
+                               time=int(expiry - now) or 1)
+            return
+        self._tokens.pop(key, None)
+        self._tokens[key] = entry
+        while len(self._tokens) > self.max_entries:
+            self._tokens.popitem(last=False)
+
+
 class KeystonePasswordAuthProtocol(object):
     """
     Alternative authentication middleware that uses username and password
@@ -40,6 +158,17 @@ class KeystonePasswordAuthProtocol(object):
         self.conf = conf
         self.session = session.Session.construct(self._ssl_options())
 
+        cache_time = int(conf.get('token_cache_time', 0))
+        max_entries = int(conf.get('max_cached_tokens', 1000))
+        if cache_time > 0 and max_entries > 0:
+            servers = conf.get('memcached_servers')
+            self.token_cache = _TokenCache(
+                cache_time, max_entries,
+                memcached_servers=servers and servers.split(','),
+                secret_key=conf.get('memcache_secret_key'))
+        else:
+            self.token_cache = None
+
     def __call__(self, env, start_response):
         """Authenticate incoming request."""
         username = env.get('HTTP_X_AUTH_USER')
@@ -50,16 +179,28 @@ class KeystonePasswordAuthProtocol(object):
 
         if not tenant:
             return self._reject_request(env, start_response, auth_url)
-        try:
-            ctx = context.RequestContext(username=username, password=password,
-                                         tenant_id=tenant, auth_url=auth_url,
-                                         is_admin=False)
-            auth_ref = ctx.auth_plugin.get_access(self.session)
-        except (keystone_exceptions.Unauthorized,
-                keystone_exceptions.Forbidden,
-                keystone_exceptions.NotFound,
-                keystone_exceptions.AuthorizationFailure):
-            return self._reject_request(env, start_response, auth_url)
+
+        auth_ref = None
+        if self.token_cache is not None:
+            cache_key = self.token_cache.key(username, password,
+                                             tenant, auth_url)
+            auth_ref = self.token_cache.get(cache_key)
+
+        if auth_ref is None:
+            try:
+                ctx = context.RequestContext(username=username,
+                                             password=password,
+                                             tenant_id=tenant,
+                                             auth_url=auth_url,
+                                             is_admin=False)
+                auth_ref = ctx.auth_plugin.get_access(self.session)
+            except (keystone_exceptions.Unauthorized,
+                    keystone_exceptions.Forbidden,
+                    keystone_exceptions.NotFound,
+                    keystone_exceptions.AuthorizationFailure):
+                return self._reject_request(env, start_response, auth_url)
+            if self.token_cache is not None:
+                self.token_cache.set(cache_key, auth_ref)
         env.update(self._build_user_headers(auth_ref))
 
         return self.app(env, start_response)
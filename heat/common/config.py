@@ -76,6 +76,16 @@ service_opts = [
     cfg.IntOpt('max_template_size',
                default=524288,
                help=_('Maximum raw byte size of any template.')),
+    cfg.StrOpt('template_cache_dir',
+               help=_('Directory in which to cache templates fetched over '
+                      'HTTP(S), such as provider templates. If not set, '
+                      'templates are not cached.')),
+    cfg.IntOpt('template_cache_ttl',
+               default=300,
+               help=_('Seconds for which a cached template is used without '
+                      'checking with the server. After that, the template '
+                      'is revalidated using its ETag or Last-Modified '
+                      'header.')),
     cfg.IntOpt('max_nested_stack_depth',
                default=3,
                help=_('Maximum depth allowed when using nested stacks.')),
@@ -97,6 +107,14 @@ engine_opts = [
     cfg.StrOpt('environment_dir',
                default='/etc/heat/environment.d',
                help=_('The directory to search for environment files.')),
+    cfg.StrOpt('plugin_snapshot_file',
+               default='',
+               help=_('File in which to record which module implements each '
+                      'resource type. When set, resource plugin modules are '
+                      'only imported when their resource type is first '
+                      'used. The file is rewritten whenever the plugin '
+                      'sources change. Leave empty to import all plugin '
+                      'modules at start-up.')),
     cfg.StrOpt('deferred_auth_method',
                choices=['password', 'trusts'],
                default='password',
@@ -107,6 +125,12 @@ engine_opts = [
                 help=_('Subset of trustor roles to be delegated to heat.'
                        ' If left unset, all roles of a user will be'
                        ' delegated to heat when creating a stack.')),
+    cfg.IntOpt('trust_token_cache_size',
+               default=1000,
+               help=_('Maximum number of trusts for which heat keeps a '
+                      'trust-scoped token, so that stored contexts share a '
+                      'token until it is about to expire instead of each '
+                      'requesting a new one. Set to 0 to disable.')),
     cfg.IntOpt('max_resources_per_stack',
                default=1000,
                help=_('Maximum resources allowed per top-level stack.')),
@@ -119,6 +143,26 @@ engine_opts = [
                help=_('Number of times to retry to bring a '
                       'resource to a non-error state. Set to 0 to disable '
                       'retries.')),
+    cfg.IntOpt('max_concurrent_creates',
+               default=0,
+               help=_('Maximum number of requests to create resources '
+                      'that an engine may be making at once. Waiting for '
+                      'a create to complete does not count towards the '
+                      'limit. Set to 0 for no limit.')),
+    cfg.IntOpt('max_concurrent_creates_per_stack',
+               default=0,
+               help=_('Maximum number of requests to create resources in '
+                      'any one stack that may be made at once. Set to 0 '
+                      'for no limit.')),
+    cfg.ListOpt('max_concurrent_creates_by_type',
+                default=[],
+                help=_('Maximum number of requests to create resources of '
+                       'each type that an engine may be making at once, as '
+                       'a list of type=limit pairs, e.g. '
+                       '"OS::Nova::Server=50". When a client reports that '
+                       'the cloud is over its rate limit, the limit for the '
+                       'type is halved, and then raised again by one with '
+                       'each successful request.')),
     cfg.IntOpt('event_purge_batch_size',
                default=10,
                help=_("Controls how many events will be pruned whenever a "
@@ -138,6 +182,61 @@ engine_opts = [
                default=240,
                help=_('Error wait time in seconds for stack action (ie. create'
                       ' or update).')),
+    cfg.IntOpt('max_concurrent_validations',
+               default=0,
+               help=_('Maximum number of resources, including nested '
+                      'stacks, validated concurrently within a stack, and '
+                      'of custom constraint checks run concurrently while '
+                      'validating a stack. Identical constraint checks are '
+                      'only performed once per validation. Set to 0 to '
+                      'validate resources one at a time.')),
+    cfg.IntOpt('max_concurrent_outputs',
+               default=0,
+               help=_('Maximum number of outputs of a stack resolved '
+                      'concurrently when showing the stack. Each resource '
+                      'attribute is only resolved once while resolving the '
+                      'outputs. Set to 0 to resolve outputs one at a '
+                      'time.')),
+    cfg.IntOpt('max_concurrent_stack_users',
+               default=0,
+               help=_('Maximum number of Keystone users, with their ec2 '
+                      'keypairs, created or deleted concurrently for the '
+                      'signal responders (e.g. wait condition handles and '
+                      'scaling policies) of a stack, ahead of creating or '
+                      'deleting the resources themselves. Set to 0 to have '
+                      'each resource manage its own user when it is created '
+                      'or deleted.')),
+    cfg.IntOpt('server_cache_ttl',
+               default=10,
+               help=_('Seconds for which a server fetched from Nova to '
+                      'resolve the attributes of a server resource is '
+                      'reused, until the resource performs an action. Set '
+                      'to 0 to fetch the server for every attribute.')),
+    cfg.IntOpt('decrypted_data_cache_ttl',
+               default=60,
+               help=_('Seconds for which the decrypted value of a redacted '
+                      'resource data item is kept in memory, so that '
+                      'loading the same data again does not decrypt it '
+                      'again. Set to 0 to disable the cache.')),
+    cfg.IntOpt('metadata_push_delay',
+               default=2,
+               help=_('Seconds to wait before pushing the software '
+                      'deployment metadata of a server, so that changes to '
+                      'several deployments of the server are pushed '
+                      'together.')),
+    cfg.IntOpt('metadata_push_retries',
+               default=3,
+               help=_('Number of times a failed push of software '
+                      'deployment metadata is retried, with an increasing '
+                      'delay between attempts.')),
+    cfg.IntOpt('signal_poll_interval',
+               default=30,
+               help=_('Seconds between polls by a software deployment '
+                      'waiting for its outputs signal, or by a wait '
+                      'condition waiting for signals to its handle. The '
+                      'resource is also woken as soon as a signal is '
+                      'received, so polling is only a fallback. Set to 0 '
+                      'to poll at every check.')),
     cfg.IntOpt('engine_life_check_timeout',
                default=2,
                help=_('RPC timeout for the engine liveness check that is used'
@@ -145,6 +244,22 @@ engine_opts = [
     cfg.BoolOpt('enable_cloud_watch_lite',
                 default=True,
                 help=_('Enable the legacy OS::Heat::CWLiteAlarm resource.')),
+    cfg.IntOpt('watch_data_prune_interval',
+               default=600,
+               help=_('Seconds between runs of the periodic task rolling up '
+                      'and pruning CloudWatch metric data. Set to 0 to '
+                      'disable the task, e.g. when "heat-manage '
+                      'prune_watch_data" is run instead.')),
+    cfg.IntOpt('watch_data_rollup_margin',
+               default=300,
+               help=_('Seconds for which metric samples are kept beyond the '
+                      'evaluation window (EvaluationPeriods x Period) of '
+                      'their watch rule before being rolled up into '
+                      'per-minute aggregates.')),
+    cfg.IntOpt('watch_data_max_age',
+               default=7,
+               help=_('Days for which metric data aggregates are kept. Set '
+                      'to 0 to keep them forever.')),
     cfg.BoolOpt('enable_stack_abandon',
                 default=False,
                 help=_('Enable the preview Stack Abandon feature.')),
@@ -160,7 +275,19 @@ rpc_opts = [
                help=_('Name of the engine node. '
                       'This can be an opaque identifier. '
                       'It is not necessarily a hostname, FQDN, '
-                      'or IP address.'))]
+                      'or IP address.')),
+    cfg.BoolOpt('rpc_loopback',
+                default=True,
+                help=_('Dispatch engine RPC calls made from within an engine '
+                       'process, e.g. by software deployment resources, '
+                       'directly to that engine instead of through the '
+                       'message bus.')),
+    cfg.BoolOpt('rpc_loopback_serialize',
+                default=False,
+                help=_('Serialize the context, arguments and results of '
+                       'loopback RPC calls as they would be on the message '
+                       'bus. This is intended for checking that callers '
+                       'do not depend on local dispatch.'))]
 
 profiler_group = cfg.OptGroup('profiler')
 profiler_opts = [
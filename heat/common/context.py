@@ -11,6 +11,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+
 from keystoneclient import access
 from keystoneclient.auth.identity import base
 from keystoneclient.auth.identity import v3
@@ -31,6 +33,12 @@ from heat.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
 
+cfg.CONF.import_opt('trust_token_cache_size', 'heat.common.config')
+
+# Fetch a new trust-scoped token when the cached one has less than this
+# many seconds left, so that it does not expire part way through an action
+TRUST_TOKEN_REFRESH_SECONDS = 60
+
 
 # FIXME(jamielennox): I copied this out of a review that is proposed against
 # keystoneclient which can be used when available.
@@ -67,6 +75,44 @@ class _AccessInfoPlugin(base.BaseIdentityPlugin):
         return False
 
 
+class TrustAuthCache(object):
+    """A bounded, least-recently-used cache of trust-scoped auth plugins.
+
+    Contexts loaded from stored credentials are created afresh for every
+    watch rule check, signal and scaling action. Sharing an auth plugin per
+    trust between them means they also share its token, which the plugin
+    only renews when it is about to expire.
+    """
+
+    def __init__(self):
+        self._plugins = collections.OrderedDict()
+
+    def get(self, trust_id, create):
+        """Return the plugin for trust_id, creating it if necessary."""
+        max_size = cfg.CONF.trust_token_cache_size
+        if max_size <= 0:
+            return create()
+
+        plugin = self._plugins.pop(trust_id, None)
+        if plugin is None:
+            plugin = create()
+            plugin.MIN_TOKEN_LIFE_SECONDS = TRUST_TOKEN_REFRESH_SECONDS
+        self._plugins[trust_id] = plugin
+
+        while len(self._plugins) > max_size:
+            self._plugins.popitem(last=False)
+        return plugin
+
+    def discard(self, trust_id):
+        self._plugins.pop(trust_id, None)
+
+    def clear(self):
+        self._plugins.clear()
+
+
+trust_auth_cache = TrustAuthCache()
+
+
 class RequestContext(context.RequestContext):
     """
     Stores information about the security context under which the user
@@ -109,8 +155,14 @@ class RequestContext(context.RequestContext):
         self._clients = None
         self.trust_id = trust_id
         self.trustor_user_id = trustor_user_id
-        self.policy = policy.Enforcer()
+        self.policy = policy.get_enforcer()
         self._auth_plugin = auth_plugin
+        # Shared results of custom constraint checks while validating a
+        # stack; see heat.engine.constraints.ConstraintCache
+        self.constraint_cache = None
+        # Shared attribute values while resolving stack outputs; see
+        # heat.engine.attributes.AttributeMemo
+        self.attribute_memo = None
 
         if is_admin is None:
             self.is_admin = self.policy.check_is_admin(self)
@@ -171,11 +223,14 @@ class RequestContext(context.RequestContext):
             username = cfg.CONF.keystone_authtoken.admin_user
             password = cfg.CONF.keystone_authtoken.admin_password
 
-            return v3.Password(username=username,
-                               password=password,
-                               user_domain_id='default',
-                               auth_url=self._keystone_v3_endpoint,
-                               trust_id=self.trust_id)
+            def create_trust_plugin():
+                return v3.Password(username=username,
+                                   password=password,
+                                   user_domain_id='default',
+                                   auth_url=self._keystone_v3_endpoint,
+                                   trust_id=self.trust_id)
+
+            return trust_auth_cache.get(self.trust_id, create_trust_plugin)
 
         if self.auth_token_info:
             auth_ref = access.AccessInfo.factory(body=self.auth_token_info,
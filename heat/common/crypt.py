@@ -27,22 +27,23 @@ auth_opts = [
 
 cfg.CONF.register_opts(auth_opts)
 
+# SymmetricCrypto keeps no state between calls, so one instance is shared.
+_crypto = utils.SymmetricCrypto()
+
 
 def encrypt(auth_info):
     if auth_info is None:
         return None, None
-    sym = utils.SymmetricCrypto()
-    res = sym.encrypt(cfg.CONF.auth_encryption_key[:32],
-                      auth_info, b64encode=True)
+    res = _crypto.encrypt(cfg.CONF.auth_encryption_key[:32],
+                          auth_info, b64encode=True)
     return 'oslo_decrypt_v1', res
 
 
 def oslo_decrypt_v1(auth_info):
     if auth_info is None:
         return None
-    sym = utils.SymmetricCrypto()
-    return sym.decrypt(cfg.CONF.auth_encryption_key[:32],
-                       auth_info, b64decode=True)
+    return _crypto.decrypt(cfg.CONF.auth_encryption_key[:32],
+                           auth_info, b64decode=True)
 
 
 def heat_decrypt(auth_info):
@@ -72,6 +72,7 @@ class KeystoneClientV3(object):
         self._client = None
         self._admin_client = None
         self._domain_admin_client = None
+        self._stack_user_role_id = None
 
         self.session = session.Session.construct(self._ssl_options())
 
@@ -272,6 +273,7 @@ class KeystoneClientV3(object):
             self.client.trusts.delete(trust_id)
         except kc_exception.NotFound:
             pass
+        context.trust_auth_cache.discard(trust_id)
 
     def _get_username(self, username):
         if(len(username) > 64):
@@ -380,10 +382,8 @@ class KeystoneClientV3(object):
         # This role is designed to allow easier differentiation of the
         # heat-generated "stack users" which will generally have credentials
         # deployed on an instance (hence are implicitly untrusted)
-        stack_user_role = self.domain_admin_client.roles.list(
-            name=cfg.CONF.heat_stack_user_role)
-        if len(stack_user_role) == 1:
-            role_id = stack_user_role[0].id
+        role_id = self._get_stack_user_role_id()
+        if role_id is not None:
             # Create user
             user = self.domain_admin_client.users.create(
                 name=self._get_username(username), password=password,
@@ -403,6 +403,18 @@ class KeystoneClientV3(object):
 
         return user.id
 
+    def _get_stack_user_role_id(self):
+        """Return the ID of the stack user role, or None if not found.
+
+        The role is looked up only once, however many users are created.
+        """
+        if self._stack_user_role_id is None:
+            stack_user_role = self.domain_admin_client.roles.list(
+                name=cfg.CONF.heat_stack_user_role)
+            if len(stack_user_role) == 1:
+                self._stack_user_role_id = stack_user_role[0].id
+        return self._stack_user_role_id
+
     @property
     def stack_domain_id(self):
         if not self._stack_domain_id:
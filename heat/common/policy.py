@@ -29,6 +29,12 @@ DEFAULT_RULES = {
     'default': policy.FalseCheck(),
 }
 
+# Bound on the number of (roles, tenant) combinations for which the result
+# of check_is_admin() is remembered
+ADMIN_CHECK_CACHE_SIZE = 1024
+
+_ENFORCER = None
+
 
 class Enforcer(object):
     """Responsible for loading and enforcing rules."""
@@ -40,6 +46,8 @@ class Enforcer(object):
         self.default_rule = default_rule
         self.enforcer = policy.Enforcer(
             default_rule=default_rule, policy_file=policy_file)
+        self._admin_rules = None
+        self._admin_checks = {}
 
     def set_rules(self, rules, overwrite=True):
         """Create a new Rules object based on the provided dict of rules."""
@@ -80,7 +88,42 @@ class Enforcer(object):
     def check_is_admin(self, context):
         """Whether or not roles contains 'admin' role according to policy.json
 
+           The result is remembered for each combination of roles and tenant
+           until the policy rules are reloaded.
+
            :param context: Heat request context
            :returns: A non-False value if the user is admin according to policy
         """
-        return self._check(context, 'context_is_admin', target={}, exc=None)
+        key = (tuple(sorted(context.roles)), context.tenant_id)
+        if key in self._admin_checks:
+            # Reloads the rules only if the policy file has been modified
+            self.enforcer.load_rules()
+            if self.enforcer.rules is self._admin_rules:
+                return self._admin_checks[key]
+
+        is_admin = self._check(context, 'context_is_admin', target={},
+                               exc=None)
+        if (self.enforcer.rules is not self._admin_rules or
+                len(self._admin_checks) >= ADMIN_CHECK_CACHE_SIZE):
+            self._admin_rules = self.enforcer.rules
+            self._admin_checks = {}
+        self._admin_checks[key] = is_admin
+        return is_admin
+
+
+def get_enforcer():
+    """Return the Enforcer shared by all request contexts in this process.
+
+    Sharing it means the policy file is parsed only when it changes on disk,
+    rather than once for every context.
+    """
+    global _ENFORCER
+    if _ENFORCER is None:
+        _ENFORCER = Enforcer()
+    return _ENFORCER
+
+
+def reset():
+    """Discard the shared Enforcer, e.g. after changing the policy options."""
+    global _ENFORCER
+    _ENFORCER = None
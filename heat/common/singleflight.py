@@ -0,0 +1,49 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Share the results of calls between greenthreads.
+
+A call is made at most once for each key. Greenthreads asking for a key whose
+call is still in progress wait for its result instead of making the call
+again.
+"""
+
+import eventlet
+
+
+class SingleFlight(object):
+    '''The results of calls, by key.'''
+
+    def __init__(self):
+        self._results = {}
+
+    def do(self, key, call):
+        '''Return the result of call(), unless already known for key.
+
+        If call() raises an exception, any greenthread waiting for its result
+        gets the exception too, but the failure is not remembered; the next
+        caller for the key makes the call again.
+        '''
+        result = self._results.get(key)
+        if result is None:
+            result = eventlet.event.Event()
+            self._results[key] = result
+            try:
+                outcome = call()
+            except Exception as exc:
+                del self._results[key]
+                result.send_exception(exc)
+                raise
+            result.send(outcome)
+
+        return result.wait()
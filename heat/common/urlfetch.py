@@ -13,7 +13,13 @@
 
 """Utility for fetching a resource (e.g. a template) from a URL."""
 
+import hashlib
+import os
+import time
+
 from oslo.config import cfg
+from oslo.serialization import jsonutils
+from oslo.utils import encodeutils
 import requests
 from requests import exceptions
 from six.moves import urllib
@@ -21,9 +27,13 @@ from six.moves import urllib
 from heat.common import exception
 from heat.common.i18n import _
 from heat.common.i18n import _LI
+from heat.common.i18n import _LW
+from heat.openstack.common import fileutils
 from heat.openstack.common import log as logging
 
 cfg.CONF.import_opt('max_template_size', 'heat.common.config')
+cfg.CONF.import_opt('template_cache_dir', 'heat.common.config')
+cfg.CONF.import_opt('template_cache_ttl', 'heat.common.config')
 
 LOG = logging.getLogger(__name__)
 
@@ -32,6 +42,118 @@ class URLFetchError(exception.Error, IOError):
     pass
 
 
+class CacheEntry(object):
+    """A cached response for a URL."""
+
+    def __init__(self, data, etag=None, last_modified=None, fetched_at=0):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def fresh(self, ttl):
+        """Return True if the entry can be used without revalidation."""
+        return time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self):
+        """Return the headers for a conditional GET of the URL."""
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class URLCache(object):
+    """
+    An on-disk cache of data fetched over HTTP(S).
+
+    Each URL is stored as two files named after a hash of the URL: the data
+    itself, and its metadata (validators and the time it was fetched). Both
+    are written atomically, so the cache may be shared between processes.
+    """
+
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, url):
+        key = hashlib.sha256(encodeutils.safe_encode(url)).hexdigest()
+        return os.path.join(self.directory, key)
+
+    def _write(self, path, content):
+        tmp_path = fileutils.write_to_tempfile(content, path=self.directory,
+                                               prefix='.tmp')
+        with fileutils.remove_path_on_error(tmp_path):
+            os.rename(tmp_path, path)
+
+    def get(self, url):
+        """Return the CacheEntry for a URL, or None if it is not cached."""
+        path = self._path(url)
+        try:
+            with open(path + '.json') as meta_file:
+                meta = jsonutils.loads(meta_file.read())
+            with open(path + '.data', 'rb') as data_file:
+                data = data_file.read()
+        except (IOError, ValueError):
+            return None
+
+        if (meta.get('url') != url or
+                meta.get('sha256') != hashlib.sha256(data).hexdigest()):
+            # The data was replaced while we were reading it
+            return None
+
+        return CacheEntry(data, meta.get('etag'), meta.get('last_modified'),
+                          meta.get('fetched_at', 0))
+
+    def put(self, url, entry, data_changed=True):
+        """Store a CacheEntry for a URL."""
+        path = self._path(url)
+        meta = {
+            'url': url,
+            'etag': entry.etag,
+            'last_modified': entry.last_modified,
+            'fetched_at': entry.fetched_at,
+            'sha256': hashlib.sha256(entry.data).hexdigest(),
+        }
+        try:
+            fileutils.ensure_tree(self.directory)
+            if data_changed:
+                self._write(path + '.data', entry.data)
+            self._write(path + '.json', jsonutils.dumps(meta))
+        except (IOError, OSError) as ex:
+            LOG.warn(_LW('Failed to cache data from %(url)s: %(ex)s'),
+                     {'url': url, 'ex': ex})
+
+
+def _get_cache():
+    if not cfg.CONF.template_cache_dir:
+        return None
+    return URLCache(cfg.CONF.template_cache_dir,
+                    cfg.CONF.template_cache_ttl)
+
+
+def _read_response(resp):
+    # We cannot use resp.text here because it would download the
+    # entire file, and a large enough file would bring down the
+    # engine.  The 'Content-Length' header could be faked, so it's
+    # necessary to download the content in chunks to until
+    # max_template_size is reached.  The chunks are collected in a list
+    # and joined once at the end, rather than concatenated as they
+    # arrive, so the cost stays linear in the size of the template.
+    reader = resp.iter_content(chunk_size=1000)
+    chunks = []
+    size = 0
+    for chunk in reader:
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > cfg.CONF.max_template_size:
+            raise URLFetchError("Template exceeds maximum allowed size (%s"
+                                " bytes)" % cfg.CONF.max_template_size)
+    return "".join(chunks)
+
+
 def get(url, allowed_schemes=('http', 'https')):
     """Get the data at the specified URL.
 
@@ -39,6 +161,10 @@ def get(url, allowed_schemes=('http', 'https')):
     The file: scheme is also supported if you override
     the allowed_schemes argument.
     Raise an IOError if getting the data fails.
+
+    If the template_cache_dir option is set, data fetched over HTTP(S) is
+    cached on disk and reused for template_cache_ttl seconds, after which
+    it is revalidated with a conditional GET.
     """
     LOG.info(_LI('Fetching data from %s'), url)
 
@@ -53,26 +179,33 @@ def get(url, allowed_schemes=('http', 'https')):
         except urllib.error.URLError as uex:
             raise URLFetchError(_('Failed to retrieve template: %s') % uex)
 
+    cache = _get_cache()
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None and cached.fresh(cache.ttl):
+        LOG.debug('Using cached data for %s' % url)
+        return cached.data
+
     try:
-        resp = requests.get(url, stream=True)
+        if cached is not None:
+            resp = requests.get(url, stream=True,
+                                headers=cached.conditional_headers())
+            if resp.status_code == requests.codes.not_modified:
+                LOG.debug('Cached data for %s is still valid' % url)
+                cached.fetched_at = time.time()
+                cache.put(url, cached, data_changed=False)
+                return cached.data
+        else:
+            resp = requests.get(url, stream=True)
         resp.raise_for_status()
 
-        # We cannot use resp.text here because it would download the
-        # entire file, and a large enough file would bring down the
-        # engine.  The 'Content-Length' header could be faked, so it's
-        # necessary to download the content in chunks to until
-        # max_template_size is reached.  The chunk_size we use needs
-        # to balance CPU-intensive string concatenation with accuracy
-        # (eg. it's possible to fetch 1000 bytes greater than
-        # max_template_size with a chunk_size of 1000).
-        reader = resp.iter_content(chunk_size=1000)
-        result = ""
-        for chunk in reader:
-            result += chunk
-            if len(result) > cfg.CONF.max_template_size:
-                raise URLFetchError("Template exceeds maximum allowed size (%s"
-                                    " bytes)" % cfg.CONF.max_template_size)
-        return result
+        result = _read_response(resp)
 
     except exceptions.RequestException as ex:
         raise URLFetchError(_('Failed to retrieve template: %s') % ex)
+
+    if cache is not None:
+        cache.put(url, CacheEntry(result,
+                                  resp.headers.get('ETag'),
+                                  resp.headers.get('Last-Modified'),
+                                  time.time()))
+    return result
@@ -88,6 +88,15 @@ def resource_create(context, values):
     return IMPL.resource_create(context, values)
 
 
+def resource_create_all(context, values_list):
+    return IMPL.resource_create_all(context, values_list)
+
+
+def resource_update(context, resource_id, values, expected_state=None):
+    return IMPL.resource_update(context, resource_id, values,
+                                expected_state=expected_state)
+
+
 def resource_exchange_stacks(context, resource_id1, resource_id2):
     return IMPL.resource_exchange_stacks(context, resource_id1, resource_id2)
 
@@ -150,10 +159,21 @@ def stack_update(context, stack_id, values):
     return IMPL.stack_update(context, stack_id, values)
 
 
+def stack_update_state(context, stack_id, action, status, status_reason,
+                       expected_state=None):
+    return IMPL.stack_update_state(context, stack_id, action, status,
+                                   status_reason,
+                                   expected_state=expected_state)
+
+
 def stack_delete(context, stack_id):
     return IMPL.stack_delete(context, stack_id)
 
 
+def stack_lock_get_engine_id(stack_id):
+    return IMPL.stack_lock_get_engine_id(stack_id)
+
+
 def stack_lock_create(stack_id, engine_id):
     return IMPL.stack_lock_create(stack_id, engine_id)
 
@@ -230,6 +250,10 @@ def watch_rule_get_all_by_stack(context, stack_id):
     return IMPL.watch_rule_get_all_by_stack(context, stack_id)
 
 
+def watch_rule_summary(context):
+    return IMPL.watch_rule_summary(context)
+
+
 def watch_rule_create(context, values):
     return IMPL.watch_rule_create(context, values)
 
@@ -246,10 +270,31 @@ def watch_data_create(context, values):
     return IMPL.watch_data_create(context, values)
 
 
+def watch_data_create_all(context, values_list):
+    return IMPL.watch_data_create_all(context, values_list)
+
+
 def watch_data_get_all(context):
     return IMPL.watch_data_get_all(context)
 
 
+def watch_data_get_raw_before(context, watch_rule_id, before, limit):
+    return IMPL.watch_data_get_raw_before(context, watch_rule_id, before,
+                                          limit)
+
+
+def watch_data_get_rollups(context, watch_rule_id, times):
+    return IMPL.watch_data_get_rollups(context, watch_rule_id, times)
+
+
+def watch_data_rollup(context, watch_data_ids, values_list):
+    return IMPL.watch_data_rollup(context, watch_data_ids, values_list)
+
+
+def watch_data_delete_before(context, before, limit):
+    return IMPL.watch_data_delete_before(context, before, limit)
+
+
 def software_config_create(context, values):
     return IMPL.software_config_create(context, values)
 
@@ -12,12 +12,14 @@
 #    under the License.
 
 '''Implementation of SQLAlchemy backend.'''
+import collections
 import datetime
 import sys
 
 from oslo.config import cfg
 from oslo.db.sqlalchemy import session as db_session
 from oslo.db.sqlalchemy import utils
+from oslo.utils import timeutils
 import osprofiler.sqlalchemy
 import six
 import sqlalchemy
@@ -34,6 +36,7 @@ from heat.rpc import api as rpc_api
 
 CONF = cfg.CONF
 CONF.import_opt('max_events_per_stack', 'heat.common.config')
+CONF.import_opt('decrypted_data_cache_ttl', 'heat.common.config')
 CONF.import_group('profiler', 'heat.common.config')
 
 _facade = None
@@ -169,7 +172,7 @@ def resource_data_get_all(resource, data=None):
 
     for res in data:
         if res.redact:
-            ret[res.key] = _decrypt(res.value, res.decrypt_method)
+            ret[res.key] = _decrypt_resource_data(res)
         else:
             ret[res.key] = res.value
     return ret
@@ -183,7 +186,7 @@ def resource_data_get(resource, key):
                                       resource.id,
                                       key)
     if result.redact:
-        return _decrypt(result.value, result.decrypt_method)
+        return _decrypt_resource_data(result)
     return result.value
 
 
@@ -203,6 +206,36 @@ def _decrypt(enc_value, method):
         return unicode(value, 'utf-8')
 
 
+DECRYPTED_CACHE_SIZE = 1000
+
+# Decrypted resource data, oldest first, keyed by the row id and its
+# encrypted value, so a changed row is never served from the cache.
+_decrypted_cache = collections.OrderedDict()
+
+
+def _decrypt_resource_data(data):
+    """Return the decrypted value of a redacted resource_data row."""
+    ttl = CONF.decrypted_data_cache_ttl
+    if ttl <= 0:
+        return _decrypt(data.value, data.decrypt_method)
+
+    while _decrypted_cache:
+        oldest = next(six.iterkeys(_decrypted_cache))
+        if not timeutils.is_older_than(_decrypted_cache[oldest][1], ttl):
+            break
+        del _decrypted_cache[oldest]
+
+    key = (data.id, data.decrypt_method, data.value)
+    if key in _decrypted_cache:
+        return _decrypted_cache[key][0]
+
+    value = _decrypt(data.value, data.decrypt_method)
+    _decrypted_cache[key] = (value, timeutils.utcnow())
+    while len(_decrypted_cache) > DECRYPTED_CACHE_SIZE:
+        _decrypted_cache.popitem(last=False)
+    return value
+
+
 def resource_data_get_by_key(context, resource_id, key):
     """Looks up resource_data by resource_id and key. Does not unencrypt
     resource_data.
@@ -260,6 +293,44 @@ def resource_create(context, values):
     return resource_ref
 
 
+def resource_create_all(context, values_list):
+    """Create several resources in a single transaction."""
+    session = _session(context)
+    resource_refs = []
+    for values in values_list:
+        resource_ref = models.Resource()
+        resource_ref.update(values)
+        resource_refs.append(resource_ref)
+    session.begin()
+    session.add_all(resource_refs)
+    session.commit()
+    return resource_refs
+
+
+def _update_state_aware(model, query, values, expected_state=None):
+    """Apply values to the rows matched by query with a single UPDATE.
+
+    If expected_state is an (action, status) tuple, only rows that are
+    currently in that state are updated. Returns True if any row was.
+    """
+    if expected_state is not None:
+        action, status = expected_state
+        query = query.filter_by(action=action, status=status)
+    if 'status_reason' in values:
+        # the model truncates the reason on assignment, but a bulk UPDATE
+        # bypasses the model attributes
+        values = dict(values)
+        reason = values.pop('status_reason')
+        values[model._status_reason] = reason and reason[:255] or ''
+    return query.update(values, synchronize_session='evaluate') > 0
+
+
+def resource_update(context, resource_id, values, expected_state=None):
+    query = model_query(context, models.Resource).filter_by(id=resource_id)
+    return _update_state_aware(models.Resource, query, values,
+                               expected_state)
+
+
 def resource_get_all_by_stack(context, stack_id):
     results = model_query(
         context, models.Resource
@@ -425,6 +496,19 @@ def stack_update(context, stack_id, values):
     stack.save(_session(context))
 
 
+def stack_update_state(context, stack_id, action, status, status_reason,
+                       expected_state=None):
+    query = soft_delete_aware_query(
+        context, models.Stack
+    ).filter_by(id=stack_id).filter(sqlalchemy.or_(
+        models.Stack.tenant == context.tenant_id,
+        models.Stack.stack_user_project_id == context.tenant_id))
+    values = {'action': action,
+              'status': status,
+              'status_reason': status_reason}
+    return _update_state_aware(models.Stack, query, values, expected_state)
+
+
 def stack_delete(context, stack_id):
     s = stack_get(context, stack_id)
     if not s:
@@ -441,6 +525,14 @@ def stack_delete(context, stack_id):
     session.flush()
 
 
+def stack_lock_get_engine_id(stack_id):
+    session = get_session()
+    with session.begin():
+        lock = session.query(models.StackLock).get(stack_id)
+        if lock is not None:
+            return lock.engine_id
+
+
 def stack_lock_create(stack_id, engine_id):
     session = get_session()
     with session.begin():
@@ -658,6 +750,13 @@ def watch_rule_get_all_by_stack(context, stack_id):
     return results
 
 
+def watch_rule_summary(context):
+    """Return the number of watch rules and the highest watch rule id."""
+    return _session(context).query(
+        sqlalchemy.func.count(models.WatchRule.id),
+        sqlalchemy.func.max(models.WatchRule.id)).one()
+
+
 def watch_rule_create(context, values):
     obj_ref = models.WatchRule()
     obj_ref.update(values)
@@ -700,11 +799,83 @@ def watch_data_create(context, values):
     return obj_ref
 
 
+def watch_data_create_all(context, values_list):
+    """Create several watch data points in a single transaction."""
+    session = _session(context)
+    data_refs = []
+    for values in values_list:
+        data_ref = models.WatchData()
+        data_ref.update(values)
+        data_refs.append(data_ref)
+    session.begin()
+    session.add_all(data_refs)
+    session.commit()
+    return data_refs
+
+
 def watch_data_get_all(context):
     results = model_query(context, models.WatchData).all()
     return results
 
 
+def watch_data_get_raw_before(context, watch_rule_id, before, limit):
+    """Return the oldest raw samples of a watch rule created before a time."""
+    results = model_query(context, models.WatchData).filter_by(
+        watch_rule_id=watch_rule_id, period=None).filter(
+        models.WatchData.created_at < before).order_by(
+        models.WatchData.created_at, models.WatchData.id).limit(limit).all()
+    return results
+
+
+def watch_data_get_rollups(context, watch_rule_id, times):
+    """Return the aggregates of a watch rule's samples for the given times."""
+    results = model_query(context, models.WatchData).filter_by(
+        watch_rule_id=watch_rule_id).filter(
+        models.WatchData.period != None).filter(  # noqa
+        models.WatchData.created_at.in_(times)).all()
+    return results
+
+
+def watch_data_rollup(context, watch_data_ids, values_list):
+    """
+    Replace watch data with aggregates of it in a single transaction.
+
+    Nothing is changed and False is returned if some of the data had already
+    been deleted, e.g. by another engine rolling up the same samples.
+    """
+    session = _session(context)
+    session.begin()
+    deleted = session.query(models.WatchData).filter(
+        models.WatchData.id.in_(watch_data_ids)).delete(
+        synchronize_session=False)
+    if deleted != len(watch_data_ids):
+        session.rollback()
+        return False
+    for values in values_list:
+        data_ref = models.WatchData()
+        data_ref.update(values)
+        session.add(data_ref)
+    session.commit()
+    return True
+
+
+def watch_data_delete_before(context, before, limit):
+    """
+    Delete up to limit watch data created before a time, returning the
+    number of rows deleted.
+    """
+    session = _session(context)
+    ids = [wd.id for wd in session.query(models.WatchData.id).filter(
+        models.WatchData.created_at < before).limit(limit)]
+    if not ids:
+        return 0
+    session.begin()
+    deleted = session.query(models.WatchData).filter(
+        models.WatchData.id.in_(ids)).delete(synchronize_session=False)
+    session.commit()
+    return deleted
+
+
 def software_config_create(context, values):
     obj_ref = models.SoftwareConfig()
     obj_ref.update(values)
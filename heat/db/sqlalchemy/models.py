@@ -279,6 +279,8 @@ class WatchData(BASE, HeatBase):
 
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
     data = sqlalchemy.Column('data', types.Json)
+    # Seconds aggregated into this data point, None for a raw sample
+    period = sqlalchemy.Column(sqlalchemy.Integer)
 
     watch_rule_id = sqlalchemy.Column(
         sqlalchemy.Integer,
@@ -70,18 +70,21 @@ def format_stack_outputs(stack, outputs):
     Return a representation of the given output template for the given stack
     that matches the API output expectations.
     '''
-    def format_stack_output(k):
+    def format_stack_output(k, value):
         output = {
             rpc_api.OUTPUT_DESCRIPTION: outputs[k].get('Description',
                                                        'No description given'),
             rpc_api.OUTPUT_KEY: k,
-            rpc_api.OUTPUT_VALUE: stack.output(k)
+            rpc_api.OUTPUT_VALUE: value
         }
         if outputs[k].get('error_msg'):
             output.update({rpc_api.OUTPUT_ERROR: outputs[k].get('error_msg')})
         return output
 
-    return [format_stack_output(key) for key in outputs]
+    keys = list(outputs)
+    values = stack.resolve_outputs(keys)
+    return [format_stack_output(key, value)
+            for key, value in zip(keys, values)]
 
 
 def format_stack(stack, preview=False):
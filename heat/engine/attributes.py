@@ -17,6 +17,7 @@ import warnings
 import six
 
 from heat.common.i18n import _
+from heat.common import singleflight
 from heat.engine import constraints as constr
 from heat.engine import support
 
@@ -118,6 +119,9 @@ class Attributes(collections.Mapping):
         self._resolver = resolver
         self._attributes = Attributes._make_attributes(schema)
         self.reset_resolved_values()
+        # Number of lookups served from, and not from, the resolved values
+        self.hits = 0
+        self.misses = 0
 
     def reset_resolved_values(self):
         self._resolved_values = {}
@@ -153,11 +157,14 @@ class Attributes(collections.Mapping):
 
         attrib = self._attributes.get(key)
         if attrib.schema.cache_mode == Schema.CACHE_NONE:
+            self.misses += 1
             return self._resolver(key)
 
         if key in self._resolved_values:
+            self.hits += 1
             return self._resolved_values[key]
 
+        self.misses += 1
         value = self._resolver(key)
         if value is not None:
             # only store if not None, it may resolve to an actual value
@@ -179,6 +186,26 @@ class Attributes(collections.Mapping):
                 '\n\t'.join(self._attributes.values()))
 
 
+class AttributeMemo(object):
+    """
+    Attribute values shared within a run resolving stack outputs.
+
+    Each attribute of a resource is resolved at most once during the run,
+    whatever its cache mode and even if it resolves to None; callers asking
+    for an attribute which is already being resolved wait for its value.
+    """
+
+    def __init__(self):
+        self._values = singleflight.SingleFlight()
+
+    def get(self, resource, key, resolve):
+        """
+        Return the value of resolve(), calling it only if the given attribute
+        of the given resource has not been resolved during this run.
+        """
+        return self._values.do((id(resource), key), resolve)
+
+
 def select_from_attribute(attribute_value, path):
     '''
     Select an element from an attribute value.
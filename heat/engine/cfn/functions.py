@@ -43,6 +43,9 @@ class FindInMap(function.Function):
         except ValueError as ex:
             raise KeyError(six.text_type(ex))
 
+    def is_static(self):
+        return True
+
     def result(self):
         mapping = self.stack.t.maps[function.resolve(self._mapname)]
         key = function.resolve(self._mapkey)
@@ -83,6 +86,11 @@ class ParamRef(function.Function):
 
         self.parameters = self.stack.parameters
 
+    def is_static(self):
+        param_name = function.resolve(self.args)
+        pseudo_params = getattr(self.parameters, 'PSEUDO_PARAMETERS', ())
+        return param_name not in pseudo_params
+
     def result(self):
         param_name = function.resolve(self.args)
 
@@ -219,6 +227,9 @@ class Select(function.Function):
             raise ValueError(_('Arguments to "%s" must be of the form '
                                '[index, collection]') % self.fn_name)
 
+    def is_static(self):
+        return True
+
     def result(self):
         index = function.resolve(self._lookup)
 
@@ -298,6 +309,9 @@ class Join(function.Function):
             raise ValueError(_('Incorrect arguments to "%(fn_name)s" '
                                'should be: %(example)s') % fmt_data)
 
+    def is_static(self):
+        return True
+
     def result(self):
         strings = function.resolve(self._strings)
         if strings is None:
@@ -352,6 +366,9 @@ class Split(function.Function):
             raise ValueError(_('Incorrect arguments to "%(fn_name)s" '
                                'should be: %(example)s') % fmt_data)
 
+    def is_static(self):
+        return True
+
     def result(self):
         strings = function.resolve(self._strings)
 
@@ -413,6 +430,9 @@ class Replace(function.Function):
         else:
             return mapping, string
 
+    def is_static(self):
+        return True
+
     def result(self):
         template = function.resolve(self._string)
         mapping = function.resolve(self._mapping)
@@ -456,6 +476,9 @@ class Base64(function.Function):
     in plain text.
     '''
 
+    def is_static(self):
+        return True
+
     def result(self):
         resolved = function.resolve(self.args)
         if not isinstance(resolved, six.string_types):
@@ -502,6 +525,9 @@ class MemberListToMap(function.Function):
         if not isinstance(self._valuename, six.string_types):
             raise TypeError(_('%s Value Name must be a string') % self.fn_name)
 
+    def is_static(self):
+        return True
+
     def result(self):
         member_list = function.resolve(self._list)
 
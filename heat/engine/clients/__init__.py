@@ -156,6 +156,10 @@ def has_client(name):
     return _mgr and name in _mgr.names()
 
 
+def client_names():
+    return sorted(_mgr.names()) if _mgr else []
+
+
 def initialise():
     global _mgr
     if _mgr:
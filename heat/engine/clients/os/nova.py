@@ -15,6 +15,7 @@ import collections
 import email
 from email.mime import multipart
 from email.mime import text
+import hashlib
 import json
 import logging
 import os
@@ -25,6 +26,7 @@ from novaclient import client as nc
 from novaclient import exceptions
 from novaclient import shell as novashell
 from oslo.config import cfg
+from oslo.utils import timeutils
 import six
 from six.moves.urllib import parse as urlparse
 
@@ -37,6 +39,231 @@ from heat.engine import scheduler
 
 LOG = logging.getLogger(__name__)
 
+cfg.CONF.import_opt('server_cache_ttl', 'heat.common.config')
+
+
+class ServerCache(object):
+    '''
+    A server fetched from Nova, reused for up to server_cache_ttl seconds.
+
+    The server is only reused when asked for with the same key. Resources
+    use their physical resource id and state as the key, so the server is
+    fetched again once they perform an action.
+    '''
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._key = None
+        self._server = None
+        self._fetched_at = None
+
+    def get(self, key, fetch):
+        '''
+        Return the cached server for key, or the result of calling fetch().
+        '''
+        ttl = cfg.CONF.server_cache_ttl
+        if (ttl > 0 and self._fetched_at is not None and key == self._key and
+                not timeutils.is_older_than(self._fetched_at, ttl)):
+            return self._server
+
+        server = fetch()
+        if ttl > 0:
+            self._key = key
+            self._server = server
+            self._fetched_at = timeutils.utcnow()
+        return server
+
+    def get_server(self, resource):
+        '''
+        Return the server of a resource, reusing one fetched recently if the
+        resource has not performed an action since.
+        '''
+        return self.get((resource.resource_id, resource.action,
+                         resource.status),
+                        lambda: resource.nova().servers.get(
+                            resource.resource_id))
+
+
+USERDATA_CACHE_SIZE = 100
+
+
+def _read_cloudinit_file(fn):
+    return pkgutil.get_data('heat', 'cloudinit/%s' % fn)
+
+
+def _make_subpart(content, filename, subtype=None):
+    if subtype is None:
+        subtype = os.path.splitext(filename)[0]
+    msg = text.MIMEText(content, _subtype=subtype)
+    msg.add_header('Content-Disposition', 'attachment',
+                   filename=filename)
+    return msg
+
+
+def _lru_set(cache, key, value):
+    cache.pop(key, None)
+    cache[key] = value
+    while len(cache) > USERDATA_CACHE_SIZE:
+        cache.popitem(last=False)
+    return value
+
+
+def _digest(data):
+    if data is None:
+        return None
+    if isinstance(data, six.text_type):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+# The cloud-init files shipped with Heat never change while the engine is
+# running, so they are read (and the invariant ones turned into MIME parts)
+# only once.
+_CLOUDINIT_CONFIG = string.Template(_read_cloudinit_file('config'))
+_CLOUDINIT_BOOTHOOK = string.Template(_read_cloudinit_file('boothook.sh'))
+_PART_HANDLER_PART = _make_subpart(_read_cloudinit_file('part_handler.py'),
+                                   'part-handler.py')
+_LOGUSERDATA_PART = _make_subpart(_read_cloudinit_file('loguserdata.py'),
+                                  'loguserdata.py', 'x-shellscript')
+
+_user_parts_cache = collections.OrderedDict()
+_userdata_cache = collections.OrderedDict()
+
+
+def _user_parts(instance_user):
+    '''
+    Return the cloud-config and boothook MIME parts for instance_user.
+    '''
+    parts = _user_parts_cache.get(instance_user)
+    if parts is not None:
+        return parts
+
+    if instance_user:
+        config_custom_user = 'user: %s' % instance_user
+        # FIXME(shadower): compatibility workaround for cloud-init 0.6.3.
+        # We can drop this once we stop supporting 0.6.3 (which ships
+        # with Ubuntu 12.04 LTS).
+        #
+        # See bug https://bugs.launchpad.net/heat/+bug/1257410
+        boothook_custom_user = r"""useradd -m %s
+echo -e '%s\tALL=(ALL)\tNOPASSWD: ALL' >> /etc/sudoers
+""" % (instance_user, instance_user)
+    else:
+        config_custom_user = ''
+        boothook_custom_user = ''
+
+    cloudinit_config = _CLOUDINIT_CONFIG.safe_substitute(
+        add_custom_user=config_custom_user)
+    cloudinit_boothook = _CLOUDINIT_BOOTHOOK.safe_substitute(
+        add_custom_user=boothook_custom_user)
+
+    parts = (_make_subpart(cloudinit_config, 'cloud-config'),
+             _make_subpart(cloudinit_boothook, 'boothook.sh',
+                           'cloud-boothook'))
+    return _lru_set(_user_parts_cache, instance_user, parts)
+
+
+def build_userdata(metadata, userdata=None, instance_user=None,
+                   user_data_format='HEAT_CFNTOOLS'):
+    '''
+    Build multipart data blob for CloudInit which includes user-supplied
+    Metadata, user data, and the required Heat in-instance configuration.
+
+    The result is cached, so servers built from the same inputs share the
+    same blob.
+
+    :param metadata: the resource metadata
+    :type metadata: dict or None
+    :param userdata: user data string
+    :type userdata: str or None
+    :param instance_user: the user to create on the server
+    :type instance_user: string
+    :param user_data_format: Format of user data to return
+    :type user_data_format: string
+    :returns: multipart mime as a string
+    '''
+
+    if user_data_format == 'RAW':
+        return userdata
+
+    is_cfntools = user_data_format == 'HEAT_CFNTOOLS'
+    is_software_config = user_data_format == 'SOFTWARE_CONFIG'
+
+    metadata_json = json.dumps(metadata) if metadata else None
+    watch_server_url = cfg.CONF.heat_watch_server_url
+    metadata_server_url = cfg.CONF.heat_metadata_server_url
+    is_secure = cfg.CONF.instance_connection_is_secure
+    vcerts = cfg.CONF.instance_connection_https_validate_certificates
+
+    key = (instance_user, user_data_format,
+           _digest(metadata_json), _digest(userdata),
+           '%s' % watch_server_url, '%s' % metadata_server_url,
+           '%s' % is_secure, '%s' % vcerts)
+    mime_string = _userdata_cache.get(key)
+    if mime_string is not None:
+        return mime_string
+
+    subparts = list(_user_parts(instance_user))
+    subparts.append(_PART_HANDLER_PART)
+
+    attachments = []
+    if is_cfntools:
+        attachments.append((userdata, 'cfn-userdata', 'x-cfninitdata'))
+    elif is_software_config:
+        # attempt to parse userdata as a multipart message, and if it
+        # is, add each part as an attachment
+        userdata_parts = None
+        try:
+            userdata_parts = email.message_from_string(userdata)
+        except Exception:
+            pass
+        if userdata_parts and userdata_parts.is_multipart():
+            for part in userdata_parts.get_payload():
+                attachments.append((part.get_payload(),
+                                    part.get_filename(),
+                                    part.get_content_subtype()))
+        else:
+            attachments.append((userdata, 'userdata', 'x-shellscript'))
+    subparts.extend(_make_subpart(*args) for args in attachments)
+
+    if is_cfntools:
+        subparts.append(_LOGUSERDATA_PART)
+
+    attachments = []
+    if metadata_json:
+        attachments.append((metadata_json,
+                            'cfn-init-data', 'x-cfninitdata'))
+
+    attachments.append((watch_server_url,
+                        'cfn-watch-server', 'x-cfninitdata'))
+
+    if is_cfntools:
+        attachments.append((metadata_server_url,
+                            'cfn-metadata-server', 'x-cfninitdata'))
+
+        # Create a boto config which the cfntools on the host use to know
+        # where the cfn and cw API's are to be accessed
+        cfn_url = urlparse.urlparse(metadata_server_url)
+        cw_url = urlparse.urlparse(watch_server_url)
+        boto_cfg = "\n".join(["[Boto]",
+                              "debug = 0",
+                              "is_secure = %s" % is_secure,
+                              "https_validate_certificates = %s" % vcerts,
+                              "cfn_region_name = heat",
+                              "cfn_region_endpoint = %s" %
+                              cfn_url.hostname,
+                              "cloudwatch_region_name = heat",
+                              "cloudwatch_region_endpoint = %s" %
+                              cw_url.hostname])
+        attachments.append((boto_cfg,
+                            'cfn-boto-cfg', 'x-cfninitdata'))
+    subparts.extend(_make_subpart(*args) for args in attachments)
+
+    mime_blob = multipart.MIMEMultipart(_subparts=subparts)
+    return _lru_set(_userdata_cache, key, mime_blob.as_string())
+
 
 class NovaClientPlugin(client_plugin.ClientPlugin):
 
@@ -181,8 +408,8 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
         Build multipart data blob for CloudInit which includes user-supplied
         Metadata, user data, and the required Heat in-instance configuration.
 
-        :param resource: the resource implementation
-        :type resource: heat.engine.Resource
+        :param metadata: the resource metadata
+        :type metadata: dict or None
         :param userdata: user data string
         :type userdata: str or None
         :param instance_user: the user to create on the server
@@ -191,106 +418,8 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
         :type user_data_format: string
         :returns: multipart mime as a string
         '''
-
-        if user_data_format == 'RAW':
-            return userdata
-
-        is_cfntools = user_data_format == 'HEAT_CFNTOOLS'
-        is_software_config = user_data_format == 'SOFTWARE_CONFIG'
-
-        def make_subpart(content, filename, subtype=None):
-            if subtype is None:
-                subtype = os.path.splitext(filename)[0]
-            msg = text.MIMEText(content, _subtype=subtype)
-            msg.add_header('Content-Disposition', 'attachment',
-                           filename=filename)
-            return msg
-
-        def read_cloudinit_file(fn):
-            return pkgutil.get_data('heat', 'cloudinit/%s' % fn)
-
-        if instance_user:
-            config_custom_user = 'user: %s' % instance_user
-            # FIXME(shadower): compatibility workaround for cloud-init 0.6.3.
-            # We can drop this once we stop supporting 0.6.3 (which ships
-            # with Ubuntu 12.04 LTS).
-            #
-            # See bug https://bugs.launchpad.net/heat/+bug/1257410
-            boothook_custom_user = r"""useradd -m %s
-echo -e '%s\tALL=(ALL)\tNOPASSWD: ALL' >> /etc/sudoers
-""" % (instance_user, instance_user)
-        else:
-            config_custom_user = ''
-            boothook_custom_user = ''
-
-        cloudinit_config = string.Template(
-            read_cloudinit_file('config')).safe_substitute(
-                add_custom_user=config_custom_user)
-        cloudinit_boothook = string.Template(
-            read_cloudinit_file('boothook.sh')).safe_substitute(
-                add_custom_user=boothook_custom_user)
-
-        attachments = [(cloudinit_config, 'cloud-config'),
-                       (cloudinit_boothook, 'boothook.sh', 'cloud-boothook'),
-                       (read_cloudinit_file('part_handler.py'),
-                        'part-handler.py')]
-
-        if is_cfntools:
-            attachments.append((userdata, 'cfn-userdata', 'x-cfninitdata'))
-        elif is_software_config:
-            # attempt to parse userdata as a multipart message, and if it
-            # is, add each part as an attachment
-            userdata_parts = None
-            try:
-                userdata_parts = email.message_from_string(userdata)
-            except Exception:
-                pass
-            if userdata_parts and userdata_parts.is_multipart():
-                for part in userdata_parts.get_payload():
-                    attachments.append((part.get_payload(),
-                                        part.get_filename(),
-                                        part.get_content_subtype()))
-            else:
-                attachments.append((userdata, 'userdata', 'x-shellscript'))
-
-        if is_cfntools:
-            attachments.append((read_cloudinit_file('loguserdata.py'),
-                               'loguserdata.py', 'x-shellscript'))
-
-        if metadata:
-            attachments.append((json.dumps(metadata),
-                                'cfn-init-data', 'x-cfninitdata'))
-
-        attachments.append((cfg.CONF.heat_watch_server_url,
-                            'cfn-watch-server', 'x-cfninitdata'))
-
-        if is_cfntools:
-            attachments.append((cfg.CONF.heat_metadata_server_url,
-                                'cfn-metadata-server', 'x-cfninitdata'))
-
-            # Create a boto config which the cfntools on the host use to know
-            # where the cfn and cw API's are to be accessed
-            cfn_url = urlparse.urlparse(cfg.CONF.heat_metadata_server_url)
-            cw_url = urlparse.urlparse(cfg.CONF.heat_watch_server_url)
-            is_secure = cfg.CONF.instance_connection_is_secure
-            vcerts = cfg.CONF.instance_connection_https_validate_certificates
-            boto_cfg = "\n".join(["[Boto]",
-                                  "debug = 0",
-                                  "is_secure = %s" % is_secure,
-                                  "https_validate_certificates = %s" % vcerts,
-                                  "cfn_region_name = heat",
-                                  "cfn_region_endpoint = %s" %
-                                  cfn_url.hostname,
-                                  "cloudwatch_region_name = heat",
-                                  "cloudwatch_region_endpoint = %s" %
-                                  cw_url.hostname])
-            attachments.append((boto_cfg,
-                                'cfn-boto-cfg', 'x-cfninitdata'))
-
-        subparts = [make_subpart(*args) for args in attachments]
-        mime_blob = multipart.MIMEMultipart(_subparts=subparts)
-
-        return mime_blob.as_string()
+        return build_userdata(metadata, userdata, instance_user,
+                              user_data_format)
 
     def delete_server(self, server):
         '''
@@ -409,9 +538,15 @@ echo -e '%s\tALL=(ALL)\tNOPASSWD: ALL' >> /etc/sudoers
             LOG.warn(_LW('Instance (%(server)s) not found: %(ex)s'),
                      {'server': server, 'ex': ex})
         else:
-            for n in server.networks:
-                if len(server.networks[n]) > 0:
-                    return server.networks[n][0]
+            return self.first_ipaddress(server)
+
+    def first_ipaddress(self, server):
+        '''
+        Return the first IP address of a server fetched from Nova.
+        '''
+        for n in server.networks:
+            if len(server.networks[n]) > 0:
+                return server.networks[n][0]
 
     def get_server(self, server):
         try:
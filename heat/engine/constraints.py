@@ -15,11 +15,14 @@ import collections
 import numbers
 import re
 
+import eventlet
+from oslo.serialization import jsonutils
 from oslo.utils import strutils
 import six
 
 from heat.common import exception
 from heat.common.i18n import _
+from heat.common import singleflight
 from heat.engine import resources
 
 
@@ -285,6 +288,16 @@ class Constraint(collections.Mapping):
                 err_msg = self._err_msg(value)
             raise ValueError(err_msg)
 
+    def _check(self, value, schema=None, context=None):
+        """
+        Return a (valid, error message) tuple for the given value.
+
+        The error message is None when the value is valid.
+        """
+        if self._is_valid(value, schema, context):
+            return True, None
+        return False, self._err_msg(value)
+
     @classmethod
     def _name(cls):
         return '_'.join(w.lower() for w in re.findall('[A-Z]?[a-z]+',
@@ -558,6 +571,50 @@ class CustomConstraint(Constraint):
             return False
         return constraint.validate(value, context)
 
+    def validate(self, value, schema=None, context=None):
+        cache = getattr(context, 'constraint_cache', None)
+        if cache is None:
+            return super(CustomConstraint, self).validate(value, schema,
+                                                          context)
+
+        valid, err_msg = cache.check(self.name, value,
+                                     lambda: self._check(value, schema,
+                                                         context))
+        if not valid:
+            raise ValueError(self.description or err_msg)
+
+
+class ConstraintCache(object):
+    """
+    Results of custom constraint checks shared within a validation run.
+
+    Identical checks (the same constraint name and value) are performed only
+    once; callers that ask for a check which is already in progress wait for
+    its result. If max_concurrency is specified, no more than that number of
+    checks run at the same time.
+    """
+
+    def __init__(self, max_concurrency=None):
+        self._results = singleflight.SingleFlight()
+        if max_concurrency:
+            self._semaphore = eventlet.semaphore.Semaphore(max_concurrency)
+        else:
+            self._semaphore = None
+
+    def _run(self, check):
+        if self._semaphore is None:
+            return check()
+        with self._semaphore:
+            return check()
+
+    def check(self, name, value, check):
+        """
+        Return the result of check(), running it only if no identical check
+        has been performed during this run.
+        """
+        key = (name, jsonutils.dumps(value, sort_keys=True))
+        return self._results.do(key, lambda: self._run(check))
+
 
 class BaseCustomConstraint(object):
     """A base class for validation using API clients.
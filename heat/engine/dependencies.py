@@ -207,6 +207,15 @@ class Dependencies(object):
 
         return self._graph[last].required_by()
 
+    def requires(self, target):
+        '''
+        List the keys that the specified node requires.
+        '''
+        if target not in self._graph:
+            raise KeyError
+
+        return iter(self._graph[target])
+
     def __getitem__(self, last):
         '''
         Return a partial dependency graph consisting of the specified node and
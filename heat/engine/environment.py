@@ -15,9 +15,11 @@ import copy
 import glob
 import itertools
 import os.path
+import time
 import warnings
 
 from oslo.config import cfg
+from oslo.utils import importutils
 import six
 
 from heat.common import environment_format as env_fmt
@@ -33,6 +35,11 @@ from heat.openstack.common import log
 LOG = log.getLogger(__name__)
 
 
+def _warn_unsupported(resource_class):
+    if resource_class.support_status.status != support.SUPPORTED:
+        warnings.warn(six.text_type(resource_class.support_status.message))
+
+
 class ResourceInfo(object):
     """Base mapping of resource type to implementation."""
 
@@ -106,6 +113,34 @@ class ClassResourceInfo(ResourceInfo):
         return self.value
 
 
+class LazyClassResourceInfo(ClassResourceInfo):
+    """Store the location of a python class that is imported on first use."""
+
+    def __init__(self, registry, path, value):
+        self.registry = registry
+        self.path = path
+        self.name = path[-1]
+        self.module_name, self.class_name = value
+        self.user_resource = True
+        self._class = None
+
+    @property
+    def location(self):
+        return '%s.%s' % (self.module_name, self.class_name)
+
+    @property
+    def value(self):
+        if self._class is None:
+            start = time.time()
+            module = importutils.import_module(self.module_name)
+            self._class = getattr(module, self.class_name)
+            LOG.debug('Imported %(location)s for %(name)s in %(time).3fs' %
+                      {'location': self.location, 'name': self.name,
+                       'time': time.time() - start})
+            _warn_unsupported(self._class)
+        return self._class
+
+
 class TemplateResourceInfo(ResourceInfo):
     """Store the info needed to start a TemplateResource.
     """
@@ -170,6 +205,11 @@ class ResourceRegistry(object):
         ri = ResourceInfo(self, [resource_type], resource_class)
         self._register_info([resource_type], ri)
 
+    def register_lazy_class(self, resource_type, module_name, class_name):
+        ri = LazyClassResourceInfo(self, [resource_type],
+                                   (module_name, class_name))
+        self._register_info([resource_type], ri)
+
     def _load_registry(self, path, registry):
         for k, v in iter(registry.items()):
             if v is None:
@@ -220,14 +260,19 @@ class ResourceRegistry(object):
                 'now': str(info.value)}
             LOG.warn(_LW('Changing %(path)s from %(was)s to %(now)s'),
                      details)
+        elif isinstance(info, LazyClassResourceInfo):
+            # Don't import the class until it is needed
+            LOG.info(_LI('Registering %(path)s -> %(value)s'), {
+                'path': descriptive_path,
+                'value': info.location})
         else:
             LOG.info(_LI('Registering %(path)s -> %(value)s'), {
                 'path': descriptive_path,
                 'value': str(info.value)})
 
-        if isinstance(info, ClassResourceInfo):
-            if info.value.support_status.status != support.SUPPORTED:
-                warnings.warn(six.text_type(info.value.support_status.message))
+        if (isinstance(info, ClassResourceInfo) and
+                not isinstance(info, LazyClassResourceInfo)):
+            _warn_unsupported(info.value)
 
         info.user_resource = (self.global_registry is not None)
         registry[name] = info
@@ -411,6 +456,10 @@ class Environment(object):
     def register_class(self, resource_type, resource_class):
         self.registry.register_class(resource_type, resource_class)
 
+    def register_lazy_class(self, resource_type, module_name, class_name):
+        self.registry.register_lazy_class(resource_type, module_name,
+                                          class_name)
+
     def register_constraint(self, constraint_name, constraint):
         self.constraints[constraint_name] = constraint
 
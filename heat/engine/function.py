@@ -37,6 +37,21 @@ class Function(object):
         self.fn_name = fn_name
         self.args = args
 
+    def is_static(self):
+        """
+        Return whether the result of the function is static.
+
+        A static result depends only on the function's arguments and on data
+        that does not change during the lifetime of the parsed template (such
+        as parameter values and mappings), and not on the state of any
+        resource. Static functions may be evaluated once, when the template is
+        parsed, instead of every time they are resolved.
+
+        Function subclasses whose results are static should override this
+        method.
+        """
+        return False
+
     def validate(self):
         """
         Validate arguments without resolving the function.
@@ -112,6 +127,67 @@ class Function(object):
         return not eq
 
 
+class Constant(Function):
+    """
+    The precomputed result of a static function.
+
+    A Constant resolves to the stored result of the function it replaces, but
+    retains that function's name and arguments so that a copy of it (e.g. to
+    re-parse a resource definition in the context of another stack) is
+    identical to a copy of the original function.
+    """
+
+    def __init__(self, stack, fn_name, args, value):
+        super(Constant, self).__init__(stack, fn_name, args)
+        self.value = value
+
+    def is_static(self):
+        return True
+
+    def result(self):
+        return self.value
+
+
+def is_static(snippet):
+    """
+    Return whether a parsed snippet contains only static data.
+
+    That is, whether every function in the snippet has already been replaced
+    by a Constant.
+    """
+    if isinstance(snippet, Function):
+        return isinstance(snippet, Constant)
+    elif isinstance(snippet, collections.Mapping):
+        return all(is_static(v) for v in snippet.values())
+    elif (not isinstance(snippet, six.string_types) and
+          isinstance(snippet, collections.Iterable)):
+        return all(is_static(v) for v in snippet)
+
+    return True
+
+
+def fold(func):
+    """
+    Return a Constant in place of a function whose result is static.
+
+    The function is returned unchanged if its result may depend on the state
+    of a resource, or if it cannot be calculated (in which case the error
+    will be reported when the function is validated or resolved).
+    """
+    if (isinstance(func, Constant) or not isinstance(func, Function) or
+            not is_static(func.args)):
+        return func
+
+    try:
+        if not func.is_static():
+            return func
+        value = resolve(func)
+    except Exception:
+        return func
+
+    return Constant(func.stack, func.fn_name, func.args, value)
+
+
 def resolve(snippet):
     while isinstance(snippet, Function):
         snippet = snippet.result()
@@ -43,6 +43,16 @@ class GetParam(function.Function):
 
         self.parameters = self.stack.parameters
 
+    def is_static(self):
+        args = function.resolve(self.args)
+        if (isinstance(args, collections.Sequence) and args and
+                not isinstance(args, six.string_types)):
+            param_name = args[0]
+        else:
+            param_name = args
+        pseudo_params = getattr(self.parameters, 'PSEUDO_PARAMETERS', ())
+        return param_name not in pseudo_params
+
     def result(self):
         args = function.resolve(self.args)
 
@@ -202,6 +212,9 @@ class GetFile(function.Function):
     key.
     """
 
+    def is_static(self):
+        return True
+
     def result(self):
         args = function.resolve(self.args)
         if not (isinstance(args, six.string_types)):
@@ -12,9 +12,11 @@
 #    under the License.
 
 import collections
+import hashlib
 import itertools
 import json
 
+from oslo.serialization import jsonutils
 from oslo.utils import encodeutils
 from oslo.utils import strutils
 import six
@@ -446,6 +448,7 @@ class Parameters(collections.Mapping):
 
         self.tmpl = tmpl
         self.user_params = user_params
+        self._fingerprint = None
 
         schemata = self.tmpl.param_schemata()
         user_parameters = (user_parameter(si) for si in
@@ -507,6 +510,28 @@ class Parameters(collections.Mapping):
             return True
         return False
 
+    def fingerprint(self):
+        '''
+        Return a digest of the values of all non-pseudo parameters.
+
+        Two sets of parameters with the same fingerprint produce the same
+        results from static template functions.
+        '''
+        if self._fingerprint is None:
+            def param_value(param):
+                try:
+                    return param.value()
+                except (exception.UserParameterMissing,
+                        ValueError, TypeError):
+                    return None
+
+            values = self.map(param_value,
+                              lambda p: p.name not in self.PSEUDO_PARAMETERS)
+            data = jsonutils.dumps(values, sort_keys=True)
+            self._fingerprint = hashlib.sha256(
+                encodeutils.safe_encode(data)).hexdigest()
+        return self._fingerprint
+
     def _validate_user_parameters(self):
         schemata = self.tmpl.param_schemata()
         for param in self.user_params:
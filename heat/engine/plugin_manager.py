@@ -12,19 +12,37 @@
 #    under the License.
 
 import collections
+import hashlib
 import itertools
+import json
+import os
 import sys
 
 from oslo.config import cfg
 import six
 
 from heat.common.i18n import _LE
+from heat.common.i18n import _LW
 from heat.common import plugin_loader
 from heat.openstack.common import log
 
 LOG = log.getLogger(__name__)
 
 
+def plugin_packages(*extra_packages):
+    '''Iterate over the packages that are searched for plugin modules.
+
+    The heat.engine.plugins package is created from the plugin directories
+    specified in the config file, but no modules are imported.
+    '''
+    for package_name in extra_packages:
+        yield sys.modules[package_name]
+
+    cfg.CONF.import_opt('plugin_dirs', 'heat.common.config')
+    yield plugin_loader.create_subpackage(cfg.CONF.plugin_dirs,
+                                          'heat.engine')
+
+
 class PluginManager(object):
     '''A class for managing plugin modules.'''
 
@@ -42,17 +60,9 @@ class PluginManager(object):
         any user-supplied plugin modules.
 
         '''
-        def packages():
-            for package_name in extra_packages:
-                yield sys.modules[package_name]
-
-            cfg.CONF.import_opt('plugin_dirs', 'heat.common.config')
-            yield plugin_loader.create_subpackage(cfg.CONF.plugin_dirs,
-                                                  'heat.engine')
-
         def modules():
             pkg_modules = itertools.imap(plugin_loader.load_modules,
-                                         packages())
+                                         plugin_packages(*extra_packages))
             return itertools.chain.from_iterable(pkg_modules)
 
         self.modules = list(modules())
@@ -114,3 +124,74 @@ class PluginMapping(object):
         mod_dicts = plugin_manager.map_to_modules(self.load_from_module)
         return itertools.chain.from_iterable(six.iteritems(d) for d
                                              in mod_dicts)
+
+
+SNAPSHOT_VERSION = 1
+
+
+def fingerprint(packages, *extra):
+    '''Return a digest of the plugin source files in the given packages.
+
+    The digest covers the name, size and modification time of every Python
+    file below the packages' paths, along with any extra strings passed, so
+    that it changes whenever a plugin is added, removed or modified. No
+    modules are imported.
+    '''
+    digest = hashlib.sha1()
+    for package in packages:
+        for path in package.__path__:
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if not filename.endswith('.py'):
+                        continue
+                    file_path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.stat(file_path)
+                    except OSError:
+                        continue
+                    digest.update('%s:%d:%d\n' % (file_path, stat.st_size,
+                                                  stat.st_mtime))
+    for item in extra:
+        digest.update('%s\n' % item)
+    return digest.hexdigest()
+
+
+def load_snapshot(snapshot_file, digest):
+    '''Return the plugin entries recorded in a snapshot file.
+
+    None is returned if the file does not exist, cannot be parsed or was
+    recorded for different plugin sources.
+    '''
+    try:
+        with open(snapshot_file) as snapshot_fd:
+            snapshot = json.load(snapshot_fd)
+    except (IOError, ValueError):
+        return None
+
+    if (not isinstance(snapshot, dict) or
+            snapshot.get('version') != SNAPSHOT_VERSION or
+            snapshot.get('fingerprint') != digest):
+        return None
+    return snapshot.get('plugins')
+
+
+def save_snapshot(snapshot_file, digest, plugins):
+    '''Record the plugin entries in a snapshot file.
+
+    Each entry is a list of the module name and either a dict mapping
+    resource types to the (module, class name) that implements them, or None
+    if the module must always be imported. Failing to write the file is not
+    fatal; the plugins will simply be scanned again on the next start.
+    '''
+    snapshot = {'version': SNAPSHOT_VERSION,
+                'fingerprint': digest,
+                'plugins': plugins}
+    tmp_file = '%s.%d' % (snapshot_file, os.getpid())
+    try:
+        with open(tmp_file, 'w') as snapshot_fd:
+            json.dump(snapshot, snapshot_fd)
+        os.rename(tmp_file, snapshot_file)
+    except (IOError, OSError) as ex:
+        LOG.warn(_LW('Failed to write plugin snapshot %(file)s: %(err)s'),
+                 {'file': snapshot_file, 'err': ex})
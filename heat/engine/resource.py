@@ -39,6 +39,7 @@ from heat.engine import resources
 from heat.engine import rsrc_defn
 from heat.engine import scheduler
 from heat.engine import support
+from heat.engine import throttle
 from heat.openstack.common import log as logging
 from heat.rpc import client as rpc_client
 
@@ -115,6 +116,10 @@ class Resource(object):
     # Default name to use for calls to self.client()
     default_client_name = None
 
+    # If True, another resource may be waiting (see heat.engine.wakeup) for
+    # this resource to be signalled, keyed by its physical resource ID
+    signal_wakes_waiters = False
+
     def __new__(cls, name, definition, stack):
         '''Create a new Resource of the appropriate class for its type.'''
 
@@ -187,6 +192,7 @@ class Resource(object):
         self.status_reason = ''
         self.id = None
         self._data = {}
+        self._data_rows = None
         self._rsrc_metadata = None
         self._stored_properties_data = None
         self.created_time = None
@@ -210,14 +216,22 @@ class Resource(object):
         self.status = resource.status
         self.status_reason = resource.status_reason
         self.id = resource.id
-        try:
-            self._data = db_api.resource_data_get_all(self, resource.data)
-        except exception.NotFound:
-            self._data = {}
+        # Redacted data is only decrypted once data() is called
+        self._data_rows = resource.data
+        self._data = None if self._data_rows else {}
         self._rsrc_metadata = resource.rsrc_metadata
         self._stored_properties_data = resource.properties_data
         self.created_time = resource.created_at
         self.updated_time = resource.updated_at
+        self.stack.resource_rows[resource.id] = resource
+
+    def _db_row(self):
+        '''Return the DB row for this resource, querying only if unknown.'''
+        rs = self.stack.resource_rows.get(self.id)
+        if rs is None:
+            rs = db_api.resource_get(self.context, self.id)
+            self.stack.resource_rows[self.id] = rs
+        return rs
 
     def reparse(self):
         self.properties = self.t.properties(self.properties_schema,
@@ -258,11 +272,12 @@ class Resource(object):
     def metadata_get(self, refresh=False):
         if refresh:
             self._rsrc_metadata = None
-        if self.id is None:
+        if self.id is None or self.state == (self.INIT, self.COMPLETE):
+            # rows stored in advance have no metadata until created
             return self.t.metadata()
         if self._rsrc_metadata is not None:
             return self._rsrc_metadata
-        rs = db_api.resource_get(self.stack.context, self.id)
+        rs = self._db_row()
         rs.refresh(attrs=['rsrc_metadata'])
         self._rsrc_metadata = rs.rsrc_metadata
         return rs.rsrc_metadata
@@ -270,8 +285,10 @@ class Resource(object):
     def metadata_set(self, metadata):
         if self.id is None:
             raise exception.ResourceNotAvailable(resource_name=self.name)
-        rs = db_api.resource_get(self.stack.context, self.id)
-        rs.update_and_save({'rsrc_metadata': metadata})
+        if not db_api.resource_update(self.context, self.id,
+                                      {'rsrc_metadata': metadata}):
+            raise exception.NotFound(_('resource with id %s not found') %
+                                     self.id)
         self._rsrc_metadata = metadata
 
     def type(self):
@@ -504,7 +521,25 @@ class Resource(object):
         handler = getattr(self, 'handle_%s' % handler_action, None)
 
         if callable(handler):
-            handler_data = handler(*args)
+            if action == self.CREATE:
+                # Only the call to the handler is throttled, not the wait for
+                # it to complete, so that e.g. a nested stack or a wait
+                # condition never holds a slot needed by another resource
+                res_type = self.type()
+                while not throttle.creates.acquire(self.stack.id, res_type):
+                    yield
+                try:
+                    handler_data = handler(*args)
+                except Exception as ex:
+                    if self._is_over_limit(ex):
+                        throttle.creates.over_limit(res_type)
+                    raise
+                else:
+                    throttle.creates.succeeded(res_type)
+                finally:
+                    throttle.creates.release(self.stack.id, res_type)
+            else:
+                handler_data = handler(*args)
             yield
             if callable(check):
                 while not check(handler_data):
@@ -596,7 +631,8 @@ class Resource(object):
                 else:
                     action = self.CREATE
             except exception.ResourceFailure as failure:
-                if not isinstance(failure.exc, ResourceInError):
+                if not (isinstance(failure.exc, ResourceInError) or
+                        self._is_over_limit(failure.exc)):
                     raise failure
 
                 count[action] += 1
@@ -611,6 +647,11 @@ class Resource(object):
         if first_failure:
             raise first_failure
 
+    def _is_over_limit(self, ex):
+        if self.default_client_name is None:
+            return False
+        return self.client_plugin().is_over_limit(ex)
+
     def prepare_abandon(self):
         self.abandon_in_progress = True
         return {
@@ -896,11 +937,12 @@ class Resource(object):
             return
 
         try:
-            db_api.resource_get(self.context, self.id).delete()
+            self._db_row().delete()
         except exception.NotFound:
             # Don't fail on delete if the db entry has
             # not been created yet.
             pass
+        self.stack.resource_rows.pop(self.id, None)
 
         self.id = None
 
@@ -908,29 +950,41 @@ class Resource(object):
         self.resource_id = inst
         if self.id is not None:
             try:
-                rs = db_api.resource_get(self.context, self.id)
-                rs.update_and_save({'nova_instance': self.resource_id})
+                db_api.resource_update(self.context, self.id,
+                                       {'nova_instance': self.resource_id})
             except Exception as ex:
                 LOG.warn(_LW('db error %s'), ex)
 
+    def _db_values(self, resolve_metadata=True):
+        '''Return the values used to create the resource in the database.
+
+        Rows stored in advance of the resource being created leave the
+        metadata empty, to be resolved when the create starts.
+        '''
+        metadata = self.metadata_get() if resolve_metadata else {}
+        return {'action': self.action,
+                'status': self.status,
+                'status_reason': self.status_reason,
+                'stack_id': self.stack.id,
+                'nova_instance': self.resource_id,
+                'name': self.name,
+                'rsrc_metadata': metadata,
+                'properties_data': self._stored_properties_data,
+                'stack_name': self.stack.name}
+
+    def _stored(self, rs):
+        '''Record the newly-created DB row for the resource.'''
+        self.id = rs.id
+        self.created_time = rs.created_at
+        self._rsrc_metadata = rs.rsrc_metadata
+        self.stack.resource_rows[rs.id] = rs
+
     def _store(self):
         '''Create the resource in the database.'''
-        metadata = self.metadata_get()
+        rs = self._db_values()
         try:
-            rs = {'action': self.action,
-                  'status': self.status,
-                  'status_reason': self.status_reason,
-                  'stack_id': self.stack.id,
-                  'nova_instance': self.resource_id,
-                  'name': self.name,
-                  'rsrc_metadata': metadata,
-                  'properties_data': self._stored_properties_data,
-                  'stack_name': self.stack.name}
-
             new_rs = db_api.resource_create(self.context, rs)
-            self.id = new_rs.id
-            self.created_time = new_rs.created_at
-            self._rsrc_metadata = metadata
+            self._stored(new_rs)
         except Exception as ex:
             LOG.error(_LE('DB error %s'), ex)
 
@@ -943,29 +997,41 @@ class Resource(object):
         ev.store()
 
     def _store_or_update(self, action, status, reason):
+        creating = (action, status) in [(self.CREATE, self.IN_PROGRESS),
+                                        (self.ADOPT, self.IN_PROGRESS)]
+        # rows created in bulk with the stack start out as INIT_COMPLETE
+        stored_in_advance = creating and self.state == (self.INIT,
+                                                        self.COMPLETE)
         self.action = action
         self.status = status
         self.status_reason = reason
 
         if self.id is not None:
+            rs_values = {'action': self.action,
+                         'status': self.status,
+                         'status_reason': reason,
+                         'stack_id': self.stack.id,
+                         'updated_at': self.updated_time,
+                         'properties_data': self._stored_properties_data,
+                         'nova_instance': self.resource_id}
+            if stored_in_advance:
+                # resolve the metadata now, as _store() would have done
+                metadata = self.t.metadata()
+                created_time = datetime.utcnow()
+                rs_values.update({'rsrc_metadata': metadata,
+                                  'created_at': created_time})
             try:
-                rs = db_api.resource_get(self.context, self.id)
-                rs.update_and_save({
-                    'action': self.action,
-                    'status': self.status,
-                    'status_reason': reason,
-                    'stack_id': self.stack.id,
-                    'updated_at': self.updated_time,
-                    'properties_data': self._stored_properties_data,
-                    'nova_instance': self.resource_id})
+                db_api.resource_update(self.context, self.id, rs_values)
+                if stored_in_advance:
+                    self.created_time = created_time
+                    self._rsrc_metadata = metadata
             except Exception as ex:
                 LOG.error(_LE('DB error %s'), ex)
 
         # store resource in DB on transition to CREATE_IN_PROGRESS
         # all other transitions (other than to DELETE_COMPLETE)
         # should be handled by the update_and_save above..
-        elif (action, status) in [(self.CREATE, self.IN_PROGRESS),
-                                  (self.ADOPT, self.IN_PROGRESS)]:
+        elif creating:
             self._store()
 
     def _resolve_attribute(self, name):
@@ -1000,7 +1066,7 @@ class Resource(object):
         if new_state != old_state:
             self._add_event(action, status, reason)
 
-        self.stack.reset_resource_attributes()
+        self.stack.reset_resource_attributes(self)
 
     @property
     def state(self):
@@ -1033,8 +1099,12 @@ class Resource(object):
         :param path: a list of path components to select from the attribute.
         :returns: the attribute value.
         '''
+        memo = getattr(self.context, 'attribute_memo', None)
         try:
-            attribute = self.attributes[key]
+            if memo is None:
+                attribute = self.attributes[key]
+            else:
+                attribute = memo.get(self, key, lambda: self.attributes[key])
         except KeyError:
             raise exception.InvalidTemplateAttribute(resource=self.name,
                                                      key=key)
@@ -1135,8 +1205,9 @@ class Resource(object):
         :returns: a dict representing the resource data for this resource.
         '''
         if self._data is None and self.id:
+            rows, self._data_rows = self._data_rows, None
             try:
-                self._data = db_api.resource_data_get_all(self)
+                self._data = db_api.resource_data_get_all(self, rows)
             except exception.NotFound:
                 pass
 
@@ -1147,6 +1218,7 @@ class Resource(object):
         db_api.resource_data_set(self, key, value, redact)
         # force fetch all resource data from the database again
         self._data = None
+        self._data_rows = None
 
     def data_delete(self, key):
         '''
@@ -1161,6 +1233,7 @@ class Resource(object):
         else:
             # force fetch all resource data from the database again
             self._data = None
+            self._data_rows = None
             return True
 
     def is_using_neutron(self):
@@ -11,11 +11,21 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import sys
+import time
+
+from oslo.config import cfg
+from oslo.utils import importutils
+import six
 from stevedore import extension
 
+from heat.common.i18n import _LI
 from heat.engine import clients
 from heat.engine import environment
 from heat.engine import plugin_manager
+from heat.openstack.common import log
+
+LOG = log.getLogger(__name__)
 
 
 def _register_resources(env, type_pairs):
@@ -74,18 +84,90 @@ def _load_global_resources(env):
         env,
         _get_mapping('heat.stack_lifecycle_plugins'))
 
-    manager = plugin_manager.PluginManager(__name__)
-    # Sometimes resources should not be available for registration in Heat due
-    # to unsatisfied dependencies. We look first for the function
-    # 'available_resource_mapping', which should return the filtered resources.
-    # If it is not found, we look for the legacy 'resource_mapping'.
-    resource_mapping = plugin_manager.PluginMapping(['available_resource',
-                                                     'resource'])
-    constraint_mapping = plugin_manager.PluginMapping('constraint')
-
-    _register_resources(env, resource_mapping.load_all(manager))
-
-    _register_constraints(env, constraint_mapping.load_all(manager))
+    start = time.time()
+    cfg.CONF.import_opt('plugin_snapshot_file', 'heat.common.config')
+    if cfg.CONF.plugin_snapshot_file:
+        modules = _load_snapshot_resources(env,
+                                           cfg.CONF.plugin_snapshot_file)
+    else:
+        manager = plugin_manager.PluginManager(__name__)
+        _register_resources(env, _resource_mapping.load_all(manager))
+        _register_constraints(env, _constraint_mapping.load_all(manager))
+        modules = len(manager.modules)
+
+    LOG.info(_LI('Loaded resource plugins from %(modules)d modules '
+                 'in %(time).3fs'),
+             {'modules': modules, 'time': time.time() - start})
+
+
+# Sometimes resources should not be available for registration in Heat due
+# to unsatisfied dependencies. We look first for the function
+# 'available_resource_mapping', which should return the filtered resources.
+# If it is not found, we look for the legacy 'resource_mapping'.
+_resource_mapping = plugin_manager.PluginMapping(['available_resource',
+                                                  'resource'])
+_constraint_mapping = plugin_manager.PluginMapping('constraint')
+
+
+def _is_importable(resource_class):
+    module = sys.modules.get(getattr(resource_class, '__module__', None))
+    name = getattr(resource_class, '__name__', None)
+    return getattr(module, str(name), None) is resource_class
+
+
+def _snapshot_entry(env, module):
+    resources = _resource_mapping.load_from_module(module)
+    constraints = _constraint_mapping.load_from_module(module)
+    _register_resources(env, six.iteritems(resources))
+    _register_constraints(env, six.iteritems(constraints))
+
+    # Modules that provide constraints, whose resources depend on the config
+    # or on the libraries installed (i.e. that have an
+    # available_resource_mapping), or whose resource classes cannot be found
+    # again by name, are always imported
+    if (constraints or
+            callable(getattr(module, 'available_resource_mapping', None)) or
+            not all(_is_importable(c) for c in resources.values())):
+        return [module.__name__, None]
+    return [module.__name__,
+            dict((name, [c.__module__, c.__name__])
+                 for name, c in six.iteritems(resources))]
+
+
+def _load_snapshot_resources(env, snapshot_file):
+    """Register resources from a snapshot of the plugin modules.
+
+    Resource classes recorded in the snapshot are registered without
+    importing their modules. If the snapshot is missing or out of date, all
+    plugin modules are loaded and a new snapshot is written. Returns the
+    number of modules imported.
+    """
+    packages = list(plugin_manager.plugin_packages(__name__))
+    digest = plugin_manager.fingerprint(packages, *clients.client_names())
+    plugins = plugin_manager.load_snapshot(snapshot_file, digest)
+
+    if plugins is None:
+        LOG.info(_LI('Plugin snapshot %s is missing or out of date, '
+                     'loading all plugin modules'), snapshot_file)
+        manager = plugin_manager.PluginManager(__name__)
+        plugins = [_snapshot_entry(env, m) for m in manager.modules]
+        plugin_manager.save_snapshot(snapshot_file, digest, plugins)
+        return len(manager.modules)
+
+    imported = 0
+    for module_name, resources in plugins:
+        if resources is None:
+            module = importutils.import_module(module_name)
+            _register_resources(
+                env, six.iteritems(_resource_mapping.load_from_module(module)))
+            _register_constraints(
+                env,
+                six.iteritems(_constraint_mapping.load_from_module(module)))
+            imported += 1
+        else:
+            for res_name, (res_module, res_class) in six.iteritems(resources):
+                env.register_lazy_class(res_name, res_module, res_class)
+    return imported
 
 
 def list_opts():
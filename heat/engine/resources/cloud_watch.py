@@ -195,7 +195,7 @@ class CloudWatchAlarm(resource.Resource):
         return '%s-%s' % (self.stack.name, self.name)
 
 
-def resource_mapping():
+def available_resource_mapping():
     cfg.CONF.import_opt('enable_cloud_watch_lite', 'heat.common.config')
     if cfg.CONF.enable_cloud_watch_lite:
         return {
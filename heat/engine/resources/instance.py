@@ -20,6 +20,7 @@ from heat.common import exception
 from heat.common.i18n import _
 from heat.common.i18n import _LI
 from heat.engine import attributes
+from heat.engine.clients.os import nova
 from heat.engine import constraints
 from heat.engine import properties
 from heat.engine import resource
@@ -431,6 +432,7 @@ class Instance(resource.Resource):
     def __init__(self, name, json_snippet, stack):
         super(Instance, self).__init__(name, json_snippet, stack)
         self.ipaddress = None
+        self._server_cache = nova.ServerCache()
 
     def _set_ipaddress(self, networks):
         '''
@@ -447,8 +449,12 @@ class Instance(resource.Resource):
         Return the server's IP address, fetching it from Nova if necessary
         '''
         if self.ipaddress is None:
-            self.ipaddress = self.client_plugin().server_to_ipaddress(
-                self.resource_id)
+            try:
+                server = self._server_cache.get_server(self)
+            except Exception as e:
+                self.client_plugin().ignore_not_found(e)
+            else:
+                self._set_ipaddress(server.networks)
 
         return self.ipaddress or '0.0.0.0'
 
@@ -459,7 +465,7 @@ class Instance(resource.Resource):
         availability_zone = self.properties[self.AVAILABILITY_ZONE]
         if availability_zone is None:
             try:
-                server = self.nova().servers.get(self.resource_id)
+                server = self._server_cache.get_server(self)
                 availability_zone = getattr(server,
                                             'OS-EXT-AZ:availability_zone')
             except Exception as e:
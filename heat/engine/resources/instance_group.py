@@ -54,6 +54,9 @@ class InstanceGroup(stack_resource.StackResource):
 
     _UPDATE_POLICY_SCHEMA_KEYS = (ROLLING_UPDATE,) = ('RollingUpdate',)
 
+    # template format of the nested stack
+    template_version = ('HeatTemplateFormatVersion', '2012-12-12')
+
     ATTRIBUTES = (
         INSTANCE_LIST,
     ) = (
@@ -253,8 +256,7 @@ class InstanceGroup(stack_resource.StackResource):
                 for instance in grouputils.get_members(self)]
 
     def _create_template(self, num_instances, num_replace=0,
-                         template_version=('HeatTemplateFormatVersion',
-                                           '2012-12-12')):
+                         template_version=None):
         """
         Create a template to represent autoscaled instances.
 
@@ -265,7 +267,8 @@ class InstanceGroup(stack_resource.StackResource):
         definitions = template.resource_templates(
             old_resources, instance_definition, num_instances, num_replace)
 
-        return template.make_template(definitions, version=template_version)
+        return template.make_template(
+            definitions, version=template_version or self.template_version)
 
     def _try_rolling_update(self, prop_diff):
         if (self.update_policy[self.ROLLING_UPDATE] and
@@ -280,13 +283,12 @@ class InstanceGroup(stack_resource.StackResource):
         """
         Replace the instances in the group using updated launch configuration
         """
-        def changing_instances(tmpl):
-            instances = grouputils.get_members(self)
-            current = set((i.name, i.t) for i in instances)
-            updated = set(tmpl.resource_definitions(self.nested()).items())
-            # includes instances to be updated and deleted
-            affected = set(k for k, v in current ^ updated)
-            return set(i.FnGetRefId() for i in instances if i.name in affected)
+        def changing_instances(old_definitions, new_definitions):
+            # includes instances to be updated and deleted; members that are
+            # not affected keep the very same definition object
+            new_definitions = dict(new_definitions)
+            return set(name for name, defn in old_definitions
+                       if new_definitions.get(name) is not defn)
 
         def pause_between_batch():
             while True:
@@ -307,22 +309,42 @@ class InstanceGroup(stack_resource.StackResource):
             raise ValueError('The current UpdatePolicy will result '
                              'in stack update timeout.')
 
+        # Plan the size of every batch up front, and resolve the launch
+        # configuration only once for the whole update
+        batch_capacities = []
+        remainder = capacity
+        while remainder > 0 or efft_capacity > capacity:
+            if capacity - remainder >= efft_min_sz:
+                efft_capacity = capacity
+            batch_capacities.append(efft_capacity)
+            remainder -= efft_bat_sz
+        instance_definition = self._get_instance_definition()
+
         try:
-            remainder = capacity
-            while remainder > 0 or efft_capacity > capacity:
-                if capacity - remainder >= efft_min_sz:
-                    efft_capacity = capacity
-                template = self._create_template(efft_capacity, efft_bat_sz)
-                self._lb_reload(exclude=changing_instances(template))
-                updater = self.update_with_template(template)
-                updater.run_to_completion()
-                self.check_update_complete(updater)
-                remainder -= efft_bat_sz
-                if ((remainder > 0 or efft_capacity > capacity) and
-                        pause_sec > 0):
-                    self._lb_reload()
+            for batch_num, batch_capacity in enumerate(batch_capacities):
+                members = grouputils.get_members(self)
+                old_definitions = [(i.name, i.t) for i in members]
+                definitions = list(template.resource_templates(
+                    old_definitions, instance_definition,
+                    batch_capacity, efft_bat_sz))
+
+                # Take the members affected by this batch out of the load
+                # balancer before replacing them
+                affected = changing_instances(old_definitions, definitions)
+                self._lb_reload(exclude=set(i.FnGetRefId() for i in members
+                                            if i.name in affected))
+                if batch_num > 0 and pause_sec > 0:
                     waiter = scheduler.TaskRunner(pause_between_batch)
                     waiter(timeout=pause_sec)
+
+                # Later batches only reuse definitions from the first batch,
+                # so there is no need to validate them again
+                tmpl = template.make_template(definitions,
+                                              version=self.template_version)
+                updater = self.update_with_template(tmpl,
+                                                    validate=batch_num == 0)
+                updater.run_to_completion()
+                self.check_update_complete(updater)
         finally:
             self._lb_reload()
 
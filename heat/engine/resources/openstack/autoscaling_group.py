@@ -44,6 +44,9 @@ class AutoScalingResourceGroup(aws_asg.AutoScalingGroup):
         'outputs', 'outputs_list', 'current_size',
     )
 
+    # the nested stack is in the HOT format
+    template_version = ('heat_template_version', '2013-05-23')
+
     properties_schema = {
         RESOURCE: properties.Schema(
             properties.Schema.MAP,
@@ -139,14 +142,6 @@ class AutoScalingResourceGroup(aws_asg.AutoScalingGroup):
                           policy[self.MAX_BATCH_SIZE],
                           policy[self.PAUSE_TIME])
 
-    def _create_template(self, num_instances, num_replace=0,
-                         template_version=('heat_template_version',
-                                           '2013-05-23')):
-        """Create a template in the HOT format for the nested stack."""
-        return super(AutoScalingResourceGroup,
-                     self)._create_template(num_instances, num_replace,
-                                            template_version=template_version)
-
     def FnGetAtt(self, key, *path):
         if key == self.CURRENT_SIZE:
             return grouputils.get_size(self)
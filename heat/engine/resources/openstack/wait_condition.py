@@ -12,7 +12,9 @@
 #    under the License.
 
 import json
+import time
 
+from oslo.config import cfg
 from oslo_utils import timeutils
 import six
 
@@ -24,8 +26,11 @@ from heat.engine import properties
 from heat.engine import resource
 from heat.engine.resources import wait_condition as wc_base
 from heat.engine import support
+from heat.engine import wakeup
 from heat.openstack.common import log as logging
 
+cfg.CONF.import_opt('signal_poll_interval', 'heat.common.config')
+
 LOG = logging.getLogger(__name__)
 
 
@@ -33,6 +38,9 @@ class HeatWaitCondition(resource.Resource):
 
     support_status = support.SupportStatus(version='2014.2')
 
+    # Time of the next poll of the handle while waiting for signals
+    _next_poll = None
+
     PROPERTIES = (
         HANDLE, TIMEOUT, COUNT,
     ) = (
@@ -87,22 +95,48 @@ class HeatWaitCondition(resource.Resource):
     def _get_handle_resource(self):
         return self.stack.resource_by_refid(self.properties[self.HANDLE])
 
+    def _start_waiting(self, handle):
+        # Poll at the first check, then wait to be woken by a signal
+        if handle.resource_id is not None:
+            wakeup.waiters.watch(handle.resource_id)
+            self._next_poll = 0
+
+    def _poll_due(self, handle):
+        if self._next_poll is None:
+            return True
+        now = time.time()
+        if (not wakeup.waiters.woken(handle.resource_id) and
+                now < self._next_poll):
+            return False
+        self._next_poll = now + cfg.CONF.signal_poll_interval
+        return True
+
+    def _stop_waiting(self, handle):
+        if handle is not None and handle.resource_id is not None:
+            wakeup.waiters.unwatch(handle.resource_id)
+        self._next_poll = None
+
     def _wait(self, handle, started_at, timeout_in):
         if timeutils.is_older_than(started_at, timeout_in):
+            self._stop_waiting(handle)
             exc = wc_base.WaitConditionTimeout(self, handle)
             LOG.info(_LI('%(name)s Timed out (%(timeout)s)'),
                      {'name': str(self), 'timeout': str(exc)})
             raise exc
 
+        if not self._poll_due(handle):
+            return False
         handle_status = handle.get_status()
 
         if any(s != handle.STATUS_SUCCESS for s in handle_status):
+            self._stop_waiting(handle)
             failure = wc_base.WaitConditionFailure(self, handle)
             LOG.info(_LI('%(name)s Failed (%(failure)s)'),
                      {'name': str(self), 'failure': str(failure)})
             raise failure
 
         if len(handle_status) >= self.properties[self.COUNT]:
+            self._stop_waiting(handle)
             LOG.info(_LI("%s Succeeded"), str(self))
             return True
         return False
@@ -110,6 +144,7 @@ class HeatWaitCondition(resource.Resource):
     def handle_create(self):
         handle = self._get_handle_resource()
         started_at = timeutils.utcnow()
+        self._start_waiting(handle)
         return handle, started_at, float(self.properties[self.TIMEOUT])
 
     def check_create_complete(self, data):
@@ -122,6 +157,7 @@ class HeatWaitCondition(resource.Resource):
 
         handle = self._get_handle_resource()
         started_at = timeutils.utcnow()
+        self._start_waiting(handle)
         return handle, started_at, float(self.properties[self.TIMEOUT])
 
     def check_update_complete(self, data):
@@ -129,6 +165,7 @@ class HeatWaitCondition(resource.Resource):
 
     def handle_delete(self):
         handle = self._get_handle_resource()
+        self._stop_waiting(handle)
         if handle:
             handle.metadata_set({})
 
@@ -25,6 +25,9 @@ class HeatWaitConditionHandle(wc_base.BaseWaitConditionHandle):
 
     support_status = support.SupportStatus(version='2014.2')
 
+    # The user is created with a password, and has no keypair
+    provision_credentials = False
+
     METADATA_KEYS = (
         DATA, REASON, STATUS, UNIQUE_ID
     ) = (
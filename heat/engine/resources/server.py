@@ -23,6 +23,7 @@ from heat.common import exception
 from heat.common.i18n import _
 from heat.common.i18n import _LI
 from heat.engine import attributes
+from heat.engine.clients.os import nova
 from heat.engine import constraints
 from heat.engine import properties
 from heat.engine import resource
@@ -377,6 +378,7 @@ class Server(stack_user.StackUser):
         super(Server, self).__init__(name, json_snippet, stack)
         if self.user_data_software_config():
             self._register_access_key()
+        self._server_cache = nova.ServerCache()
 
     def _server_name(self):
         name = self.properties.get(self.NAME)
@@ -684,16 +686,15 @@ class Server(stack_user.StackUser):
         return nets
 
     def _resolve_attribute(self, name):
-        if name == self.FIRST_ADDRESS:
-            return self.client_plugin().server_to_ipaddress(
-                self.resource_id) or ''
         if name == self.NAME_ATTR:
             return self._server_name()
         try:
-            server = self.nova().servers.get(self.resource_id)
+            server = self._server_cache.get_server(self)
         except Exception as e:
             self.client_plugin().ignore_not_found(e)
             return ''
+        if name == self.FIRST_ADDRESS:
+            return self.client_plugin().first_ipaddress(server) or ''
         if name == self.ADDRESSES:
             return self._add_port_for_address(server)
         if name == self.NETWORKS_ATTR:
@@ -12,8 +12,10 @@
 #    under the License.
 
 import copy
+import time
 import uuid
 
+from oslo.config import cfg
 import six
 
 from heat.common import exception
@@ -26,9 +28,12 @@ from heat.engine.resources import resource_group
 from heat.engine.resources.software_config import software_config as sc
 from heat.engine import signal_responder
 from heat.engine import support
+from heat.engine import wakeup
 from heat.openstack.common import log as logging
 from heat.rpc import api as rpc_api
 
+cfg.CONF.import_opt('signal_poll_interval', 'heat.common.config')
+
 LOG = logging.getLogger(__name__)
 
 
@@ -64,6 +69,12 @@ class SoftwareDeployment(signal_responder.SignalResponder):
 
     support_status = support.SupportStatus(version='2014.1')
 
+    # Which credentials are created depends on the signal transport
+    provision_credentials = False
+
+    # Time of the next poll while waiting for the outputs signal
+    _next_poll = None
+
     PROPERTIES = (
         CONFIG, SERVER, INPUT_VALUES,
         DEPLOY_ACTIONS, NAME, SIGNAL_TRANSPORT
@@ -242,15 +253,36 @@ class SoftwareDeployment(signal_responder.SignalResponder):
             if prev_derived_config:
                 self._delete_derived_config(prev_derived_config)
         if not self._signal_transport_none():
+            # Poll at the first check, then wait to be woken by the signal
+            wakeup.waiters.watch(self.resource_id)
+            self._next_poll = 0
             return sd
 
+    def _poll_due(self):
+        if self._next_poll is None:
+            return True
+        now = time.time()
+        if (not wakeup.waiters.woken(self.resource_id) and
+                now < self._next_poll):
+            return False
+        self._next_poll = now + cfg.CONF.signal_poll_interval
+        return True
+
+    def _stop_waiting(self):
+        wakeup.waiters.unwatch(self.resource_id)
+        self._next_poll = None
+
     def _check_complete(self):
+        if not self._poll_due():
+            return False
         sd = self.rpc_client().show_software_deployment(
             self.context, self.resource_id)
         status = sd[rpc_api.SOFTWARE_DEPLOYMENT_STATUS]
         if status == SoftwareDeployment.COMPLETE:
+            self._stop_waiting()
             return True
         elif status == SoftwareDeployment.FAILED:
+            self._stop_waiting()
             status_reason = sd[rpc_api.SOFTWARE_DEPLOYMENT_STATUS_REASON]
             message = _("Deployment to server "
                         "failed: %s") % status_reason
@@ -412,6 +444,7 @@ class SoftwareDeployment(signal_responder.SignalResponder):
             return True
 
     def _delete_resource(self):
+        self._stop_waiting()
         if self._signal_transport_cfn():
             self._delete_signed_url()
             self._delete_user()
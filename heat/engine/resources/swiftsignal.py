@@ -13,7 +13,9 @@
 
 import json
 import urlparse
+import weakref
 
+from eventlet import semaphore
 from oslo_utils import timeutils
 import six
 
@@ -31,6 +33,79 @@ from heat.openstack.common import log as logging
 LOG = logging.getLogger(__name__)
 
 
+class ContainerWatcher(object):
+    """Share the contents of a stack's signal container between resources.
+
+    SwiftSignal resources in the same stack share a container. The watcher
+    lists it again only when a resource that has already seen the current
+    listing asks for it, so resources polling in the same scheduler step
+    share a single listing. Objects are only fetched when they first appear
+    or their hash changes.
+    """
+
+    _watchers = weakref.WeakValueDictionary()
+
+    def __init__(self, container):
+        self.container = container
+        self.objects = None
+        self._bodies = {}
+        self._generation = 0
+        self._readers = set()
+        self._lock = semaphore.Semaphore()
+
+    @classmethod
+    def get(cls, container):
+        watcher = cls._watchers.get(container)
+        if watcher is None:
+            watcher = cls(container)
+            cls._watchers[container] = watcher
+        return watcher
+
+    def read(self, reader, client, client_plugin):
+        """Return the (name, body) of each object in the container.
+
+        None is returned if the container does not exist or is empty.
+        """
+        generation = self._generation
+        if generation == 0 or reader in self._readers:
+            with self._lock:
+                # Another reader may have refreshed while we waited
+                if self._generation == generation:
+                    self._refresh(client, client_plugin)
+        self._readers.add(reader)
+        return self.objects
+
+    def _refresh(self, client, client_plugin):
+        try:
+            index = client.get_container(self.container)[1]
+        except Exception as exc:
+            client_plugin.ignore_not_found(exc)
+            index = None
+
+        objects = None
+        bodies = {}
+        if index:  # Swift objects may have been deleted by the user
+            objects = []
+            for obj in index:
+                key = (obj['name'], obj.get('hash'))
+                if key not in bodies:
+                    if key in self._bodies:
+                        bodies[key] = self._bodies[key]
+                    else:
+                        try:
+                            bodies[key] = client.get_object(self.container,
+                                                            obj['name'])[1]
+                        except Exception as exc:
+                            client_plugin.ignore_not_found(exc)
+                            continue
+                objects.append((obj['name'], bodies[key]))
+
+        self.objects = objects
+        self._bodies = bodies
+        self._generation += 1
+        self._readers = set()
+
+
 class SwiftSignalFailure(exception.Error):
     def __init__(self, wait_cond):
         reasons = wait_cond.get_status_reason(wait_cond.STATUS_FAILURE)
@@ -200,6 +275,7 @@ class SwiftSignal(resource.Resource):
         super(SwiftSignal, self).__init__(name, json_snippet, stack)
         self._obj_name = None
         self._url = None
+        self._watcher = None
 
     @property
     def url(self):
@@ -231,31 +307,21 @@ class SwiftSignal(resource.Resource):
         return started_at, float(self.properties[self.TIMEOUT])
 
     def get_signals(self):
-        try:
-            container = self.client().get_container(self.stack.id)
-        except Exception as exc:
-            self.client_plugin().ignore_not_found(exc)
-            return
-
-        index = container[1]
-        if not index:  # Swift objects were deleted by user
+        if self._watcher is None:
+            self._watcher = ContainerWatcher.get(self.stack.id)
+        objects = self._watcher.read(self.name, self.client(),
+                                     self.client_plugin())
+        if objects is None:
             return None
 
         # Remove objects in that are for other handle resources, since
         # multiple SwiftSignalHandle resources in the same stack share
         # a container
-        filtered = [obj for obj in index if self.obj_name in obj['name']]
+        filtered = [body for name, body in objects if self.obj_name in name]
 
-        # Fetch objects from Swift and filter results
+        # Filter results
         obj_bodies = []
-        for obj in filtered:
-            try:
-                signal = self.client().get_object(self.stack.id, obj['name'])
-            except Exception as exc:
-                self.client_plugin().ignore_not_found()
-                continue
-
-            body = signal[1]
+        for body in filtered:
             if body == swift.IN_PROGRESS:  # Ignore the initial object
                 continue
             if body == "":
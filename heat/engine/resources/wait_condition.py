@@ -31,6 +31,9 @@ class BaseWaitConditionHandle(signal_responder.SignalResponder):
     '''
     properties_schema = {}
 
+    # the wait condition waits for the handle to be signalled
+    signal_wakes_waiters = True
+
     WAIT_STATUSES = (
         STATUS_FAILURE,
         STATUS_SUCCESS,
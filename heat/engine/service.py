@@ -48,17 +48,21 @@ from heat.engine import service_stack_watch
 from heat.engine import stack as parser
 from heat.engine import stack_lock
 from heat.engine import template as templatem
+from heat.engine import wakeup
 from heat.engine import watchrule
 from heat.openstack.common import log as logging
 from heat.openstack.common import service
 from heat.openstack.common import threadgroup
 from heat.rpc import api as rpc_api
+from heat.rpc import client as rpc_client
 
 cfg.CONF.import_opt('engine_life_check_timeout', 'heat.common.config')
 cfg.CONF.import_opt('max_resources_per_stack', 'heat.common.config')
 cfg.CONF.import_opt('max_stacks_per_tenant', 'heat.common.config')
 cfg.CONF.import_opt('enable_stack_abandon', 'heat.common.config')
 cfg.CONF.import_opt('enable_stack_adopt', 'heat.common.config')
+cfg.CONF.import_opt('metadata_push_delay', 'heat.common.config')
+cfg.CONF.import_opt('metadata_push_retries', 'heat.common.config')
 
 LOG = logging.getLogger(__name__)
 
@@ -223,7 +227,7 @@ class EngineListener(service.Service):
     engines to communicate with each other for multi-engine support.
     '''
 
-    ACTIONS = (STOP_STACK, SEND) = ('stop_stack', 'send')
+    ACTIONS = (STOP_STACK, SEND, WAKE) = ('stop_stack', 'send', 'wake')
 
     def __init__(self, host, engine_id, thread_group_mgr):
         super(EngineListener, self).__init__()
@@ -254,6 +258,69 @@ class EngineListener(service.Service):
         stack_id = stack_identity['stack_id']
         self.thread_group_mgr.send(stack_id, message)
 
+    def wake(self, ctxt, key):
+        '''Wake a resource waiting for a signal in this engine.'''
+        wakeup.waiters.wake(key)
+
+
+class MetadataPushQueue(object):
+    '''Push the software deployment metadata of servers in the background.
+
+    Pushes for a server are delayed by metadata_push_delay seconds, so that
+    a burst of deployment changes results in a single push. Only one push
+    runs at a time for each server; changes made while it runs are pushed
+    again once it finishes. Failed pushes are retried with an increasing
+    delay.
+    '''
+
+    def __init__(self, push_func):
+        self.push_func = push_func
+        self.pending = {}
+        self.running = set()
+
+    def push(self, cnxt, server_id):
+        '''Schedule a push of the metadata of a server.'''
+        scheduled = server_id in self.pending
+        # The latest context is used for the push
+        self.pending[server_id] = cnxt
+        if not scheduled and server_id not in self.running:
+            eventlet.spawn_after(cfg.CONF.metadata_push_delay,
+                                 self._run, server_id)
+
+    def flush(self):
+        '''Push the metadata of all servers with pushes scheduled.'''
+        for server_id in list(self.pending):
+            if server_id not in self.running:
+                self._run(server_id, delay=False)
+
+    def _run(self, server_id, delay=True):
+        self.running.add(server_id)
+        try:
+            while server_id in self.pending:
+                cnxt = self.pending.pop(server_id)
+                self._push_with_retries(cnxt, server_id)
+                if delay and server_id in self.pending:
+                    eventlet.sleep(cfg.CONF.metadata_push_delay)
+        finally:
+            self.running.discard(server_id)
+
+    def _push_with_retries(self, cnxt, server_id):
+        retries = cfg.CONF.metadata_push_retries
+        for attempt in six.moves.xrange(retries + 1):
+            try:
+                self.push_func(cnxt, server_id)
+                return
+            except Exception as ex:
+                if attempt == retries:
+                    LOG.error(_LE('Failed to push metadata of server '
+                                  '%(server)s: %(err)s'),
+                              {'server': server_id, 'err': ex})
+                    return
+                LOG.warn(_LW('Failed to push metadata of server %(server)s, '
+                             'retrying: %(err)s'),
+                         {'server': server_id, 'err': ex})
+                eventlet.sleep(2 ** attempt)
+
 
 @profiler.trace_cls("rpc")
 class EngineService(service.Service):
@@ -283,6 +350,10 @@ class EngineService(service.Service):
         self.thread_group_mgr = None
         self.target = None
 
+        self.metadata_push_queue = MetadataPushQueue(
+            self._push_metadata_software_deployments)
+        self.http_session = requests.Session()
+
         if cfg.CONF.instance_user:
             warnings.warn('The "instance_user" option in heat.conf is '
                           'deprecated and will be removed in the Juno '
@@ -311,6 +382,8 @@ class EngineService(service.Service):
         for s in stacks:
             self.stack_watch.start_watch_task(s.id, admin_context)
 
+        self.stack_watch.start_prune_task()
+
     def start(self):
         self.engine_id = stack_lock.StackLock.generate_engine_id()
         self.thread_group_mgr = ThreadGroupManager()
@@ -326,12 +399,17 @@ class EngineService(service.Service):
         server.start()
         self._client = rpc_messaging.get_rpc_client(
             version=self.RPC_API_VERSION)
+        rpc_client.set_local_engine(self)
 
         super(EngineService, self).start()
 
     def stop(self):
         # Stop rpc connection at first for preventing new requests
         LOG.info(_LI("Attempting to stop engine service..."))
+        rpc_client.set_local_engine(None)
+
+        # Push any metadata changes still waiting to be pushed
+        self.metadata_push_queue.flush()
         try:
             self.conn.close()
         except Exception:
@@ -814,6 +892,41 @@ class EngineService(service.Service):
         except messaging.MessagingTimeout:
             return False
 
+    def _wake_waiter(self, cnxt, physical_resource_id, stack=None):
+        """Wake the resource waiting for a signal, wherever it is running.
+
+        The resource is woken directly if it is waiting in this engine,
+        otherwise the engine holding the lock on its stack (or one of the
+        stack's parents) is asked to wake it. If the stack of the signalled
+        resource is already loaded, it may be passed to save looking it up.
+        """
+        if wakeup.waiters.wake(physical_resource_id):
+            return
+        if self.listener is None:
+            return
+
+        if stack is not None:
+            stack_id, owner_id = stack.id, stack.owner_id
+        else:
+            rs = db_api.resource_get_by_physical_resource_id(
+                cnxt, physical_resource_id)
+            stack_id, owner_id = (rs.stack_id if rs is not None else None,
+                                  None)
+        while stack_id is not None:
+            engine_id = db_api.stack_lock_get_engine_id(stack_id)
+            if engine_id is not None:
+                if engine_id != self.engine_id:
+                    cctxt = self._client.prepare(version='1.0',
+                                                 topic=engine_id)
+                    cctxt.cast(cnxt, self.listener.WAKE,
+                               key=physical_resource_id)
+                return
+            if owner_id is not None:
+                stack_id, owner_id = owner_id, None
+            else:
+                s = db_api.stack_get(cnxt, stack_id, tenant_safe=False)
+                stack_id = s.owner_id if s is not None else None
+
     @request_context
     def delete_stack(self, cnxt, stack_identity):
         """
@@ -1051,6 +1164,11 @@ class EngineService(service.Service):
             LOG.debug("signaling resource %s:%s" % (stack.name, rsrc.name))
             rsrc.signal(details)
 
+            # Wake any resource (e.g. a wait condition) waiting for the
+            # signal, instead of leaving it to find the signal by polling
+            if rsrc.signal_wakes_waiters and rsrc.resource_id is not None:
+                self._wake_waiter(cnxt, rsrc.resource_id, stack)
+
             # Refresh the metadata for all other resources, since signals can
             # update metadata which is used by other resources, e.g
             # when signalling a WaitConditionHandle resource, and other
@@ -1274,23 +1392,11 @@ class EngineService(service.Service):
         This could be used by CloudWatch and WaitConditions
         and treat HA service events like any other CloudWatch.
         '''
-        def get_matching_watches():
-            if watch_name:
-                yield watchrule.WatchRule.load(cnxt, watch_name)
-            else:
-                for wr in db_api.watch_rule_get_all(cnxt):
-                    if watchrule.rule_can_use_sample(wr, stats_data):
-                        yield watchrule.WatchRule.load(cnxt, watch=wr)
-
-        rule_run = False
-        for rule in get_matching_watches():
+        if watch_name:
+            rule = watchrule.WatchRule.load(cnxt, watch_name)
             rule.create_watch_data(stats_data)
-            rule_run = True
-
-        if not rule_run:
-            if watch_name is None:
-                watch_name = 'Unknown'
-            raise exception.WatchRuleNotFound(watch_name=watch_name)
+        elif not watchrule.create_watch_data(cnxt, stats_data):
+            raise exception.WatchRuleNotFound(watch_name='Unknown')
 
         return stats_data
 
@@ -1424,7 +1530,8 @@ class EngineService(service.Service):
                 break
         if metadata_put_url:
             json_md = jsonutils.dumps(md)
-            requests.put(metadata_put_url, json_md)
+            resp = self.http_session.put(metadata_put_url, json_md)
+            resp.raise_for_status()
 
     @request_context
     def show_software_deployment(self, cnxt, deployment_id):
@@ -1445,7 +1552,7 @@ class EngineService(service.Service):
             'action': action,
             'status': status,
             'status_reason': status_reason})
-        self._push_metadata_software_deployments(cnxt, server_id)
+        self.metadata_push_queue.push(cnxt, server_id)
         return api.format_software_deployment(sd)
 
     @request_context
@@ -1471,7 +1578,12 @@ class EngineService(service.Service):
         # only push metadata if this update resulted in the config_id
         # changing, since metadata is just a list of configs
         if config_id:
-            self._push_metadata_software_deployments(cnxt, sd.server_id)
+            self.metadata_push_queue.push(cnxt, sd.server_id)
+
+        # wake the deployment resource, which is waiting for its status to
+        # change
+        if status:
+            self._wake_waiter(cnxt, deployment_id)
 
         return api.format_software_deployment(sd)
 
@@ -11,6 +11,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from oslo.config import cfg
 from oslo.utils import timeutils
 
 from heat.common import context
@@ -28,6 +29,7 @@ LOG = logging.getLogger(__name__)
 class StackWatch(object):
     def __init__(self, thread_group_mgr):
         self.thread_group_mgr = thread_group_mgr
+        self.last_prune = None
 
     def start_watch_task(self, stack_id, cnxt):
 
@@ -105,3 +107,27 @@ class StackWatch(object):
         sid = stack ID
         """
         self.check_stack_watches(sid)
+
+    def start_prune_task(self):
+        """
+        Run periodic_prune_task alongside the other non-stack-specific
+        housekeeping tasks, unless disabled by watch_data_prune_interval.
+        """
+        if cfg.CONF.watch_data_prune_interval > 0:
+            self.thread_group_mgr.add_timer(cfg.CONF.periodic_interval,
+                                            self.periodic_prune_task)
+
+    def periodic_prune_task(self):
+        """
+        Periodic task rolling up and pruning old watch data, every
+        watch_data_prune_interval seconds.
+        """
+        if (self.last_prune is not None and
+                not timeutils.is_older_than(
+                    self.last_prune, cfg.CONF.watch_data_prune_interval)):
+            return
+        self.last_prune = timeutils.utcnow()
+        try:
+            watchrule.prune_watch_data(context.get_admin_context())
+        except Exception:
+            LOG.exception(_LE('Failed to prune watch data'))
@@ -37,9 +37,14 @@ class SignalResponder(stack_user.StackUser):
     # API operations as a consequence of handling a signal
     requires_deferred_auth = True
 
+    provision_credentials = True
+
     def handle_create(self):
-        super(SignalResponder, self).handle_create()
-        self._create_keypair()
+        # The stack may already have created the user and keypair
+        if self.data().get('user_id') is None:
+            super(SignalResponder, self).handle_create()
+        if self.data().get('credential_id') is None:
+            self._create_keypair()
 
     def handle_delete(self):
         super(SignalResponder, self).handle_delete()
@@ -17,6 +17,7 @@ import datetime
 import re
 import warnings
 
+import eventlet
 from oslo.config import cfg
 from oslo.utils import encodeutils
 from osprofiler import profiler
@@ -31,6 +32,8 @@ from heat.common.i18n import _LW
 from heat.common import identifier
 from heat.common import lifecycle_plugin_utils
 from heat.db import api as db_api
+from heat.engine import attributes
+from heat.engine import constraints
 from heat.engine import dependencies
 from heat.engine import environment
 from heat.engine import function
@@ -45,6 +48,8 @@ from heat.openstack.common import log as logging
 from heat.rpc import api as rpc_api
 
 cfg.CONF.import_opt('error_wait_time', 'heat.common.config')
+cfg.CONF.import_opt('max_concurrent_validations', 'heat.common.config')
+cfg.CONF.import_opt('max_concurrent_outputs', 'heat.common.config')
 
 LOG = logging.getLogger(__name__)
 
@@ -112,6 +117,7 @@ class Stack(collections.Mapping):
         self._dependencies = None
         self._access_allowed_handlers = {}
         self._db_resources = None
+        self.resource_rows = {}
         self.adopt_stack_data = adopt_stack_data
         self.stack_user_project_id = stack_user_project_id
         self.created_time = created_time
@@ -321,6 +327,7 @@ class Stack(collections.Mapping):
             'backup': backup,
             'nested_depth': self.nested_depth
         }
+        store_resources = False
         if self.id:
             db_api.stack_update(self.context, self.id, s)
         else:
@@ -339,11 +346,49 @@ class Stack(collections.Mapping):
             new_s = db_api.stack_create(self.context, s)
             self.id = new_s.id
             self.created_time = new_s.created_at
+            # Nested stacks may hold many resources, so create their rows
+            # up front instead of one at a time as each is created
+            store_resources = self.owner_id is not None and not backup
 
         self._set_param_stackid()
+        if store_resources:
+            self._store_resources()
 
         return self.id
 
+    def _store_resources(self, resources=None):
+        '''
+        Create the DB rows for all of the stack's resources in one batch.
+
+        This avoids a separate INSERT per resource for large nested stacks;
+        the rows start out in the INIT/COMPLETE state, with their metadata
+        left to be resolved when each resource is created. If resources is
+        given, only the rows for those resources are created.
+        '''
+        if resources is None:
+            resources = self.resources.itervalues()
+        new_resources = []
+        values = []
+        for res in resources:
+            if res.id is not None:
+                continue
+            try:
+                values.append(res._db_values(resolve_metadata=False))
+            except Exception:
+                # leave it to be stored, and the error reported, when the
+                # resource itself is created
+                continue
+            new_resources.append(res)
+        if not new_resources:
+            return
+        try:
+            rows = db_api.resource_create_all(self.context, values)
+        except Exception as ex:
+            LOG.error(_LE('DB error %s'), ex)
+            return
+        for res, rs in zip(new_resources, rows):
+            res._stored(rs)
+
     def _backup_name(self):
         return '%s*' % self.name
 
@@ -475,18 +520,12 @@ class Stack(collections.Mapping):
             raise exception.StackValidationFailed(
                 message=_("Duplicate names %s") % dup_names)
 
-        for res in self.dependencies:
-            try:
-                result = res.validate()
-            except exception.HeatException as ex:
-                LOG.info(ex)
-                raise ex
-            except Exception as ex:
-                LOG.exception(ex)
-                raise exception.StackValidationFailed(
-                    message=encodeutils.safe_decode(six.text_type(ex)))
-            if result:
-                raise exception.StackValidationFailed(message=result)
+        max_concurrency = cfg.CONF.max_concurrent_validations
+        if max_concurrency > 1:
+            self._validate_resources_concurrently(max_concurrency)
+        else:
+            for res in self.dependencies:
+                self._validate_resource(res)
 
         for val in self.outputs.values():
             try:
@@ -505,6 +544,54 @@ class Stack(collections.Mapping):
                            '%s') % six.text_type(ex)
                 raise exception.StackValidationFailed(message=reason)
 
+    @staticmethod
+    def _validate_resource(res):
+        try:
+            result = res.validate()
+        except exception.HeatException as ex:
+            LOG.info(ex)
+            raise ex
+        except Exception as ex:
+            LOG.exception(ex)
+            raise exception.StackValidationFailed(
+                message=encodeutils.safe_decode(six.text_type(ex)))
+        if result:
+            raise exception.StackValidationFailed(message=result)
+
+    def _validate_resources_concurrently(self, max_concurrency):
+        '''
+        Validate the resources on a bounded pool of greenthreads.
+
+        Custom constraint checks are shared, through the context, with any
+        nested stacks validated as part of the same run, so that identical
+        checks are only performed once. All of the resources are validated
+        and any errors are reported together, in dependency order.
+        '''
+        owns_cache = getattr(self.context, 'constraint_cache', None) is None
+        if owns_cache:
+            self.context.constraint_cache = constraints.ConstraintCache(
+                max_concurrency)
+
+        def validate(res):
+            try:
+                self._validate_resource(res)
+            except exception.HeatException as ex:
+                return ex
+
+        try:
+            pool = eventlet.GreenPool(max_concurrency)
+            errors = [ex for ex in pool.imap(validate, self.dependencies)
+                      if ex is not None]
+        finally:
+            if owns_cache:
+                self.context.constraint_cache = None
+
+        if len(errors) == 1:
+            raise errors[0]
+        elif errors:
+            message = '\n'.join(six.text_type(ex) for ex in errors)
+            raise exception.StackValidationFailed(message=message)
+
     def requires_deferred_auth(self):
         '''
         Returns whether this stack may need to perform API requests
@@ -529,11 +616,8 @@ class Stack(collections.Mapping):
         if self.id is None:
             return
 
-        stack = db_api.stack_get(self.context, self.id)
-        if stack is not None:
-            stack.update_and_save({'action': action,
-                                   'status': status,
-                                   'status_reason': reason})
+        if db_api.stack_update_state(self.context, self.id,
+                                     action, status, reason):
             LOG.info(_LI('Stack %(action)s %(status)s (%(name)s): '
                          '%(reason)s'),
                      {'action': action,
@@ -541,6 +625,10 @@ class Stack(collections.Mapping):
                       'name': self.name,
                       'reason': reason})
             notification.send(self)
+            if status != self.IN_PROGRESS:
+                LOG.debug('Attribute cache for stack %(name)s: %(stats)s'
+                          % {'name': self.name,
+                             'stats': self.attribute_cache_stats()})
 
     @property
     def state(self):
@@ -606,6 +694,9 @@ class Stack(collections.Mapping):
         self.state_set(action, self.IN_PROGRESS,
                        'Stack %s started' % action)
 
+        if action == self.CREATE:
+            self._provision_stack_users()
+
         stack_status = self.COMPLETE
         reason = 'Stack %s completed successfully' % action
 
@@ -643,6 +734,85 @@ class Stack(collections.Mapping):
         lifecycle_plugin_utils.do_post_ops(self.context, self, None, action,
                                            (self.status == self.FAILED))
 
+    def _provision_stack_users(self):
+        '''
+        Create the users and ec2 keypairs of the stack's signal responders.
+
+        Otherwise each resource makes its own Keystone calls in turn as it
+        is created. Here the calls are made on up to
+        max_concurrent_stack_users greenthreads, while the results are
+        stored afterwards from this one. Any user that cannot be created is
+        left for its resource to create, and report errors for, itself.
+        '''
+        max_concurrency = cfg.CONF.max_concurrent_stack_users
+        if max_concurrency <= 0:
+            return
+        pending = [res for res in self.resources.itervalues()
+                   if getattr(res, 'provision_credentials', False) and
+                   res.state == (res.INIT, res.COMPLETE)]
+        if len(pending) < 2:
+            return
+
+        self._store_resources(pending)
+        pending = [res for res in pending if res.id is not None and
+                   res.data().get('user_id') is None]
+        if not pending:
+            return
+        if not self.stack_user_project_id:
+            try:
+                self.create_stack_user_project_id()
+            except Exception as ex:
+                LOG.warn(_LW('Failed to create stack user project: %s'), ex)
+                return
+
+        def create(res):
+            return res._create_credentials()
+
+        # Create the first user on its own, so that the Keystone client is
+        # fully set up before it is shared between greenthreads
+        credentials = [create(pending[0])]
+        pool = eventlet.GreenPool(max_concurrency)
+        credentials.extend(pool.imap(create, pending[1:]))
+        for res, (user_id, kp) in zip(pending, credentials):
+            res._store_credentials(user_id, kp)
+
+    def _release_stack_users(self):
+        '''
+        Delete the users of the stack's signal responders concurrently.
+
+        The counterpart of _provision_stack_users(), called before the
+        resources are deleted. Each resource still removes its own data,
+        and deletes any user that could not be deleted here. The exception
+        is a resource that was never created (e.g. because the stack create
+        failed first), since deleting it does nothing; its user is always
+        deleted here.
+        '''
+        def will_delete(res):
+            return (getattr(res, 'provision_credentials', False) and
+                    (res.action != res.INIT or
+                     res.data().get('user_id') is not None) and
+                    res.state != (res.DELETE, res.COMPLETE) and
+                    not res.abandon_in_progress and
+                    res.t.deletion_policy() == res.t.DELETE)
+
+        pending = [res for res in self.resources.itervalues()
+                   if will_delete(res)]
+        max_concurrency = cfg.CONF.max_concurrent_stack_users
+        if max_concurrency <= 0 or len(pending) < 2:
+            for res in pending:
+                if res.action == res.INIT:
+                    res._delete_credentials()
+            return
+
+        def delete(res):
+            res._delete_credentials()
+
+        delete(pending[0])
+        pool = eventlet.GreenPool(max_concurrency)
+        for res in pending[1:]:
+            pool.spawn_n(delete, res)
+        pool.waitall()
+
     @profiler.trace('Stack.check', hide_args=False)
     def check(self):
         self.updated_time = datetime.datetime.utcnow()
@@ -991,6 +1161,7 @@ class Stack(collections.Mapping):
                                e.args[0] if e.args else
                                'Failed stack pre-ops: %s' % six.text_type(e))
                 return
+        self._release_stack_users()
         action_task = scheduler.DependencyTaskGroup(self.dependencies,
                                                     resource.Resource.destroy,
                                                     reverse=True)
@@ -1129,6 +1300,28 @@ class Stack(collections.Mapping):
             self.outputs[key]['error_msg'] = six.text_type(ex)
             return None
 
+    def resolve_outputs(self, keys):
+        '''
+        Get the values of the specified stack outputs, in the same order.
+
+        Resource attributes are resolved only once, however many outputs
+        refer to them, and up to max_concurrent_outputs outputs are resolved
+        concurrently on a pool of greenthreads.
+        '''
+        owns_memo = getattr(self.context, 'attribute_memo', None) is None
+        if owns_memo:
+            self.context.attribute_memo = attributes.AttributeMemo()
+
+        try:
+            max_concurrency = cfg.CONF.max_concurrent_outputs
+            if max_concurrency > 0 and len(keys) > 1:
+                pool = eventlet.GreenPool(max_concurrency)
+                return list(pool.imap(self.output, keys))
+            return [self.output(key) for key in keys]
+        finally:
+            if owns_memo:
+                self.context.attribute_memo = None
+
     def restart_resource(self, resource_name):
         '''
         stop resource_name and all that depend on it
@@ -1203,11 +1396,52 @@ class Stack(collections.Mapping):
                       DeprecationWarning)
         return function.resolve(snippet)
 
-    def reset_resource_attributes(self):
+    def reset_resource_attributes(self, resource=None):
+        '''
+        Discard the resolved attribute values of resources.
+
+        If a resource is specified, only the attributes which a change in that
+        resource may affect are discarded: those of the resource itself, of
+        the resources that require it, directly or not, and of the resources
+        it requires directly (which it may act on, e.g. by attaching to them).
+        Otherwise the attributes of every resource are discarded.
+        '''
         # nothing is cached if no resources exist
         if not self._resources:
             return
-        # a change in some resource may have side-effects in the attributes
-        # of other resources, so ensure that attributes are re-calculated
-        for res in self.resources.itervalues():
+
+        affected = None
+        if resource is not None:
+            try:
+                affected = self._attributes_affected_by(resource)
+            except KeyError:
+                # not part of the current dependency graph
+                pass
+
+        if affected is None:
+            affected = self.resources.itervalues()
+        for res in affected:
             res.attributes.reset_resolved_values()
+
+    def _attributes_affected_by(self, resource):
+        deps = self.dependencies
+        affected = set(deps.requires(resource))
+        affected.add(resource)
+        pending = [resource]
+        while pending:
+            for requirer in deps.required_by(pending.pop()):
+                if requirer not in affected:
+                    affected.add(requirer)
+                    pending.append(requirer)
+        return affected
+
+    def attribute_cache_stats(self):
+        '''
+        Return the number of lookups of resource attributes in this stack
+        which were, and were not, served from resolved values.
+        '''
+        hits = misses = 0
+        for res in six.itervalues(self._resources or {}):
+            hits += res.attributes.hits
+            misses += res.attributes.misses
+        return {'hits': hits, 'misses': misses}
@@ -242,8 +242,13 @@ class StackResource(resource.Resource):
         return done
 
     def update_with_template(self, child_template, user_params=None,
-                             timeout_mins=None):
-        """Update the nested stack with the new template."""
+                             timeout_mins=None, validate=True):
+        """Update the nested stack with the new template.
+
+        Validation of the new nested stack may be skipped when the caller
+        knows that every resource definition in it has been validated
+        already.
+        """
         nested_stack = self.nested()
         if nested_stack is None:
             raise exception.Error(_('Cannot update %s, stack not created')
@@ -252,7 +257,8 @@ class StackResource(resource.Resource):
         name = self.physical_resource_name()
         stack = self._parse_nested_stack(name, child_template, user_params,
                                          timeout_mins)
-        stack.validate()
+        if validate:
+            stack.validate()
         stack.parameters.set_stack_id(nested_stack.identifier())
         nested_stack.updated_time = self.updated_time
         updater = scheduler.TaskRunner(nested_stack.update_task, stack)
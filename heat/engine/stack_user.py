@@ -28,8 +28,17 @@ class StackUser(resource.Resource):
     # Subclasses create a user, and optionally keypair associated with a
     # resource in a stack. Users are created  in the heat stack user domain
     # (in a project specific to the stack)
+
+    # Set by subclasses whose handle_create() creates a user without a
+    # password and an ec2 keypair for it, and skips whichever of them is
+    # already stored. The stack may then create them in advance, together
+    # with those of other resources; see Stack._provision_stack_users().
+    provision_credentials = False
+
     def __init__(self, name, json_snippet, stack):
         super(StackUser, self).__init__(name, json_snippet, stack)
+        # Set when the stack has already deleted the user for us
+        self._user_deleted = False
 
     def handle_create(self):
         self._create_user()
@@ -50,6 +59,41 @@ class StackUser(resource.Resource):
         # Store the ID in resource data, for compatibility with SignalResponder
         self.data_set('user_id', user_id)
 
+    def _create_credentials(self):
+        '''
+        Create the user and an ec2 keypair for it, without storing them.
+
+        Only Keystone is called, so this may run in a greenthread alongside
+        other resources of the stack. Returns a (user_id, keypair) tuple, in
+        which either is None if it could not be created.
+        '''
+        project_id = self.stack.stack_user_project_id
+        try:
+            user_id = self.keystone().create_stack_domain_user(
+                username=self.physical_resource_name(),
+                password=getattr(self, 'password', None),
+                project_id=project_id)
+        except Exception as ex:
+            LOG.warn(_LW('Failed to create user for %(res)s: %(err)s'),
+                     {'res': self.name, 'err': ex})
+            return None, None
+
+        try:
+            kp = self.keystone().create_stack_domain_user_keypair(
+                user_id=user_id, project_id=project_id)
+        except Exception as ex:
+            LOG.warn(_LW('Failed to create ec2 keypair for %(res)s: '
+                         '%(err)s'), {'res': self.name, 'err': ex})
+            kp = None
+        return user_id, kp or None
+
+    def _store_credentials(self, user_id, kp):
+        '''Store the credentials returned by _create_credentials().'''
+        if user_id is not None:
+            self.data_set('user_id', user_id)
+        if kp is not None:
+            self._store_keypair(kp)
+
     def _user_token(self):
         project_id = self.stack.stack_user_project_id
         if not project_id:
@@ -86,6 +130,12 @@ class StackUser(resource.Resource):
         user_id = self._get_user_id()
         if user_id is None:
             return
+        if not self._user_deleted:
+            self._delete_keystone_user(user_id)
+        for data_key in ('credential_id', 'access_key', 'secret_key'):
+            self.data_delete(data_key)
+
+    def _delete_keystone_user(self, user_id):
         try:
             self.keystone().delete_stack_domain_user(
                 user_id=user_id, project_id=self.stack.stack_user_project_id)
@@ -101,8 +151,24 @@ class StackUser(resource.Resource):
                 self.keystone().delete_stack_user(user_id)
             except kc_exception.NotFound:
                 pass
-        for data_key in ('credential_id', 'access_key', 'secret_key'):
-            self.data_delete(data_key)
+
+    def _delete_credentials(self):
+        '''
+        Delete the user from Keystone ahead of the resource itself.
+
+        Like _create_credentials(), this only calls Keystone. The resource
+        data is cleaned up when the resource is deleted.
+        '''
+        user_id = self.data().get('user_id')
+        if user_id is None:
+            return
+        try:
+            self._delete_keystone_user(user_id)
+        except Exception as ex:
+            LOG.warn(_LW('Failed to delete user for %(res)s: %(err)s'),
+                     {'res': self.name, 'err': ex})
+        else:
+            self._user_deleted = True
 
     def handle_suspend(self):
         user_id = self._get_user_id()
@@ -133,17 +199,20 @@ class StackUser(resource.Resource):
             raise exception.Error(_("Error creating ec2 keypair for user %s") %
                                   user_id)
         else:
-            try:
-                credential_id = kp.id
-            except AttributeError:
-                # keystone v2 keypairs do not have an id attribute. Use the
-                # access key instead.
-                credential_id = kp.access
-            self.data_set('credential_id', credential_id, redact=True)
-            self.data_set('access_key', kp.access, redact=True)
-            self.data_set('secret_key', kp.secret, redact=True)
+            self._store_keypair(kp)
         return kp
 
+    def _store_keypair(self, kp):
+        try:
+            credential_id = kp.id
+        except AttributeError:
+            # keystone v2 keypairs do not have an id attribute. Use the
+            # access key instead.
+            credential_id = kp.access
+        self.data_set('credential_id', credential_id, redact=True)
+        self.data_set('access_key', kp.access, redact=True)
+        self.data_set('secret_key', kp.secret, redact=True)
+
     def _delete_keypair(self):
         # Subclasses may optionally call this to delete a keypair created
         # via _create_keypair
@@ -15,13 +15,16 @@ import abc
 import collections
 import copy
 import functools
+import hashlib
 
+from oslo.serialization import jsonutils
 import six
 from stevedore import extension
 
 from heat.common import exception
 from heat.common.i18n import _
 from heat.db import api as db_api
+from heat.engine import function
 from heat.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
@@ -31,6 +34,31 @@ __all__ = ['Template']
 
 _template_classes = None
 
+# The maximum number of (template, parameters) combinations for which the
+# results of static functions are cached.
+COMPILED_CACHE_SIZE = 64
+
+_compiled = collections.OrderedDict()
+
+
+def _compiled_snippets(template_key, parameters_key):
+    """
+    Return the cache of static function results for a template.
+
+    The cache is a dict mapping the serialised form of each static function
+    to its result; it is shared by every stack using a template with the same
+    contents and the same parameter values.
+    """
+    key = (template_key, parameters_key)
+    try:
+        snippets = _compiled.pop(key)
+    except KeyError:
+        snippets = {}
+        if len(_compiled) >= COMPILED_CACHE_SIZE:
+            _compiled.popitem(last=False)
+    _compiled[key] = snippets
+    return snippets
+
 
 def get_version(template_data, available_versions):
     version_keys = set(key for key, version in available_versions)
@@ -113,9 +141,19 @@ class Template(collections.Mapping):
         self.id = template_id
         self.t = template
         self.files = files or {}
+        self._content_key = None
         self.maps = self[self.MAPPINGS]
         self.version = get_version(self.t, _template_classes.keys())
 
+    @property
+    def files(self):
+        return self._files
+
+    @files.setter
+    def files(self, files):
+        self._files = files
+        self._content_key = None
+
     def __deepcopy__(self, memo):
         return Template(copy.deepcopy(self.t, memo), files=self.files)
 
@@ -137,6 +175,7 @@ class Template(collections.Mapping):
             self.id = new_rt.id
         else:
             db_api.raw_template_update(context, self.id, rt)
+        self._content_key = None
         return self.id
 
     def __iter__(self):
@@ -177,7 +216,33 @@ class Template(collections.Mapping):
         self.t.get(self.RESOURCES, {}).pop(name)
 
     def parse(self, stack, snippet):
-        return parse(self.functions, stack, snippet)
+        return parse(self.functions, stack, snippet,
+                     self._compiled_snippets(stack))
+
+    def _compiled_snippets(self, stack):
+        """
+        Return the cache of static function results for a stack, if any.
+
+        Results are cached only for stored templates parsed in the context of
+        their own stack, since static functions may also refer to the
+        stack's template (e.g. to its mappings or files). The cache is keyed
+        by the contents of the template, so that a template updated elsewhere
+        (e.g. by another engine) is never served stale results.
+        """
+        if self.id is None or stack is None or stack.t is not self:
+            return None
+
+        fingerprint = getattr(stack.parameters, 'fingerprint', None)
+        if fingerprint is None:
+            return None
+
+        if self._content_key is None:
+            contents = jsonutils.dumps({'template': self.t,
+                                        'files': self.files},
+                                       sort_keys=True)
+            self._content_key = hashlib.sha256(
+                contents.encode('utf-8')).hexdigest()
+        return _compiled_snippets(self._content_key, fingerprint())
 
     def validate(self):
         '''Validate the template.
@@ -207,15 +272,45 @@ class Template(collections.Mapping):
                 raise exception.StackValidationFailed(message=message)
 
 
-def parse(functions, stack, snippet):
-    recurse = functools.partial(parse, functions, stack)
+def _can_compile(func):
+    try:
+        return function.is_static(func.args) and func.is_static()
+    except Exception:
+        return False
+
+
+def parse(functions, stack, snippet, compiled=None):
+    """
+    Parse a template snippet, replacing intrinsic functions with Function
+    objects.
+
+    Functions with static results are evaluated immediately and replaced by
+    Constants (see function.fold()), leaving only those that depend on the
+    state of resources to be resolved lazily. If a dict of previously
+    compiled results is passed, it is used (and updated) to avoid evaluating
+    the same static functions again.
+    """
+    recurse = functools.partial(parse, functions, stack, compiled=compiled)
 
     if isinstance(snippet, collections.Mapping):
         if len(snippet) == 1:
             fn_name, args = next(six.iteritems(snippet))
             Func = functions.get(fn_name)
             if Func is not None:
-                return Func(stack, fn_name, recurse(args))
+                func = Func(stack, fn_name, recurse(args))
+                if compiled is None or not _can_compile(func):
+                    return function.fold(func)
+
+                key = jsonutils.dumps(snippet, sort_keys=True)
+                # the cached results are shared, so each caller gets a copy
+                if key in compiled:
+                    return function.Constant(stack, fn_name, func.args,
+                                             copy.deepcopy(compiled[key]))
+
+                func = function.fold(func)
+                if isinstance(func, function.Constant):
+                    compiled[key] = copy.deepcopy(func.value)
+                return func
         return dict((k, recurse(v)) for k, v in six.iteritems(snippet))
     elif (not isinstance(snippet, six.string_types) and
           isinstance(snippet, collections.Iterable)):
@@ -0,0 +1,126 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Limit the number of resources being created at once in this engine.
+
+A resource takes a slot before it makes the call to create it and gives it
+back as soon as that call returns, without waiting for the create to
+complete. Limits may be set for the whole engine, for each stack
+and for each resource type. When a client reports that the cloud is over its
+rate limit, the limit for the resource type is halved, then raised again by
+one with each successful create of that type.
+"""
+
+import collections
+
+from oslo.config import cfg
+
+from heat.common.i18n import _LW
+from heat.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+cfg.CONF.import_opt('max_concurrent_creates', 'heat.common.config')
+cfg.CONF.import_opt('max_concurrent_creates_per_stack', 'heat.common.config')
+cfg.CONF.import_opt('max_concurrent_creates_by_type', 'heat.common.config')
+
+
+def _parse_type_limits(entries):
+    limits = {}
+    for entry in entries:
+        res_type, sep, limit = entry.rpartition('=')
+        try:
+            limits[res_type] = int(limit)
+        except ValueError:
+            LOG.warn(_LW('Invalid max_concurrent_creates_by_type entry '
+                         '"%s"'), entry)
+    return limits
+
+
+class CreateThrottle(object):
+    '''The resource creates in progress in this process.'''
+
+    def __init__(self):
+        self._active = collections.Counter()
+        self._adapted = {}
+        self._parsed_type_limits = None
+
+    def _type_limits(self):
+        # parsed again only when the option changes, so that an invalid
+        # entry is not reported on every attempt to take a slot
+        entries = tuple(cfg.CONF.max_concurrent_creates_by_type)
+        if (self._parsed_type_limits is None or
+                self._parsed_type_limits[0] != entries):
+            self._parsed_type_limits = (entries, _parse_type_limits(entries))
+        return self._parsed_type_limits[1]
+
+    def _type_limit(self, res_type):
+        limits = [l for l in (self._type_limits().get(res_type, 0),
+                              self._adapted.get(res_type, 0)) if l > 0]
+        return min(limits) if limits else 0
+
+    def _limits(self, stack_id, res_type):
+        return (
+            (('engine', None), cfg.CONF.max_concurrent_creates),
+            (('stack', stack_id), cfg.CONF.max_concurrent_creates_per_stack),
+            (('type', res_type), self._type_limit(res_type)),
+        )
+
+    def acquire(self, stack_id, res_type):
+        '''Take a slot to create a resource, if one is free.
+
+        Returns True if the slot was taken, in which case it must be given
+        back with release() once the create has finished.
+        '''
+        limits = self._limits(stack_id, res_type)
+        if any(0 < limit <= self._active[key] for key, limit in limits):
+            return False
+        for key, limit in limits:
+            self._active[key] += 1
+        return True
+
+    def release(self, stack_id, res_type):
+        '''Give back a slot taken with acquire().'''
+        for key, limit in self._limits(stack_id, res_type):
+            self._active[key] -= 1
+            if self._active[key] <= 0:
+                del self._active[key]
+
+    def over_limit(self, res_type):
+        '''Back off after a client reported that the cloud is over limit.'''
+        limit = (self._type_limit(res_type) or
+                 self._active[('type', res_type)])
+        self._adapted[res_type] = max(limit // 2, 1)
+        LOG.warn(_LW('Over limit creating %(type)s resources, allowing '
+                     '%(limit)d at once'),
+                 {'type': res_type, 'limit': self._adapted[res_type]})
+
+    def succeeded(self, res_type):
+        '''Raise the limit again after backing off.'''
+        if res_type not in self._adapted:
+            return
+        limit = self._adapted[res_type] + 1
+        configured = self._type_limits().get(res_type, 0)
+        if 0 < configured <= limit:
+            del self._adapted[res_type]
+        else:
+            self._adapted[res_type] = limit
+
+    def clear(self):
+        self._active.clear()
+        self._adapted.clear()
+        self._parsed_type_limits = None
+
+
+creates = CreateThrottle()
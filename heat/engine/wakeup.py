@@ -0,0 +1,58 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Wake resources that are waiting in this engine for a signal.
+
+A resource waiting for a signal watches a key (usually its physical resource
+ID) and only polls for the signal occasionally. When the signal is received,
+the key is woken so that the resource polls at its next check.
+"""
+
+
+class Waiters(object):
+    '''The keys being waited for by resources in this process.'''
+
+    def __init__(self):
+        self._woken = {}
+
+    def watch(self, key):
+        '''Start waiting for key to be woken.'''
+        self._woken[key] = False
+
+    def unwatch(self, key):
+        '''Stop waiting for key.'''
+        self._woken.pop(key, None)
+
+    def wake(self, key):
+        '''Wake any waiter for key.
+
+        Returns True if a resource in this process is waiting for key.
+        '''
+        if key not in self._woken:
+            return False
+        self._woken[key] = True
+        return True
+
+    def woken(self, key):
+        '''Return whether key has been woken since it was last checked.'''
+        if not self._woken.get(key):
+            return False
+        self._woken[key] = False
+        return True
+
+    def clear(self):
+        self._woken.clear()
+
+
+waiters = Waiters()
@@ -12,8 +12,11 @@
 #    under the License.
 
 
+import collections
+import copy
 import datetime
 
+from oslo.config import cfg
 from oslo.utils import timeutils
 
 from heat.common import exception
@@ -28,6 +31,9 @@ from heat.rpc import api as rpc_api
 
 LOG = logging.getLogger(__name__)
 
+ROLLUP_PERIOD = 60
+PRUNE_BATCH_SIZE = 1000
+
 
 class WatchRule(object):
     WATCH_STATES = (
@@ -68,6 +74,7 @@ class WatchRule(object):
         self.id = wid
         self.watch_data = watch_data or []
         self.last_evaluated = last_evaluated
+        self._stored_rule = copy.deepcopy(rule) if wid else None
 
     @classmethod
     def load(cls, context, watch_name=None, watch=None):
@@ -111,12 +118,17 @@ class WatchRule(object):
         else:
             db_api.watch_rule_update(self.context, self.id, wr_values)
 
+        if self.rule != self._stored_rule:
+            rule_index.invalidate()
+            self._stored_rule = copy.deepcopy(self.rule)
+
     def destroy(self):
         '''
         Delete the watchrule from the database.
         '''
         if self.id:
             db_api.watch_rule_delete(self.context, self.id)
+            rule_index.invalidate()
 
     def do_data_cmp(self, data, threshold):
         op = self.rule['ComparisonOperator']
@@ -355,6 +367,30 @@ class WatchRule(object):
         return actions
 
 
+def _rule_metric(wr):
+    '''
+    Return the metric name and the dimensions a watch rule accepts samples for.
+    '''
+    if wr.state == WatchRule.CEILOMETER_CONTROLLED:
+        metric = wr.rule['meter_name']
+        rule_dims = {}
+        for k, v in iter(wr.rule.get('matching_metadata', {}).items()):
+            name = k.split('.')[-1]
+            rule_dims[name] = v
+    else:
+        metric = wr.rule['MetricName']
+        rule_dims = dict((d['Name'], d['Value'])
+                         for d in wr.rule.get('Dimensions', []))
+    return metric, rule_dims
+
+
+def _sample_dimensions(sample):
+    data_dims = sample.get('Dimensions', {})
+    if isinstance(data_dims, list):
+        data_dims = data_dims[0] if data_dims else {}
+    return data_dims
+
+
 def rule_can_use_sample(wr, stats_data):
     def match_dimesions(rule, data):
         for k, v in iter(rule.items()):
@@ -366,16 +402,7 @@ def rule_can_use_sample(wr, stats_data):
 
     if wr.state == WatchRule.SUSPENDED:
         return False
-    if wr.state == WatchRule.CEILOMETER_CONTROLLED:
-        metric = wr.rule['meter_name']
-        rule_dims = {}
-        for k, v in iter(wr.rule.get('matching_metadata', {}).items()):
-            name = k.split('.')[-1]
-            rule_dims[name] = v
-    else:
-        metric = wr.rule['MetricName']
-        rule_dims = dict((d['Name'], d['Value'])
-                         for d in wr.rule.get('Dimensions', []))
+    metric, rule_dims = _rule_metric(wr)
 
     if metric not in stats_data:
         return False
@@ -384,9 +411,217 @@ def rule_can_use_sample(wr, stats_data):
         if k == 'Namespace':
             continue
         if k == metric:
-            data_dims = v.get('Dimensions', {})
-            if isinstance(data_dims, list):
-                data_dims = data_dims[0]
-            if match_dimesions(rule_dims, data_dims):
+            if match_dimesions(rule_dims, _sample_dimensions(v)):
                 return True
     return False
+
+
+class WatchRuleIndex(object):
+    '''
+    In-memory index of the watch rules able to use a metric sample.
+
+    Each rule is filed under its metric name and one of its dimensions, so
+    a sample only needs to be checked against the rules sharing its metric
+    name and one of its dimensions instead of against every rule. The index
+    is rebuilt when rules are created or deleted, whichever engine made the
+    change, and at least every MAX_AGE seconds so that rules modified by
+    another engine are picked up.
+    '''
+
+    MAX_AGE = 60
+
+    def __init__(self):
+        self.invalidate()
+
+    def invalidate(self):
+        self._rules = None
+        self._summary = None
+        self._built_at = None
+
+    def _build(self, context, summary):
+        rules = collections.defaultdict(set)
+        for wr in db_api.watch_rule_get_all(context):
+            try:
+                metric, rule_dims = _rule_metric(wr)
+            except (KeyError, TypeError):
+                LOG.debug('Not indexing watch rule %s' % wr.name)
+                continue
+            key = min(rule_dims.items()) if rule_dims else None
+            try:
+                hash(key)
+            except TypeError:
+                key = None
+            rules[(metric, key)].add(wr.id)
+        self._rules = rules
+        self._summary = summary
+        self._built_at = timeutils.utcnow()
+
+    def candidates(self, context, stats_data):
+        '''
+        Return the ids of the watch rules which may be able to use a sample.
+        '''
+        summary = tuple(db_api.watch_rule_summary(context))
+        if (self._rules is None or summary != self._summary or
+                timeutils.is_older_than(self._built_at, self.MAX_AGE)):
+            self._build(context, summary)
+
+        wids = set()
+        for metric, sample in iter(stats_data.items()):
+            if metric == 'Namespace':
+                continue
+            wids.update(self._rules.get((metric, None), ()))
+            for item in iter(_sample_dimensions(sample).items()):
+                try:
+                    wids.update(self._rules.get((metric, item), ()))
+                except TypeError:
+                    continue
+        return wids
+
+
+rule_index = WatchRuleIndex()
+
+
+def create_watch_data(context, stats_data):
+    '''
+    Store a sample against every watch rule able to use it, returning the
+    number of watch rules that accepted it.
+    '''
+    matched = 0
+    values_list = []
+    for wid in rule_index.candidates(context, stats_data):
+        wr = db_api.watch_rule_get(context, wid)
+        if wr is None or not rule_can_use_sample(wr, stats_data):
+            continue
+        matched += 1
+        if wr.state == WatchRule.CEILOMETER_CONTROLLED:
+            WatchRule.load(context, watch=wr).create_watch_data(stats_data)
+        else:
+            values_list.append({'data': stats_data, 'watch_rule_id': wr.id})
+
+    if values_list:
+        db_api.watch_data_create_all(context, values_list)
+        LOG.debug('new watch data for %(count)d rules: %(data)s'
+                  % {'count': len(values_list), 'data': stats_data})
+    return matched
+
+
+def _evaluation_window(rule):
+    periods = rule.get('EvaluationPeriods', rule.get('evaluation_periods', 1))
+    period = rule.get('Period', rule.get('period', 0))
+    return datetime.timedelta(seconds=int(periods) * int(period))
+
+
+def _aggregate(metric, samples, rollup=None):
+    namespace = None
+    unit = None
+    dims = None
+    values = []
+    if rollup is not None:
+        # merge with the aggregate already stored for the same minute
+        namespace = rollup.data.get('Namespace')
+        previous = rollup.data[metric]
+        unit = previous['Unit']
+        dims = previous['Dimensions'][0]
+    for wd in samples:
+        sample = wd.data.get(metric)
+        try:
+            values.append(float(sample['Value']))
+        except (KeyError, TypeError, ValueError):
+            continue
+        namespace = namespace or wd.data.get('Namespace')
+        unit = unit or sample.get('Unit')
+        sample_dims = _sample_dimensions(sample)
+        if dims is None:
+            dims = dict(sample_dims)
+        else:
+            dims = dict((k, v) for k, v in dims.items()
+                        if k in sample_dims and sample_dims[k] == v)
+    if not values:
+        return None
+
+    count = len(values)
+    total = sum(values)
+    minimum = min(values)
+    maximum = max(values)
+    if rollup is not None:
+        count += previous['SampleCount']
+        total += previous['Sum']
+        minimum = min(minimum, previous['Minimum'])
+        maximum = max(maximum, previous['Maximum'])
+
+    return {'Namespace': namespace,
+            metric: {'Unit': unit,
+                     'Value': total / count,
+                     'Dimensions': [dims],
+                     'SampleCount': count,
+                     'Sum': total,
+                     'Minimum': minimum,
+                     'Maximum': maximum}}
+
+
+def _rollup_watch_data(context, watch_rule_id, metric, before):
+    while True:
+        samples = db_api.watch_data_get_raw_before(context, watch_rule_id,
+                                                   before, PRUNE_BATCH_SIZE)
+        minutes = collections.OrderedDict()
+        for wd in samples:
+            minute = wd.created_at.replace(second=0, microsecond=0)
+            minutes.setdefault(minute, []).append(wd)
+        if len(samples) == PRUNE_BATCH_SIZE and len(minutes) > 1:
+            # the last minute may carry on into the next batch
+            minutes.popitem()
+        if not minutes:
+            return
+
+        # a minute with more samples than fit in a batch is rolled up in
+        # parts, each merged with the aggregate of the ones before
+        rollups = dict((wd.created_at, wd) for wd in
+                       db_api.watch_data_get_rollups(context, watch_rule_id,
+                                                     list(minutes)))
+        ids = []
+        values_list = []
+        for minute, minute_samples in minutes.items():
+            ids.extend(wd.id for wd in minute_samples)
+            rollup = rollups.get(minute)
+            data = _aggregate(metric, minute_samples, rollup)
+            if data is not None:
+                if rollup is not None:
+                    ids.append(rollup.id)
+                values_list.append({'data': data,
+                                    'watch_rule_id': watch_rule_id,
+                                    'period': ROLLUP_PERIOD,
+                                    'created_at': minute})
+        if not db_api.watch_data_rollup(context, ids, values_list):
+            LOG.debug('Watch data for rule %s is being rolled up elsewhere'
+                      % watch_rule_id)
+            return
+        if len(samples) < PRUNE_BATCH_SIZE:
+            return
+
+
+def prune_watch_data(context):
+    '''
+    Roll up the metric samples of each watch rule which are older than the
+    rule's evaluation window into per-minute aggregates, and delete metric
+    data older than watch_data_max_age days.
+    '''
+    now = timeutils.utcnow()
+    margin = datetime.timedelta(seconds=cfg.CONF.watch_data_rollup_margin)
+    for wr in db_api.watch_rule_get_all(context):
+        if wr.state == WatchRule.CEILOMETER_CONTROLLED:
+            continue
+        try:
+            window = _evaluation_window(wr.rule)
+            metric = _rule_metric(wr)[0]
+        except (KeyError, TypeError, ValueError):
+            LOG.warn(_LW('Not rolling up data of invalid watch rule %s'),
+                     wr.name)
+            continue
+        _rollup_watch_data(context, wr.id, metric, now - window - margin)
+
+    if cfg.CONF.watch_data_max_age > 0:
+        before = now - datetime.timedelta(days=cfg.CONF.watch_data_max_age)
+        while (db_api.watch_data_delete_before(context, before,
+                                               PRUNE_BATCH_SIZE) ==
+               PRUNE_BATCH_SIZE):
+            continue
@@ -81,6 +81,8 @@ class WaitConditionTest(common.HeatTestCase):
         super(WaitConditionTest, self).setUp()
         cfg.CONF.set_default('heat_waitcondition_server_url',
                              'http://server.test:8000/v1/waitcondition')
+        # Poll the handle at every check
+        cfg.CONF.set_override('signal_poll_interval', 0)
         self.stub_keystoneclient()
 
     def create_stack(self, stack_id=None,
@@ -528,6 +530,8 @@ class WaitConditionUpdateTest(common.HeatTestCase):
         super(WaitConditionUpdateTest, self).setUp()
         cfg.CONF.set_default('heat_waitcondition_server_url',
                              'http://server.test:8000/v1/waitcondition')
+        # Poll the handle at every check
+        cfg.CONF.set_override('signal_poll_interval', 0)
         self.stub_keystoneclient()
         scheduler.ENABLE_SLEEP = False
 
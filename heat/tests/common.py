@@ -26,6 +26,7 @@ import testtools
 
 from heat.common import context
 from heat.common import messaging
+from heat.common import policy
 from heat.engine.clients.os import cinder
 from heat.engine.clients.os import glance
 from heat.engine.clients.os import keystone
@@ -33,6 +34,11 @@ from heat.engine.clients.os import nova
 from heat.engine import environment
 from heat.engine import resources
 from heat.engine import scheduler
+from heat.engine import template
+from heat.engine import throttle
+from heat.engine import wakeup
+from heat.engine import watchrule
+from heat.rpc import client as rpc_client
 from heat.tests import fakes
 from heat.tests import utils
 
@@ -113,6 +119,13 @@ class HeatTestCase(testscenarios.WithScenarios,
 
         utils.setup_dummy_db()
         self.addCleanup(utils.reset_dummy_db)
+        self.addCleanup(context.trust_auth_cache.clear)
+        self.addCleanup(policy.reset)
+        self.addCleanup(watchrule.rule_index.invalidate)
+        self.addCleanup(rpc_client.set_local_engine, None)
+        self.addCleanup(wakeup.waiters.clear)
+        self.addCleanup(throttle.creates.clear)
+        self.addCleanup(template._compiled.clear)
 
     def stub_wallclock(self):
         """
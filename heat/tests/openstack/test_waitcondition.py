@@ -14,6 +14,7 @@
 import time
 import uuid
 
+from oslo.config import cfg
 import six
 
 from heat.common import identifier
@@ -25,6 +26,7 @@ from heat.engine import parser
 from heat.engine import resource
 from heat.engine.resources.openstack import wait_condition_handle as heat_wch
 from heat.engine import scheduler
+from heat.engine import wakeup
 from heat.tests import common
 from heat.tests import utils
 
@@ -72,6 +74,8 @@ class HeatWaitConditionTest(common.HeatTestCase):
 
     def setUp(self):
         super(HeatWaitConditionTest, self).setUp()
+        # Poll the handle at every check
+        cfg.CONF.set_override('signal_poll_interval', 0)
         self.stub_keystoneclient()
         self.tenant_id = 'test_tenant'
 
@@ -203,6 +207,26 @@ class HeatWaitConditionTest(common.HeatTestCase):
         self.assertEqual((handle.CREATE, handle.COMPLETE), handle.state)
         return (rsrc, handle)
 
+    def test_wait_woken_by_signal(self):
+        cfg.CONF.set_override('signal_poll_interval', 30)
+        self.stack = self.create_stack()
+        heat_wch.HeatWaitConditionHandle.get_status().AndReturn(['SUCCESS'])
+        heat_wch.HeatWaitConditionHandle.get_status().AndReturn(
+            ['SUCCESS', 'SUCCESS', 'SUCCESS'])
+        self.m.ReplayAll()
+
+        handle = self.stack['wait_handle']
+        scheduler.TaskRunner(handle.create)()
+        rsrc = self.stack['wait_condition']
+        data = rsrc.handle_create()
+        # The handle is polled at the first check, then only when woken
+        self.assertFalse(rsrc.check_create_complete(data))
+        self.assertFalse(rsrc.check_create_complete(data))
+        self.assertTrue(wakeup.waiters.wake(handle.resource_id))
+        self.assertTrue(rsrc.check_create_complete(data))
+        self.assertFalse(wakeup.waiters.wake(handle.resource_id))
+        self.m.VerifyAll()
+
     def test_data(self):
         rsrc, handle = self._create_heat_wc_and_handle()
         test_metadata = {'data': 'foo', 'reason': 'bar',
@@ -32,7 +32,7 @@ class Ec2TokenTest(common.HeatTestCase):
 
     def setUp(self):
         super(Ec2TokenTest, self).setUp()
-        self.m.StubOutWithMock(requests, 'post')
+        self.m.StubOutWithMock(requests.Session, 'post')
 
     def _dummy_GET_request(self, params=None, environ=None):
         # Mangle the params dict into a query string
@@ -206,8 +206,9 @@ class Ec2TokenTest(common.HeatTestCase):
                                  "path": "/v1",
                                  "body_hash": body_hash}})
         req_headers = {'Content-Type': 'application/json'}
-        requests.post(req_url, data=req_creds,
-                      headers=req_headers).AndReturn(DummyHTTPResponse())
+        requests.Session.post(req_url, data=req_creds,
+                              headers=req_headers).AndReturn(
+                                  DummyHTTPResponse())
 
     def test_call_ok(self):
         dummy_conf = {'auth_uri': 'http://123:5000/v2.0'}
@@ -384,6 +385,83 @@ class Ec2TokenTest(common.HeatTestCase):
 
         self.m.VerifyAll()
 
+    def test_call_ok_multicloud_remembers_auth_uri(self):
+        dummy_conf = {
+            'allowed_auth_uris': [
+                'http://123:5000/v2.0', 'http://456:5000/v2.0'],
+            'multi_cloud': True
+        }
+        ec2 = ec2token.EC2Token(app='woot', conf=dummy_conf)
+        params = {'AWSAccessKeyId': 'foo', 'Signature': 'xyz'}
+        req_env = {'SERVER_NAME': 'heat',
+                   'SERVER_PORT': '8000',
+                   'PATH_INFO': '/v1'}
+
+        ok_resp = json.dumps({'access': {'metadata': {}, 'token': {
+            'id': 123,
+            'tenant': {'name': 'tenant', 'id': 'abcd1234'}}}})
+        err_msg = "EC2 access key not found."
+        err_resp = json.dumps({'error': {'message': err_msg}})
+
+        self._stub_http_connection(
+            req_url='http://123:5000/v2.0/ec2tokens',
+            response=err_resp,
+            params={'AWSAccessKeyId': 'foo'})
+        self._stub_http_connection(
+            req_url='http://456:5000/v2.0/ec2tokens',
+            response=ok_resp,
+            params={'AWSAccessKeyId': 'foo'})
+
+        # the endpoint that validated the key is tried first next time
+        self._stub_http_connection(
+            req_url='http://456:5000/v2.0/ec2tokens',
+            response=ok_resp,
+            params={'AWSAccessKeyId': 'foo'})
+
+        self.m.ReplayAll()
+        dummy_req = self._dummy_GET_request(params, dict(req_env))
+        self.assertEqual('woot', ec2.__call__(dummy_req))
+        dummy_req = self._dummy_GET_request(params, dict(req_env))
+        self.assertEqual('woot', ec2.__call__(dummy_req))
+        self.assertEqual('http://456:5000/v2.0',
+                         dummy_req.headers['X-Auth-URL'])
+
+        self.m.VerifyAll()
+
+    def test_session_per_endpoint(self):
+        ec2 = ec2token.EC2Token(app='woot', conf={})
+        session = ec2._session('http://123:5000/v2.0/ec2tokens')
+        self.assertIsInstance(session, requests.Session)
+        self.assertIs(session, ec2._session('http://123:5000/v2.0/ec2tokens'))
+        self.assertIsNot(session,
+                         ec2._session('http://456:5000/v2.0/ec2tokens'))
+
+    def test_call_ok_cached(self):
+        dummy_conf = {'auth_uri': 'http://123:5000/v2.0', 'cache_ttl': '30'}
+        ec2 = ec2token.EC2Token(app='woot', conf=dummy_conf)
+        params = {'AWSAccessKeyId': 'foo', 'Signature': 'xyz'}
+        req_env = {'SERVER_NAME': 'heat',
+                   'SERVER_PORT': '8000',
+                   'PATH_INFO': '/v1'}
+        ok_resp = json.dumps({'access': {'metadata': {}, 'token': {
+            'id': 123,
+            'tenant': {'name': 'tenant', 'id': 'abcd1234'}}}})
+        mock_time = self.patchobject(ec2token.time, 'time',
+                                     return_value=1000)
+        # validated once, then again after the cached result expires
+        for i in range(2):
+            self._stub_http_connection(response=ok_resp,
+                                       params={'AWSAccessKeyId': 'foo'})
+        self.m.ReplayAll()
+
+        for now in (1000, 1029, 1031):
+            mock_time.return_value = now
+            dummy_req = self._dummy_GET_request(params, dict(req_env))
+            self.assertEqual('woot', ec2.__call__(dummy_req))
+            self.assertEqual('abcd1234', dummy_req.headers['X-Tenant-Id'])
+
+        self.m.VerifyAll()
+
     def test_call_err_multicloud(self):
         dummy_conf = {
             'allowed_auth_uris': [
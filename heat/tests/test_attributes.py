@@ -176,3 +176,41 @@ class AttributesTest(common.HeatTestCase):
         self.assertEqual("value3", attribs['test3'])
         value = 'value3 changed'
         self.assertEqual("value3 changed", attribs['test3'])
+
+    def test_hits_and_misses(self):
+        test_resolver = lambda x: 'value'
+        self.m.ReplayAll()
+        attribs = attributes.Attributes('test resource',
+                                        self.attributes_schema,
+                                        test_resolver)
+        attribs['test1']
+        attribs['test1']
+        attribs['test3']
+        attribs['test3']
+        attribs.reset_resolved_values()
+        attribs['test1']
+        self.assertEqual(1, attribs.hits)
+        self.assertEqual(4, attribs.misses)
+
+
+class AttributeMemoTest(common.HeatTestCase):
+
+    def test_get_memoized(self):
+        memo = attributes.AttributeMemo()
+        resolve = mock.Mock(return_value=None)
+        res1, res2 = object(), object()
+        self.assertIsNone(memo.get(res1, 'test1', resolve))
+        self.assertIsNone(memo.get(res1, 'test1', resolve))
+        self.assertEqual(1, resolve.call_count)
+        memo.get(res1, 'test2', resolve)
+        memo.get(res2, 'test1', resolve)
+        self.assertEqual(3, resolve.call_count)
+
+    def test_get_failure_not_memoized(self):
+        memo = attributes.AttributeMemo()
+        resolve = mock.Mock(side_effect=[KeyError('test1'), 'value1'])
+        res = object()
+        self.assertRaises(KeyError, memo.get, res, 'test1', resolve)
+        self.assertEqual('value1', memo.get(res, 'test1', resolve))
+        self.assertEqual('value1', memo.get(res, 'test1', resolve))
+        self.assertEqual(2, resolve.call_count)
@@ -14,6 +14,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
+
 from keystoneclient.auth.identity import v3 as ks_v3_auth
 from keystoneclient import exceptions as keystone_exc
 from keystoneclient import session as ks_session
@@ -192,3 +194,186 @@ class KeystonePasswordAuthProtocolTest(common.HeatTestCase):
         req = webob.Request.blank('/')
         self.middleware(req.environ, self._start_fake_response)
         self.assertEqual(401, self.response_status)
+
+    def _stub_auth(self, password='goodpassword', response=None):
+        mock_auth = self.m.CreateMock(self.password_cls)
+        ks_v3_auth.Password(auth_url=self.config['auth_uri'],
+                            password=password,
+                            project_id='tenant_id1',
+                            user_domain_id='default',
+                            username='user_name1').AndReturn(mock_auth)
+        m = mock_auth.get_access(mox.IsA(ks_session.Session))
+        m.AndReturn(response or self.token)
+
+    def _request(self, password='goodpassword'):
+        req = webob.Request.blank('/tenant_id1/')
+        req.headers['X_AUTH_USER'] = 'user_name1'
+        req.headers['X_AUTH_KEY'] = password
+        req.headers['X_AUTH_URL'] = self.config['auth_uri']
+        self.middleware(req.environ, self._start_fake_response)
+
+    def _setup_cache_test(self, **config):
+        self.config['token_cache_time'] = '300'
+        self.config.update(config)
+        self.middleware = auth_password.KeystonePasswordAuthProtocol(
+            self.app, self.config)
+        self.token = copy.deepcopy(TOKEN_V2_RESPONSE)
+        self.token['token']['expires'] = '2099-01-01T00:00:10.000123Z'
+        self.app.expected_env['keystone.token_info'] = self.token
+        self.password_cls = ks_v3_auth.Password
+        self.m.StubOutWithMock(ks_v3_auth, 'Password')
+
+    def test_cached_request(self):
+        self._setup_cache_test()
+        self._stub_auth()
+        self.m.ReplayAll()
+        self._request()
+        self._request()
+        self.m.VerifyAll()
+
+    def test_cache_keyed_by_password(self):
+        self._setup_cache_test()
+        self._stub_auth()
+        ks_v3_auth.Password(auth_url=self.config['auth_uri'],
+                            password='badpassword',
+                            project_id='tenant_id1',
+                            user_domain_id='default',
+                            username='user_name1').AndRaise(
+                                keystone_exc.Unauthorized(401))
+        self.m.ReplayAll()
+        self._request()
+        self._request(password='badpassword')
+        self.assertEqual(401, self.response_status)
+        self.m.VerifyAll()
+
+    def test_cache_expired(self):
+        self._setup_cache_test(token_cache_time='60')
+        mock_time = self.patchobject(auth_password.time, 'time',
+                                     return_value=1000)
+        self._stub_auth()
+        self._stub_auth()
+        self.m.ReplayAll()
+        self._request()
+        mock_time.return_value = 1061
+        self._request()
+        self.m.VerifyAll()
+
+    def test_expired_token_not_cached(self):
+        self._setup_cache_test()
+        self.token['token']['expires'] = '2000-01-01T00:00:10.000123Z'
+        self._stub_auth()
+        self._stub_auth()
+        self.m.ReplayAll()
+        self._request()
+        self._request()
+        self.m.VerifyAll()
+
+    def test_cache_disabled_by_default(self):
+        middleware = auth_password.KeystonePasswordAuthProtocol(
+            self.app, self.config)
+        self.assertIsNone(middleware.token_cache)
+
+    def test_cache_disabled(self):
+        self._setup_cache_test(token_cache_time='0')
+        self.assertIsNone(self.middleware.token_cache)
+        self._stub_auth()
+        self._stub_auth()
+        self.m.ReplayAll()
+        self._request()
+        self._request()
+        self.m.VerifyAll()
+
+
+class TokenCacheTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(TokenCacheTest, self).setUp()
+        self.token = copy.deepcopy(TOKEN_V3_RESPONSE)
+        self.token['expires_at'] = '2099-01-01T00:00:10.000123Z'
+
+    def test_key_salted(self):
+        cache = auth_password._TokenCache(300, 10)
+        key = cache.key('user', 'secret', 'tenant', 'http://ks')
+        self.assertEqual(key,
+                         cache.key('user', 'secret', 'tenant', 'http://ks'))
+        self.assertNotIn('secret', key)
+        self.assertNotEqual(key, cache.key('user', 'secret2', 'tenant',
+                                           'http://ks'))
+        other_cache = auth_password._TokenCache(300, 10)
+        self.assertNotEqual(key, other_cache.key('user', 'secret', 'tenant',
+                                                 'http://ks'))
+
+    def test_bounded(self):
+        cache = auth_password._TokenCache(300, 2)
+        for i in range(3):
+            cache.set('key%d' % i, self.token)
+        self.assertIsNone(cache.get('key0'))
+        self.assertEqual(self.token, cache.get('key1'))
+        self.assertEqual(self.token, cache.get('key2'))
+
+    def test_bounded_least_recently_used(self):
+        cache = auth_password._TokenCache(300, 2)
+        cache.set('key0', self.token)
+        cache.set('key1', self.token)
+        self.assertEqual(self.token, cache.get('key0'))
+        cache.set('key2', self.token)
+        self.assertEqual(self.token, cache.get('key0'))
+        self.assertIsNone(cache.get('key1'))
+        self.assertEqual(self.token, cache.get('key2'))
+
+    def test_token_expiry(self):
+        cache = auth_password._TokenCache(300, 2)
+        self.token['expires_at'] = '2015-01-01T00:00:10.000000Z'
+        self.patchobject(auth_password.time, 'time',
+                         return_value=1420070400)
+        cache.set('key', self.token)
+        self.assertEqual(self.token, cache.get('key'))
+        auth_password.time.time.return_value = 1420070410
+        self.assertIsNone(cache.get('key'))
+
+    def test_memcached(self):
+        memcache = self.patchobject(auth_password, 'memcache')
+        self.patchobject(auth_password.time, 'time', return_value=1000)
+        cache = auth_password._TokenCache(300, 2,
+                                          memcached_servers=['mc:11211'],
+                                          secret_key='secret')
+        memcache.Client.assert_called_once_with(['mc:11211'])
+        client = memcache.Client.return_value
+
+        cache.set('key', self.token)
+        self.assertEqual(1, client.set.call_count)
+        args, kwargs = client.set.call_args
+        self.assertEqual('key', args[0])
+        self.assertEqual({'time': 300}, kwargs)
+        self.assertNotIn(self.token['auth_token'], repr(args[1]))
+
+        client.get.return_value = args[1]
+        self.assertEqual(self.token, cache.get('key'))
+        client.get.assert_called_once_with('key')
+
+        # a process with another secret key cannot use the entry
+        other_cache = auth_password._TokenCache(
+            300, 2, memcached_servers=['mc:11211'], secret_key='other')
+        self.assertIsNone(other_cache.get('key'))
+
+    def test_memcached_entry_altered(self):
+        self.patchobject(auth_password, 'memcache')
+        cache = auth_password._TokenCache(300, 2,
+                                          memcached_servers=['mc:11211'],
+                                          secret_key='secret')
+        client = auth_password.memcache.Client.return_value
+        cache.set('key', self.token)
+        data, signature = client.set.call_args[0][1]
+
+        client.get.return_value = (data[:-4] + 'AAA=', signature)
+        self.assertIsNone(cache.get('key'))
+        client.get.return_value = None
+        self.assertIsNone(cache.get('key'))
+
+    def test_memcached_requires_secret_key(self):
+        memcache = self.patchobject(auth_password, 'memcache')
+        cache = auth_password._TokenCache(300, 2,
+                                          memcached_servers=['mc:11211'])
+        self.assertFalse(memcache.Client.called)
+        cache.set('key', self.token)
+        self.assertEqual(self.token, cache.get('key'))
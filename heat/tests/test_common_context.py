@@ -22,6 +22,9 @@ from heat.common import context
 from heat.common import exception
 from heat.tests import common
 
+cfg.CONF.import_group('keystone_authtoken',
+                      'keystonemiddleware.auth_token')
+
 policy_path = os.path.dirname(os.path.realpath(__file__)) + "/policy/"
 
 
@@ -109,6 +112,59 @@ class TestRequestContext(common.HeatTestCase):
             self.assertFalse(ctx.is_admin)
 
 
+class TrustAuthCacheTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(TrustAuthCacheTest, self).setUp()
+        cfg.CONF.set_override('auth_uri', 'http://server.test:5000/v2.0',
+                              group='keystone_authtoken')
+        cfg.CONF.set_override('admin_user', 'heat',
+                              group='keystone_authtoken')
+        cfg.CONF.set_override('admin_password', 'verybadpass',
+                              group='keystone_authtoken')
+        self.patchobject(context.v3, 'Password',
+                         side_effect=lambda **kwargs: mock.Mock())
+
+    def _trust_context(self, trust_id='atrust123'):
+        return context.RequestContext(trust_id=trust_id, is_admin=False)
+
+    def test_plugin_shared_by_trust(self):
+        plugin = self._trust_context().auth_plugin
+        self.assertIs(plugin, self._trust_context().auth_plugin)
+        self.assertIsNot(plugin,
+                         self._trust_context('atrust456').auth_plugin)
+        context.v3.Password.assert_any_call(
+            username='heat', password='verybadpass',
+            user_domain_id='default',
+            auth_url='http://server.test:5000/v3',
+            trust_id='atrust123')
+        self.assertEqual(2, context.v3.Password.call_count)
+        self.assertEqual(context.TRUST_TOKEN_REFRESH_SECONDS,
+                         plugin.MIN_TOKEN_LIFE_SECONDS)
+
+    def test_cache_bounded(self):
+        cfg.CONF.set_override('trust_token_cache_size', 2)
+        plugin1 = self._trust_context('trust1').auth_plugin
+        plugin2 = self._trust_context('trust2').auth_plugin
+        self.assertIs(plugin1, self._trust_context('trust1').auth_plugin)
+        self._trust_context('trust3').auth_plugin
+
+        # trust2 was the least recently used, so has been evicted
+        self.assertIs(plugin1, self._trust_context('trust1').auth_plugin)
+        self.assertIsNot(plugin2, self._trust_context('trust2').auth_plugin)
+        self.assertEqual(4, context.v3.Password.call_count)
+
+    def test_cache_disabled(self):
+        cfg.CONF.set_override('trust_token_cache_size', 0)
+        self.assertIsNot(self._trust_context().auth_plugin,
+                         self._trust_context().auth_plugin)
+
+    def test_discard(self):
+        plugin = self._trust_context().auth_plugin
+        context.trust_auth_cache.discard('atrust123')
+        self.assertIsNot(plugin, self._trust_context().auth_plugin)
+
+
 class RequestContextMiddlewareTest(common.HeatTestCase):
 
     scenarios = [(
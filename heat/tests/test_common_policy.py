@@ -16,6 +16,7 @@
 
 import os.path
 
+import fixtures
 from oslo.config import cfg
 
 from heat.common import exception
@@ -184,3 +185,46 @@ class TestPolicyEnforcer(common.HeatTestCase):
                                      False, exc=None).AndReturn(True)
         self.m.ReplayAll()
         self.assertTrue(enforcer.check_is_admin(ctx))
+
+    def test_check_admin_memoized(self):
+        enforcer = policy.Enforcer(
+            policy_file=self.get_policy_file('check_admin.json'))
+        enforcer.load_rules()
+        enforce = self.patchobject(base_policy.Enforcer, 'enforce',
+                                   side_effect=[True, False])
+
+        admin_ctx = utils.dummy_context(roles=['admin', 'member'])
+        self.assertTrue(enforcer.check_is_admin(admin_ctx))
+        ctx = utils.dummy_context(roles=['member', 'admin'])
+        self.assertTrue(enforcer.check_is_admin(ctx))
+        self.assertEqual(1, enforce.call_count)
+
+        ctx = utils.dummy_context(roles=['admin', 'member'],
+                                  tenant_id='other_tenant')
+        self.assertFalse(enforcer.check_is_admin(ctx))
+        self.assertEqual(2, enforce.call_count)
+
+    def test_check_admin_reloaded(self):
+        tmp_dir = self.useFixture(fixtures.TempDir()).path
+        policy_file = os.path.join(tmp_dir, 'policy.json')
+        with open(policy_file, 'w') as f:
+            f.write('{"context_is_admin": "role:admin"}')
+        enforcer = policy.Enforcer(policy_file=policy_file)
+
+        ctx = utils.dummy_context(roles=['admin'])
+        self.assertTrue(enforcer.check_is_admin(ctx))
+
+        with open(policy_file, 'w') as f:
+            f.write('{"context_is_admin": "role:superuser"}')
+        mtime = os.path.getmtime(policy_file) + 1
+        os.utime(policy_file, (mtime, mtime))
+        self.assertFalse(enforcer.check_is_admin(ctx))
+
+    def test_get_enforcer(self):
+        enforcer = policy.get_enforcer()
+        self.assertIsInstance(enforcer, policy.Enforcer)
+        self.assertIs(enforcer, policy.get_enforcer())
+        self.assertIs(enforcer, utils.dummy_context().policy)
+
+        policy.reset()
+        self.assertIsNot(enforcer, policy.get_enforcer())
@@ -11,7 +11,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-
+import eventlet
+import mock
 import six
 import testtools
 
@@ -495,3 +496,61 @@ class CustomConstraintTest(testtools.TestCase):
 
         constraint = constraints.CustomConstraint("zero", environment=self.env)
         self.assertEqual("zero", constraint["custom_constraint"])
+
+    def test_validation_cached(self):
+        checked = []
+
+        class ZeroConstraint(object):
+            def validate(self, value, context):
+                checked.append(value)
+                return value == 0
+
+        self.env.register_constraint("zero", ZeroConstraint)
+
+        ctx = mock.Mock(constraint_cache=constraints.ConstraintCache())
+        constraint = constraints.CustomConstraint("zero", environment=self.env)
+        other = constraints.CustomConstraint("zero", environment=self.env)
+        self.assertIsNone(constraint.validate(0, context=ctx))
+        self.assertIsNone(other.validate(0, context=ctx))
+        error = self.assertRaises(ValueError, constraint.validate, 1,
+                                  context=ctx)
+        self.assertEqual('"1" does not validate zero', six.text_type(error))
+        error = self.assertRaises(ValueError, other.validate, 1, context=ctx)
+        self.assertEqual('"1" does not validate zero', six.text_type(error))
+        self.assertEqual([0, 1], checked)
+
+
+class ConstraintCacheTest(testtools.TestCase):
+
+    def test_check_once(self):
+        cache = constraints.ConstraintCache()
+        check = mock.Mock(return_value=(True, None))
+        self.assertEqual((True, None), cache.check('zero', [0], check))
+        self.assertEqual((True, None), cache.check('zero', [0], check))
+        self.assertEqual(1, check.call_count)
+
+        self.assertEqual((True, None), cache.check('one', [0], check))
+        self.assertEqual((True, None), cache.check('zero', [1], check))
+        self.assertEqual(3, check.call_count)
+
+    def test_check_concurrent(self):
+        cache = constraints.ConstraintCache(max_concurrency=2)
+        calls = []
+
+        def check():
+            calls.append(None)
+            eventlet.sleep(0)
+            return True, None
+
+        pool = eventlet.GreenPool()
+        results = list(pool.imap(lambda v: cache.check('zero', v, check),
+                                 [0, 0, 0]))
+        self.assertEqual([(True, None)] * 3, results)
+        self.assertEqual(1, len(calls))
+
+    def test_check_error_not_cached(self):
+        cache = constraints.ConstraintCache()
+        check = mock.Mock(side_effect=[IOError('boom'), (True, None)])
+        self.assertRaises(IOError, cache.check, 'zero', 0, check)
+        self.assertEqual((True, None), cache.check('zero', 0, check))
+        self.assertEqual(2, check.call_count)
@@ -227,3 +227,12 @@ class dependenciesTest(testtools.TestCase):
                         "'%s' not found in required_by" % n)
 
         self.assertRaises(KeyError, d.required_by, 'foo')
+
+    def test_requires(self):
+        d = dependencies.Dependencies([('last', 'e1'), ('last', 'mid1'),
+                                       ('mid1', 'mid3'), ('mid3', 'e3')])
+
+        self.assertEqual(set(['e1', 'mid1']), set(d.requires('last')))
+        self.assertEqual(['mid3'], list(d.requires('mid1')))
+        self.assertEqual([], list(d.requires('e3')))
+        self.assertRaises(KeyError, d.requires, 'foo')
@@ -16,6 +16,7 @@ import json
 import uuid
 
 import mock
+from oslo.config import cfg
 import six
 
 from heat.common import identifier
@@ -361,6 +362,10 @@ class FormatTest(common.HeatTestCase):
 
         self.assertEqual(expected, info)
 
+    def test_format_stack_outputs_concurrently(self):
+        cfg.CONF.set_override('max_concurrent_outputs', 2)
+        self.test_format_stack_outputs()
+
 
 class FormatValidateParameterTest(common.HeatTestCase):
 
@@ -42,6 +42,7 @@ from heat.engine import service_stack_watch
 from heat.engine import stack as parser
 from heat.engine import stack_lock
 from heat.engine import template as templatem
+from heat.engine import wakeup
 from heat.engine import watchrule
 from heat.openstack.common import threadgroup
 from heat.rpc import api as rpc_api
@@ -2568,6 +2569,45 @@ class StackServiceTest(common.HeatTestCase):
         self.m.VerifyAll()
         self.stack.delete()
 
+    def _test_signal_reception_wake(self, wakes_waiters):
+        stack = get_stack('signal_reception',
+                          self.ctx,
+                          policy_template)
+        self.stack = stack
+        setup_keystone_mocks(self.m, stack)
+        self.m.ReplayAll()
+        stack.store()
+        stack.create()
+        policy = stack['WebServerScaleDownPolicy']
+        self.assertIsNotNone(policy.resource_id)
+
+        self.m.StubOutWithMock(res.Resource, 'signal')
+        res.Resource.signal(mox.IgnoreArg()).AndReturn(None)
+        self.m.ReplayAll()
+        self.patchobject(type(policy), 'signal_wakes_waiters',
+                         new=wakes_waiters)
+        wake = self.patchobject(self.eng, '_wake_waiter')
+
+        self.eng.resource_signal(self.ctx,
+                                 dict(self.stack.identifier()),
+                                 'WebServerScaleDownPolicy',
+                                 {'food': 'yum'},
+                                 sync_call=True)
+
+        self.m.VerifyAll()
+        stack_id = self.stack.id
+        self.stack.delete()
+        return policy.resource_id, stack_id, wake
+
+    def test_signal_reception_wakes_waiter(self):
+        resource_id, stack_id, wake = self._test_signal_reception_wake(True)
+        wake.assert_called_once_with(mock.ANY, resource_id, mock.ANY)
+        self.assertEqual(stack_id, wake.call_args[0][2].id)
+
+    def test_signal_reception_no_waiter(self):
+        resource_id, stack_id, wake = self._test_signal_reception_wake(False)
+        self.assertFalse(wake.called)
+
     def test_signal_reception_no_resource(self):
         stack = get_stack('signal_reception_no_resource',
                           self.ctx,
@@ -2810,6 +2850,40 @@ class StackServiceTest(common.HeatTestCase):
         for key in rpc_api.WATCH_DATA_KEYS:
             self.assertIn(key, result[0])
 
+    @stack_context('service_create_watch_data_test_stack', False)
+    def test_create_watch_data_unnamed(self):
+        rule = {u'EvaluationPeriods': u'1',
+                u'Namespace': u'system/linux',
+                u'Period': u'300',
+                u'ComparisonOperator': u'GreaterThanThreshold',
+                u'Statistic': u'SampleCount',
+                u'Threshold': u'2',
+                u'MetricName': u'ServiceFailure'}
+        self.wr = watchrule.WatchRule(context=self.ctx,
+                                      watch_name='create_watch_data_1',
+                                      rule=rule,
+                                      watch_data=[],
+                                      stack_id=self.stack.id,
+                                      state='NORMAL')
+        self.wr.store()
+
+        data = {u'Namespace': u'system/linux',
+                u'ServiceFailure': {u'Unit': u'Counter', u'Value': 1,
+                                    u'Dimensions': [{}]}}
+        self.assertEqual(data, self.eng.create_watch_data(self.ctx, None,
+                                                          data))
+        watch_data = db_api.watch_data_get_all(self.ctx)
+        self.assertEqual([(self.wr.id, data)],
+                         [(wd.watch_rule_id, wd.data) for wd in watch_data])
+
+        data = {u'Namespace': u'system/linux',
+                u'OtherMetric': {u'Unit': u'Counter', u'Value': 1,
+                                 u'Dimensions': [{}]}}
+        ex = self.assertRaises(dispatcher.ExpectedException,
+                               self.eng.create_watch_data,
+                               self.ctx, None, data)
+        self.assertEqual(exception.WatchRuleNotFound, ex.exc_info[0])
+
     @stack_context('service_show_watch_state_test_stack')
     def test_set_watch_state(self):
         # Insert dummy watch rule into the DB
@@ -3092,6 +3166,8 @@ class SoftwareConfigServiceTest(common.HeatTestCase):
         self.ctx = utils.dummy_context()
         self.patch('heat.engine.service.warnings')
         self.engine = service.EngineService('a-host', 'a-topic')
+        # metadata pushes are only run when flushed
+        self.patchobject(eventlet, 'spawn_after')
 
     def _create_software_config(
             self, group='Heat::Shell', name='config_mysql', config=None,
@@ -3197,6 +3273,7 @@ class SoftwareConfigServiceTest(common.HeatTestCase):
             self.ctx, server_id=server.resource_id)
         self.assertEqual([deployment], deployments)
 
+        self.engine.metadata_push_queue.flush()
         rs = db_api.resource_get_by_physical_resource_id(self.ctx, server_id)
         self.assertEqual(deployment['config_id'],
                          rs.rsrc_metadata.get('deployments')[0]['id'])
@@ -3243,6 +3320,7 @@ class SoftwareConfigServiceTest(common.HeatTestCase):
 
         # assert that metadata via metadata_software_deployments matches
         # metadata via server resource
+        self.engine.metadata_push_queue.flush()
         rs = db_api.resource_get_by_physical_resource_id(self.ctx, server_id)
         self.assertEqual(metadata,
                          rs.rsrc_metadata.get('deployments'))
@@ -3306,14 +3384,13 @@ class SoftwareConfigServiceTest(common.HeatTestCase):
     def test_update_software_deployment_new_config(self):
 
         server_id = str(uuid.uuid4())
-        self.m.StubOutWithMock(
-            self.engine, '_push_metadata_software_deployments')
+        self.m.StubOutWithMock(self.engine.metadata_push_queue, 'push')
 
         # push on create
-        self.engine._push_metadata_software_deployments(
+        self.engine.metadata_push_queue.push(
             self.ctx, server_id).AndReturn(None)
         # push on update with new config_id
-        self.engine._push_metadata_software_deployments(
+        self.engine.metadata_push_queue.push(
             self.ctx, server_id).AndReturn(None)
 
         self.m.ReplayAll()
@@ -3338,12 +3415,11 @@ class SoftwareConfigServiceTest(common.HeatTestCase):
     def test_update_software_deployment_status(self):
 
         server_id = str(uuid.uuid4())
-        self.m.StubOutWithMock(
-            self.engine, '_push_metadata_software_deployments')
+        self.m.StubOutWithMock(self.engine.metadata_push_queue, 'push')
         # push on create
-        self.engine._push_metadata_software_deployments(
+        self.engine.metadata_push_queue.push(
             self.ctx, server_id).AndReturn(None)
-        # _push_metadata_software_deployments should not be called
+        # the metadata should not be pushed
         # on update because config_id isn't being updated
         self.m.ReplayAll()
         deployment = self._create_software_deployment(server_id=server_id)
@@ -3361,6 +3437,89 @@ class SoftwareConfigServiceTest(common.HeatTestCase):
         self.assertEqual('WAITING', updated['status'])
         self.m.VerifyAll()
 
+    def test_update_software_deployment_wakes_waiter(self):
+        deployment = self._create_software_deployment()
+        deployment_id = deployment['id']
+        wake = self.patchobject(self.engine, '_wake_waiter')
+
+        self.engine.update_software_deployment(
+            self.ctx, deployment_id=deployment_id, config_id=None,
+            input_values=None, output_values={'foo': 'bar'}, action=None,
+            status=None, status_reason=None)
+        self.assertFalse(wake.called)
+
+        self.engine.update_software_deployment(
+            self.ctx, deployment_id=deployment_id, config_id=None,
+            input_values=None, output_values=None, action=None,
+            status='COMPLETE', status_reason='Outputs received')
+        wake.assert_called_once_with(self.ctx, deployment_id)
+
+    def test_wake_waiter_local(self):
+        wakeup.waiters.watch('1234')
+        get_rs = self.patchobject(db_api,
+                                  'resource_get_by_physical_resource_id')
+
+        self.engine._wake_waiter(self.ctx, '1234')
+
+        self.assertTrue(wakeup.waiters.woken('1234'))
+        self.assertFalse(get_rs.called)
+
+    def _setup_remote_waiter(self, locks):
+        self.engine.engine_id = 'this-engine'
+        self.engine.listener = service.EngineListener(
+            'a-host', self.engine.engine_id, None)
+        self.engine._client = mock.Mock()
+        self.patchobject(db_api, 'resource_get_by_physical_resource_id',
+                         return_value=mock.Mock(stack_id='child'))
+        self.patchobject(db_api, 'stack_get',
+                         side_effect=lambda c, s, **kw: mock.Mock(
+                             owner_id='parent' if s == 'child' else None))
+        self.patchobject(db_api, 'stack_lock_get_engine_id',
+                         side_effect=locks.get)
+
+    def test_wake_waiter_remote(self):
+        self._setup_remote_waiter({'parent': 'other-engine'})
+
+        self.engine._wake_waiter(self.ctx, '1234')
+
+        self.engine._client.prepare.assert_called_once_with(
+            version='1.0', topic='other-engine')
+        self.engine._client.prepare.return_value.cast.assert_called_once_with(
+            self.ctx, 'wake', key='1234')
+
+    def test_wake_waiter_not_locked(self):
+        self._setup_remote_waiter({})
+
+        self.engine._wake_waiter(self.ctx, '1234')
+
+        self.assertFalse(self.engine._client.prepare.called)
+
+    def test_wake_waiter_stack_known(self):
+        self._setup_remote_waiter({'parent': 'other-engine'})
+        stack = mock.Mock(id='child', owner_id='parent')
+
+        self.engine._wake_waiter(self.ctx, '1234', stack)
+
+        self.assertFalse(db_api.resource_get_by_physical_resource_id.called)
+        self.assertFalse(db_api.stack_get.called)
+        self.engine._client.prepare.assert_called_once_with(
+            version='1.0', topic='other-engine')
+
+    def test_wake_waiter_locked_here(self):
+        self._setup_remote_waiter({'child': 'this-engine'})
+
+        self.engine._wake_waiter(self.ctx, '1234')
+
+        self.assertFalse(self.engine._client.prepare.called)
+
+    def test_listener_wake(self):
+        wakeup.waiters.watch('1234')
+        listener = service.EngineListener('a-host', 'an-engine', None)
+
+        listener.wake(self.ctx, '1234')
+
+        self.assertTrue(wakeup.waiters.woken('1234'))
+
     def test_update_software_deployment_fields(self):
 
         deployment = self._create_software_deployment()
@@ -3433,7 +3592,7 @@ class SoftwareConfigServiceTest(common.HeatTestCase):
 
     @mock.patch.object(service.EngineService, 'metadata_software_deployments')
     @mock.patch.object(service.db_api, 'resource_get_by_physical_resource_id')
-    @mock.patch.object(service.requests, 'put')
+    @mock.patch.object(service.requests.Session, 'put')
     def test_push_metadata_software_deployments_temp_url(
             self, put, res_get, md_sd):
         rs = mock.Mock()
@@ -3460,6 +3619,77 @@ class SoftwareConfigServiceTest(common.HeatTestCase):
             'http://192.168.2.2/foo/bar', jsonutils.dumps(result_metadata))
 
 
+class MetadataPushQueueTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(MetadataPushQueueTest, self).setUp()
+        self.push_func = mock.Mock()
+        self.queue = service.MetadataPushQueue(self.push_func)
+        self.spawn_after = self.patchobject(eventlet, 'spawn_after')
+        self.sleep = self.patchobject(eventlet, 'sleep')
+
+    def test_push_coalesced(self):
+        self.queue.push('ctx1', 'server1')
+        self.queue.push('ctx2', 'server1')
+        self.queue.push('ctx3', 'server2')
+        self.queue.push('ctx4', 'server1')
+
+        self.assertEqual(
+            [mock.call(2, self.queue._run, 'server1'),
+             mock.call(2, self.queue._run, 'server2')],
+            self.spawn_after.call_args_list)
+
+        self.queue._run('server1')
+        self.push_func.assert_called_once_with('ctx4', 'server1')
+        self.queue._run('server2')
+        self.assertEqual(2, self.push_func.call_count)
+        self.assertEqual({}, self.queue.pending)
+
+    def test_push_while_running(self):
+        def push_again(cnxt, server_id):
+            if cnxt == 'ctx1':
+                self.queue.push('ctx2', server_id)
+
+        self.push_func.side_effect = push_again
+        self.queue.push('ctx1', 'server1')
+        self.queue._run('server1')
+
+        self.assertEqual(1, self.spawn_after.call_count)
+        self.assertEqual([mock.call('ctx1', 'server1'),
+                          mock.call('ctx2', 'server1')],
+                         self.push_func.call_args_list)
+        self.sleep.assert_called_once_with(2)
+        self.assertEqual(set(), self.queue.running)
+
+    def test_push_retries(self):
+        self.push_func.side_effect = [Exception('boom'), Exception('boom'),
+                                      None]
+        self.queue.push('ctx1', 'server1')
+        self.queue._run('server1')
+
+        self.assertEqual(3, self.push_func.call_count)
+        self.assertEqual([mock.call(1), mock.call(2)],
+                         self.sleep.call_args_list)
+
+    def test_push_retries_exhausted(self):
+        cfg.CONF.set_override('metadata_push_retries', 1)
+        self.push_func.side_effect = Exception('boom')
+        self.queue.push('ctx1', 'server1')
+        self.queue._run('server1')
+
+        self.assertEqual(2, self.push_func.call_count)
+        self.assertEqual(set(), self.queue.running)
+
+    def test_flush(self):
+        self.queue.push('ctx1', 'server1')
+        self.queue.push('ctx2', 'server2')
+        self.queue.flush()
+
+        self.assertEqual(2, self.push_func.call_count)
+        self.assertFalse(self.sleep.called)
+        self.assertEqual({}, self.queue.pending)
+
+
 class ThreadGroupManagerTest(common.HeatTestCase):
     def setUp(self):
         super(ThreadGroupManagerTest, self).setUp()
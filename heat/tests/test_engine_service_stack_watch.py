@@ -12,6 +12,8 @@
 #    under the License.
 
 import mock
+from oslo.config import cfg
+from oslo.utils import timeutils
 
 from heat.engine import service_stack_watch
 from heat.rpc import api as rpc_api
@@ -108,3 +110,36 @@ class StackServiceWatcherTest(common.HeatTestCase):
         self.assertEqual([mock.call(stack_id, sw.periodic_watcher_task,
                                     sid=stack_id)],
                          tg.add_timer.call_args_list)
+
+    def test_start_prune_task(self):
+        tg = mock.Mock()
+        sw = service_stack_watch.StackWatch(tg)
+        sw.start_prune_task()
+        tg.add_timer.assert_called_once_with(cfg.CONF.periodic_interval,
+                                             sw.periodic_prune_task)
+
+    def test_start_prune_task_disabled(self):
+        cfg.CONF.set_override('watch_data_prune_interval', 0)
+        tg = mock.Mock()
+        sw = service_stack_watch.StackWatch(tg)
+        sw.start_prune_task()
+        self.assertFalse(tg.add_timer.called)
+
+    @mock.patch.object(service_stack_watch.watchrule, 'prune_watch_data')
+    def test_periodic_prune_task(self, prune_watch_data):
+        now = timeutils.utcnow()
+        timeutils.set_time_override(now)
+        self.addCleanup(timeutils.clear_time_override)
+        sw = service_stack_watch.StackWatch(mock.Mock())
+
+        sw.periodic_prune_task()
+        self.assertEqual(1, prune_watch_data.call_count)
+
+        # not run again until watch_data_prune_interval has passed
+        timeutils.advance_time_seconds(599)
+        sw.periodic_prune_task()
+        self.assertEqual(1, prune_watch_data.call_count)
+        timeutils.advance_time_seconds(2)
+        prune_watch_data.side_effect = Exception('boom')
+        sw.periodic_prune_task()
+        self.assertEqual(2, prune_watch_data.call_count)
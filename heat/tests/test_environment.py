@@ -11,6 +11,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
 import os.path
 import sys
 
@@ -21,6 +22,7 @@ import six
 
 from heat.common import environment_format
 from heat.engine import environment
+from heat.engine import plugin_manager
 from heat.engine import resources
 from heat.tests import common
 from heat.tests import generic_resource
@@ -456,3 +458,93 @@ class GlobalEnvLoadingTest(common.HeatTestCase):
         call_list.sort()
 
         self.assertEqual(expected, call_list)
+
+
+class PluginSnapshotTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(PluginSnapshotTest, self).setUp()
+        snapshot_dir = self.useFixture(fixtures.TempDir())
+        self.snapshot_file = os.path.join(snapshot_dir.path, 'plugins.json')
+        cfg.CONF.set_override('plugin_snapshot_file', self.snapshot_file)
+
+    def _load(self):
+        env = environment.Environment({}, user_env=False)
+        resources._load_global_resources(env)
+        return env
+
+    def test_snapshot_written(self):
+        env = self._load()
+
+        self.assertTrue(os.path.exists(self.snapshot_file))
+        info = env.get_resource_info('AWS::EC2::Instance')
+        self.assertNotIsInstance(info, environment.LazyClassResourceInfo)
+        self.assertEqual(resources.instance.Instance, info.value)
+
+    def test_snapshot_used(self):
+        full_env = self._load()
+        with mock.patch.object(plugin_manager, 'PluginManager') as m_pm:
+            env = self._load()
+
+        self.assertFalse(m_pm.called)
+        info = env.get_resource_info('AWS::EC2::Instance')
+        self.assertIsInstance(info, environment.LazyClassResourceInfo)
+        self.assertEqual('heat.engine.resources.instance.Instance',
+                         info.location)
+        self.assertEqual(resources.instance.Instance, info.value)
+        self.assertEqual(resources.instance.Instance,
+                         env.get_class('AWS::EC2::Instance'))
+        self.assertEqual(sorted(full_env.get_types(None)),
+                         sorted(env.get_types(None)))
+
+    def test_snapshot_out_of_date(self):
+        self._load()
+        with mock.patch.object(plugin_manager, 'fingerprint',
+                               return_value='changed'):
+            env = self._load()
+
+        info = env.get_resource_info('AWS::EC2::Instance')
+        self.assertNotIsInstance(info, environment.LazyClassResourceInfo)
+        self.assertEqual('changed',
+                         json.load(open(self.snapshot_file))['fingerprint'])
+
+    def test_snapshot_invalid(self):
+        with open(self.snapshot_file, 'w') as snapshot_fd:
+            snapshot_fd.write('{@$%#$%')
+        env = self._load()
+
+        info = env.get_resource_info('AWS::EC2::Instance')
+        self.assertEqual(resources.instance.Instance, info.value)
+        self.assertIsNotNone(json.load(open(self.snapshot_file)))
+
+    def test_snapshot_eager_modules(self):
+        self._load()
+        snapshot = json.load(open(self.snapshot_file))
+        for entry in snapshot['plugins']:
+            if entry[0] == 'heat.engine.resources.instance':
+                entry[1] = None
+        with open(self.snapshot_file, 'w') as snapshot_fd:
+            json.dump(snapshot, snapshot_fd)
+
+        env = self._load()
+
+        info = env.get_resource_info('AWS::EC2::Instance')
+        self.assertNotIsInstance(info, environment.LazyClassResourceInfo)
+        self.assertIsInstance(env.get_resource_info('AWS::EC2::EIP'),
+                              environment.LazyClassResourceInfo)
+
+    def test_snapshot_conditional_mapping(self):
+        cfg.CONF.set_override('enable_cloud_watch_lite', True)
+        env = self._load()
+        self.assertIsNotNone(env.get_resource_info('OS::Heat::CWLiteAlarm'))
+
+        # The snapshot is still current, but the mapping is not taken from it
+        cfg.CONF.set_override('enable_cloud_watch_lite', False)
+        with mock.patch.object(plugin_manager, 'PluginManager') as m_pm:
+            env = self._load()
+        self.assertFalse(m_pm.called)
+        self.assertIsNone(env.get_resource_info('OS::Heat::CWLiteAlarm'))
+
+        cfg.CONF.set_override('enable_cloud_watch_lite', True)
+        env = self._load()
+        self.assertIsNotNone(env.get_resource_info('OS::Heat::CWLiteAlarm'))
@@ -156,6 +156,53 @@ class DependenciesTest(common.HeatTestCase):
         self.assertEqual(2, len(deps))
 
 
+class StaticFunction(TestFunction):
+    def is_static(self):
+        return True
+
+
+class FoldTest(common.HeatTestCase):
+    def test_fold_static(self):
+        func = StaticFunction(None, 'foo', ['bar', 'baz'])
+
+        folded = function.fold(func)
+
+        self.assertIsInstance(folded, function.Constant)
+        self.assertEqual('wibble', function.resolve(folded))
+        self.assertEqual({'foo': ['bar', 'baz']}, copy.deepcopy(folded))
+
+    def test_fold_dynamic(self):
+        func = TestFunction(None, 'foo', ['bar', 'baz'])
+        self.assertIs(func, function.fold(func))
+
+    def test_fold_dynamic_args(self):
+        func = StaticFunction(None, 'foo',
+                              ['bar', TestFunction(None, 'baz', [])])
+        self.assertIs(func, function.fold(func))
+
+    def test_fold_static_args(self):
+        const = function.Constant(None, 'baz', [], 'quux')
+        func = StaticFunction(None, 'foo', ['bar', const])
+        folded = function.fold(func)
+        self.assertIsInstance(folded, function.Constant)
+        self.assertEqual({'foo': ['bar', {'baz': []}]},
+                         copy.deepcopy(folded))
+
+    def test_fold_error(self):
+        class BrokenFunction(StaticFunction):
+            def result(self):
+                raise ValueError('broken')
+
+        func = BrokenFunction(None, 'foo', ['bar', 'baz'])
+        self.assertIs(func, function.fold(func))
+
+    def test_is_static(self):
+        const = function.Constant(None, 'baz', [], 'quux')
+        func = TestFunction(None, 'foo', ['bar', 'baz'])
+        self.assertTrue(function.is_static(['foo', {'bar': const}]))
+        self.assertFalse(function.is_static(['foo', {'bar': func}]))
+
+
 class ValidateGetAttTest(common.HeatTestCase):
     def setUp(self):
         super(ValidateGetAttTest, self).setUp()
@@ -20,6 +20,7 @@ from heat.common import grouputils
 from heat.common import short_id
 from heat.common import template_format
 from heat.engine import resource
+from heat.engine.resources.openstack import autoscaling_group as asg
 from heat.engine import rsrc_defn
 from heat.engine import scheduler
 from heat.engine import stack_resource
@@ -248,7 +249,7 @@ class RollingUpdatesTest(common.HeatTestCase):
             key=lambda name: rsrc.nested().resources[name].created_time)
         batches = []
 
-        def update_with_template(tmpl):
+        def update_with_template(tmpl, **kwargs):
             # keep track of the new updates to resources _in creation order_.
             definitions = tmpl.resource_definitions(stack)
             templates = [definitions[name] for name in created_order]
@@ -276,3 +277,28 @@ class RollingUpdatesTest(common.HeatTestCase):
         # second batch has all new resources.
         self.assertEqual(['Hi', 'Hi', 'Hi', 'Hi'],
                          get_foos(batches[1]))
+
+    def test_rolling_update_validates_first_batch(self):
+        stack = self.create_stack(self.parsed)
+        rsrc = stack['my-group']
+        update = self.patchobject(stack_resource.StackResource,
+                                  'update_with_template',
+                                  wraps=rsrc.update_with_template)
+        get_defn = self.patchobject(
+            asg.AutoScalingResourceGroup, '_get_instance_definition',
+            wraps=rsrc._get_instance_definition)
+
+        props = copy.deepcopy(rsrc.properties.data)
+        props['resource']['properties']['Foo'] = 'Hi'
+        update_snippet = rsrc_defn.ResourceDefinition(rsrc.name,
+                                                      rsrc.type(),
+                                                      props)
+        scheduler.TaskRunner(rsrc.update, update_snippet)()
+
+        # only the first of the two batches is validated
+        self.assertEqual([True, False],
+                         [kwargs.get('validate', True)
+                          for args, kwargs in update.call_args_list])
+        # the launch definition is resolved once for all of the batches
+        self.assertEqual(1, get_defn.call_count)
+        self.assertEqual((rsrc.UPDATE, rsrc.COMPLETE), rsrc.state)
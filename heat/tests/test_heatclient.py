@@ -240,6 +240,40 @@ class KeystoneClientTest(common.HeatTestCase):
         heat_ks_client.create_stack_domain_user(username='duser',
                                                 project_id='aproject')
 
+    def test_create_stack_domain_user_role_cached(self):
+        """Test the stack user role is looked up once per client."""
+
+        ctx = utils.dummy_context()
+        ctx.trust_id = None
+
+        # mock keystone client functions
+        self._stub_domain_admin_client()
+        self.mock_admin_client.users = self.m.CreateMockAnything()
+        self.mock_admin_client.roles = self.m.CreateMockAnything()
+        self.mock_admin_client.roles.list(
+            name='heat_stack_user').AndReturn(self._mock_roles_list())
+        for user_id in ('duser123', 'duser456'):
+            mock_user = self.m.CreateMockAnything()
+            mock_user.id = user_id
+            self.mock_admin_client.users.create(name='duser',
+                                                password=None,
+                                                default_project='aproject',
+                                                domain='adomain123'
+                                                ).AndReturn(mock_user)
+            self.mock_admin_client.roles.grant(project='aproject',
+                                               role='4546',
+                                               user=user_id).AndReturn(None)
+        self.m.ReplayAll()
+
+        heat_ks_client = heat_keystoneclient.KeystoneClient(ctx)
+        self.assertEqual('duser123',
+                         heat_ks_client.create_stack_domain_user(
+                             username='duser', project_id='aproject'))
+        self.assertEqual('duser456',
+                         heat_ks_client.create_stack_domain_user(
+                             username='duser', project_id='aproject'))
+        self.m.VerifyAll()
+
     def test_create_stack_domain_user_legacy_fallback(self):
         """Test creating a stack domain user, fallback path."""
         self._clear_domain_override()
@@ -1612,3 +1646,8 @@ class KeystoneClientTestDomainName(KeystoneClientTest):
         self._stub_domain_admin_client_domain_get()
         p = super(KeystoneClientTestDomainName, self)
         p.test_create_stack_domain_user()
+
+    def test_create_stack_domain_user_role_cached(self):
+        self._stub_domain_admin_client_domain_get()
+        p = super(KeystoneClientTestDomainName, self)
+        p.test_create_stack_domain_user_role_cached()
@@ -160,6 +160,22 @@ class InstancesTest(common.HeatTestCase):
 
         self.m.VerifyAll()
 
+    def test_instance_attributes_share_server(self):
+        return_server = self.fc.servers.list()[1]
+        instance = self._create_test_instance(return_server,
+                                              'in_attributes_share')
+        self.m.UnsetStubs()
+        self.m.StubOutWithMock(self.fc.servers, 'get')
+        self.fc.servers.get(instance.resource_id).AndReturn(return_server)
+        self.m.ReplayAll()
+
+        instance.ipaddress = None
+        expected_ip = return_server.networks['public'][0]
+        expected_az = getattr(return_server, 'OS-EXT-AZ:availability_zone')
+        self.assertEqual(expected_ip, instance.FnGetAtt('PublicIp'))
+        self.assertEqual(expected_az, instance.FnGetAtt('AvailabilityZone'))
+        self.m.VerifyAll()
+
     def test_instance_create_with_BlockDeviceMappings(self):
         return_server = self.fc.servers.list()[4]
         instance = self._create_test_instance(return_server,
@@ -18,6 +18,7 @@ import uuid
 import mock
 from novaclient import exceptions as nova_exceptions
 from oslo.config import cfg
+from oslo.utils import timeutils
 import six
 
 from heat.common import exception
@@ -222,6 +223,40 @@ class NovaUtilsUserdataTests(NovaClientPluginTestCase):
         self.assertNotIn('config_instance_user', data)
         self.assertIn("custominstanceuser", data)
 
+    def test_build_userdata_cached(self):
+        """Identical servers share the same userdata blob."""
+        data = self.nova_plugin.build_userdata({'foo': 'bar'}, 'echo hi',
+                                               instance_user='ec2-user')
+        with mock.patch.object(nova.pkgutil, 'get_data') as get_data:
+            again = self.nova_plugin.build_userdata(
+                {'foo': 'bar'}, 'echo hi', instance_user='ec2-user')
+            self.assertFalse(get_data.called)
+        self.assertIs(data, again)
+
+    def test_build_userdata_cache_key(self):
+        """Any change to the inputs produces a new userdata blob."""
+        data = self.nova_plugin.build_userdata({'foo': 'bar'}, 'echo hi')
+        self.assertIn('"foo": "bar"', data)
+
+        changed = self.nova_plugin.build_userdata({'foo': 'baz'}, 'echo hi')
+        self.assertIn('"foo": "baz"', changed)
+
+        changed = self.nova_plugin.build_userdata({'foo': 'bar'}, 'echo ho')
+        self.assertIn('echo ho', changed)
+
+        changed = self.nova_plugin.build_userdata({'foo': 'bar'}, 'echo hi',
+                                                  instance_user='someone')
+        self.assertIn('someone', changed)
+
+        changed = self.nova_plugin.build_userdata(
+            {'foo': 'bar'}, 'echo hi', user_data_format='SOFTWARE_CONFIG')
+        self.assertNotIn('[Boto]', changed)
+
+        cfg.CONF.set_override('heat_watch_server_url',
+                              'http://watch.test:8003')
+        changed = self.nova_plugin.build_userdata({'foo': 'bar'}, 'echo hi')
+        self.assertIn('http://watch.test:8003', changed)
+
 
 class NovaUtilsMetadataTests(NovaClientPluginTestCase):
 
@@ -405,3 +440,56 @@ class ConsoleUrlsTest(common.HeatTestCase):
         e = self.assertRaises(exc, urls.__getitem__, self.console_type)
         self.assertIn('spam', e.args)
         self.console_method.assert_called_once_with(self.console_type)
+
+
+class ServerCacheTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(ServerCacheTest, self).setUp()
+        self.now = timeutils.utcnow()
+        timeutils.set_time_override(self.now)
+        self.addCleanup(timeutils.clear_time_override)
+        self.cache = nova.ServerCache()
+        self.fetch = mock.Mock(side_effect=['server1', 'server2'])
+
+    def test_get_reused(self):
+        self.assertEqual('server1', self.cache.get('key', self.fetch))
+        timeutils.advance_time_seconds(10)
+        self.assertEqual('server1', self.cache.get('key', self.fetch))
+        self.assertEqual(1, self.fetch.call_count)
+
+    def test_get_expired(self):
+        self.assertEqual('server1', self.cache.get('key', self.fetch))
+        timeutils.advance_time_seconds(11)
+        self.assertEqual('server2', self.cache.get('key', self.fetch))
+
+    def test_get_other_key(self):
+        self.assertEqual('server1', self.cache.get('key', self.fetch))
+        self.assertEqual('server2', self.cache.get('key2', self.fetch))
+
+    def test_get_disabled(self):
+        cfg.CONF.set_override('server_cache_ttl', 0)
+        self.assertEqual('server1', self.cache.get('key', self.fetch))
+        self.assertEqual('server2', self.cache.get('key', self.fetch))
+
+    def test_clear(self):
+        self.assertEqual('server1', self.cache.get('key', self.fetch))
+        self.cache.clear()
+        self.assertEqual('server2', self.cache.get('key', self.fetch))
+
+    def test_get_server(self):
+        rsrc = mock.Mock(resource_id='1234', action='CREATE',
+                         status='COMPLETE')
+        rsrc.nova.return_value.servers.get.side_effect = self.fetch
+        self.assertEqual('server1', self.cache.get_server(rsrc))
+        self.assertEqual('server1', self.cache.get_server(rsrc))
+        rsrc.nova.return_value.servers.get.assert_called_once_with('1234')
+
+        rsrc.action = 'UPDATE'
+        self.assertEqual('server2', self.cache.get_server(rsrc))
+
+    def test_get_failure_not_cached(self):
+        self.fetch.side_effect = [nova_exceptions.NotFound(404), 'server1']
+        self.assertRaises(nova_exceptions.NotFound,
+                          self.cache.get, 'key', self.fetch)
+        self.assertEqual('server1', self.cache.get('key', self.fetch))
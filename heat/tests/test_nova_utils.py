@@ -17,6 +17,7 @@ import uuid
 
 import mock
 from novaclient import exceptions as nova_exceptions
+from oslo.config import cfg
 import six
 
 from heat.common import exception
@@ -190,8 +191,8 @@ class NovaUtilsUserdataTests(common.HeatTestCase):
         """Tests the build_userdata function."""
         resource = self.m.CreateMockAnything()
         resource.metadata_get().AndReturn({})
-        self.m.StubOutWithMock(nova_utils.cfg, 'CONF')
-        cnf = nova_utils.cfg.CONF
+        self.m.StubOutWithMock(cfg, 'CONF')
+        cnf = cfg.CONF
         cnf.heat_metadata_server_url = 'http://server.test:123'
         cnf.heat_watch_server_url = 'http://server.test:345'
         cnf.instance_connection_is_secure = False
@@ -212,8 +213,8 @@ class NovaUtilsUserdataTests(common.HeatTestCase):
         """Don't add a custom instance user when not requested."""
         resource = self.m.CreateMockAnything()
         resource.metadata_get().AndReturn({})
-        self.m.StubOutWithMock(nova_utils.cfg, 'CONF')
-        cnf = nova_utils.cfg.CONF
+        self.m.StubOutWithMock(cfg, 'CONF')
+        cnf = cfg.CONF
         cnf.instance_user = 'config_instance_user'
         cnf.heat_metadata_server_url = 'http://server.test:123'
         cnf.heat_watch_server_url = 'http://server.test:345'
@@ -228,8 +229,8 @@ class NovaUtilsUserdataTests(common.HeatTestCase):
         """Add the custom instance user when requested."""
         resource = self.m.CreateMockAnything()
         resource.metadata_get().AndReturn(None)
-        self.m.StubOutWithMock(nova_utils.cfg, 'CONF')
-        cnf = nova_utils.cfg.CONF
+        self.m.StubOutWithMock(cfg, 'CONF')
+        cnf = cfg.CONF
         cnf.instance_user = 'config_instance_user'
         cnf.heat_metadata_server_url = 'http://server.test:123'
         cnf.heat_watch_server_url = 'http://server.test:345'
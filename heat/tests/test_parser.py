@@ -17,6 +17,7 @@ import json
 import time
 import warnings
 
+import eventlet
 from keystoneclient import exceptions as kc_exceptions
 import mock
 import mox
@@ -1001,8 +1002,10 @@ class StackTest(common.HeatTestCase):
         stack.id = '1234'
 
         # Simulate a deleted stack
-        self.m.StubOutWithMock(db_api, 'stack_get')
-        db_api.stack_get(stack.context, stack.id).AndReturn(None)
+        self.m.StubOutWithMock(db_api, 'stack_update_state')
+        db_api.stack_update_state(stack.context, stack.id,
+                                  parser.Stack.CREATE, parser.Stack.COMPLETE,
+                                  'test').AndReturn(False)
 
         self.m.ReplayAll()
 
@@ -1299,6 +1302,52 @@ class StackTest(common.HeatTestCase):
         stacks = list(parser.Stack.load_all(self.ctx, show_nested=True))
         self.assertEqual(3, len(stacks))
 
+    def test_store_nested_creates_resource_rows(self):
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {
+                    'A': {'Type': 'GenericResourceType'},
+                    'B': {'Type': 'GenericResourceType',
+                          'Metadata': {'ref': {'Ref': 'A'}}}}}
+        owner = parser.Stack(self.ctx, 'owner', self.tmpl)
+        owner.store()
+        self.stack = parser.Stack(self.ctx, 'nested',
+                                  parser.Template(tmpl), owner_id=owner.id)
+        self.stack.store()
+
+        rows = db_api.resource_get_all_by_stack(self.ctx, self.stack.id)
+        self.assertEqual(set(['A', 'B']), set(rows))
+        for name, row in rows.items():
+            self.assertEqual(self.stack[name].id, row.id)
+            self.assertEqual(('INIT', 'COMPLETE'), (row.action, row.status))
+            # the metadata is only resolved once the resource is created
+            self.assertEqual({}, row.rsrc_metadata)
+        # until then, the metadata comes from the template
+        self.assertEqual({'ref': 'A'}, self.stack['B'].metadata_get())
+        self.assertEqual({'ref': 'A'},
+                         self.stack['B'].metadata_get(refresh=True))
+
+        self.patchobject(db_api, 'resource_create')
+        self.stack.create()
+        self.assertFalse(db_api.resource_create.called)
+        self.assertEqual((self.stack.CREATE, self.stack.COMPLETE),
+                         self.stack.state)
+        for name, row in rows.items():
+            row.refresh()
+            self.assertEqual(('CREATE', 'COMPLETE'),
+                             (row.action, row.status))
+        self.assertEqual({'ref': self.stack['A'].FnGetRefId()},
+                         rows['B'].rsrc_metadata)
+
+    def test_store_top_level_no_resource_rows(self):
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {'A': {'Type': 'GenericResourceType'}}}
+        self.stack = parser.Stack(self.ctx, 'stack', parser.Template(tmpl))
+        self.stack.store()
+        self.assertIsNone(self.stack['A'].id)
+        self.assertRaises(exception.NotFound,
+                          db_api.resource_get_all_by_stack,
+                          self.ctx, self.stack.id)
+
     def test_created_time(self):
         self.stack = parser.Stack(self.ctx, 'creation_time_test',
                                   self.tmpl)
@@ -4133,6 +4182,108 @@ class StackTest(common.HeatTestCase):
         self.assertEqual((self.stack.DELETE, self.stack.COMPLETE),
                          self.stack.state)
 
+    def _outputs_stack(self):
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {
+                    'AResource': {'Type': 'GenericResourceType'},
+                    'BResource': {'Type': 'GenericResourceType'}},
+                'Outputs': {
+                    'out1': {'Value': {'Fn::GetAtt': ['AResource', 'Foo']}},
+                    'out2': {'Value': {'Fn::GetAtt': ['AResource', 'Foo']}},
+                    'out3': {'Value': {'Fn::GetAtt': ['BResource', 'Foo']}},
+                    'out4': {'Value': {'Fn::GetAtt': ['AResource', 'Bar']}}}}
+        stack = parser.Stack(self.ctx, 'stack_outputs',
+                             template.Template(tmpl))
+        for res in stack.values():
+            res.action = res.CREATE
+            res.status = res.COMPLETE
+        return stack
+
+    def _test_resolve_outputs(self):
+        calls = []
+
+        def resolve(res, name):
+            calls.append((res.name, name))
+            # let other outputs be resolved in the meantime
+            eventlet.sleep(0)
+            # None is never cached by the resource's attributes, so only the
+            # memo stops AResource.Foo being resolved again
+            return None if res.name == 'AResource' else res.name
+
+        self.patchobject(generic_rsrc.GenericResource, '_resolve_attribute',
+                         side_effect=resolve, autospec=True)
+        self.stack = self._outputs_stack()
+        keys = ['out1', 'out2', 'out3', 'out4']
+        self.assertEqual([None, None, 'BResource', None],
+                         self.stack.resolve_outputs(keys))
+        self.assertEqual([('AResource', 'Foo'), ('BResource', 'Foo')],
+                         sorted(calls))
+        self.assertIn('error_msg', self.stack.outputs['out4'])
+        self.assertIsNone(self.ctx.attribute_memo)
+
+    def test_resolve_outputs(self):
+        self._test_resolve_outputs()
+
+    def test_resolve_outputs_concurrently(self):
+        cfg.CONF.set_override('max_concurrent_outputs', 4)
+        self._test_resolve_outputs()
+
+    def _attributes_stack(self):
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {
+                    'AResource': {'Type': 'GenericResourceType',
+                                  'DependsOn': 'DResource'},
+                    'BResource': {'Type': 'ResourceWithPropsType',
+                                  'Properties': {
+                                      'Foo': {'Fn::GetAtt': ['AResource',
+                                                             'Foo']}}},
+                    'CResource': {'Type': 'ResourceWithPropsType',
+                                  'Properties': {
+                                      'Foo': {'Fn::GetAtt': ['BResource',
+                                                             'Foo']}}},
+                    'DResource': {'Type': 'GenericResourceType'},
+                    'EResource': {'Type': 'GenericResourceType'}}}
+        stack = parser.Stack(self.ctx, 'stack_attributes',
+                             template.Template(tmpl))
+        for res in stack.values():
+            res.attributes['Foo']
+        return stack
+
+    def _resolved(self, stack):
+        return sorted(res.name for res in stack.values()
+                      if res.attributes._resolved_values)
+
+    def test_reset_resource_attributes(self):
+        stack = self._attributes_stack()
+        stack.reset_resource_attributes()
+        self.assertEqual([], self._resolved(stack))
+
+    def test_reset_resource_attributes_scoped(self):
+        stack = self._attributes_stack()
+        stack.reset_resource_attributes(stack['AResource'])
+        self.assertEqual(['EResource'], self._resolved(stack))
+
+        stack = self._attributes_stack()
+        stack.reset_resource_attributes(stack['CResource'])
+        self.assertEqual(['AResource', 'DResource', 'EResource'],
+                         self._resolved(stack))
+
+    def test_reset_resource_attributes_unknown(self):
+        stack = self._attributes_stack()
+        other = self._attributes_stack()
+        stack.reset_resource_attributes(other['EResource'])
+        self.assertEqual([], self._resolved(stack))
+
+    def test_attribute_cache_stats(self):
+        stack = self._attributes_stack()
+        self.assertEqual({'hits': 0, 'misses': 5},
+                         stack.attribute_cache_stats())
+        stack['AResource'].attributes['Foo']
+        stack.reset_resource_attributes(stack['EResource'])
+        stack['EResource'].attributes['Foo']
+        self.assertEqual({'hits': 1, 'misses': 6},
+                         stack.attribute_cache_stats())
+
     def test_incorrect_outputs(self):
         tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
                 'Resources': {
@@ -4332,6 +4483,53 @@ class StackTest(common.HeatTestCase):
                       'Found a [%s] instead' % six.text_type,
                       six.text_type(ex))
 
+    def test_validate_concurrently(self):
+        cfg.CONF.set_override('max_concurrent_validations', 4)
+        tmpl = template_format.parse('''
+        HeatTemplateFormatVersion: '2012-12-12'
+        Resources:
+          AResource:
+            Type: ResourceWithPropsType
+            Properties:
+              Foo: abc
+          BResource:
+            Type: ResourceWithPropsType
+            Properties:
+              Foo: {Ref: AResource}
+        ''')
+        self.stack = parser.Stack(self.ctx, 'stack_validate_concurrent',
+                                  template.Template(tmpl))
+
+        self.assertIsNone(self.stack.validate())
+        self.assertIsNone(self.ctx.constraint_cache)
+
+    def test_validate_concurrently_aggregates_errors(self):
+        cfg.CONF.set_override('max_concurrent_validations', 4)
+        tmpl = template_format.parse('''
+        HeatTemplateFormatVersion: '2012-12-12'
+        Resources:
+          AResource:
+            Type: ResourceWithPropsType
+            Properties:
+              FooInt: notanint
+          BResource:
+            Type: ResourceWithPropsType
+            Properties:
+              FooInt: notanint2
+          CResource:
+            Type: ResourceWithPropsType
+            Properties:
+              Foo: abc
+        ''')
+        self.stack = parser.Stack(self.ctx, 'stack_validate_concurrent',
+                                  template.Template(tmpl))
+
+        ex = self.assertRaises(exception.StackValidationFailed,
+                               self.stack.validate)
+        self.assertIn("'notanint' is not an integer", six.text_type(ex))
+        self.assertIn("'notanint2' is not an integer", six.text_type(ex))
+        self.assertIsNone(self.ctx.constraint_cache)
+
     def test_prop_validate_value(self):
         tmpl = template_format.parse("""
         HeatTemplateFormatVersion: '2012-12-12'
@@ -34,11 +34,13 @@ from heat.engine import resources
 from heat.engine import rsrc_defn
 from heat.engine import scheduler
 from heat.engine import template
+from heat.engine import throttle
 from heat.tests import common
 from heat.tests import generic_resource as generic_rsrc
 from heat.tests import utils
 
 import neutronclient.common.exceptions as neutron_exp
+from novaclient import exceptions as nova_exceptions
 
 
 empty_template = {"HeatTemplateFormatVersion": "2012-12-12"}
@@ -211,6 +213,32 @@ class ResourceTest(common.HeatTestCase):
         actual = res.prepare_abandon()
         self.assertEqual(expected, actual)
 
+    def test_load_data_decrypts_lazily(self):
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
+        res = generic_rsrc.GenericResource('test_resource', tmpl, self.stack)
+        scheduler.TaskRunner(res.create)()
+        res.data_set('secret', 'xyzzy', redact=True)
+        db_res = db_api.resource_get(self.stack.context, res.id)
+
+        get_all = self.patchobject(db_api, 'resource_data_get_all',
+                                   side_effect=db_api.resource_data_get_all)
+        res._load_data(db_res)
+        self.assertFalse(get_all.called)
+        self.assertEqual({'secret': 'xyzzy'}, res.data())
+        self.assertEqual('xyzzy', res.data().get('secret'))
+        get_all.assert_called_once_with(res, db_res.data)
+
+    def test_load_data_empty(self):
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
+        res = generic_rsrc.GenericResource('test_resource', tmpl, self.stack)
+        scheduler.TaskRunner(res.create)()
+        db_res = db_api.resource_get(self.stack.context, res.id)
+
+        get_all = self.patchobject(db_api, 'resource_data_get_all')
+        res._load_data(db_res)
+        self.assertEqual({}, res.data())
+        self.assertFalse(get_all.called)
+
     def test_state_set_invalid(self):
         tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
         res = generic_rsrc.GenericResource('test_resource', tmpl, self.stack)
@@ -341,6 +369,34 @@ class ResourceTest(common.HeatTestCase):
         self.assertEqual(res.COMPLETE, db_res.status)
         self.assertEqual('test_update', db_res.status_reason)
 
+    def test_store_or_update_known_row(self):
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
+        res = generic_rsrc.GenericResource('test_res_upd', tmpl, self.stack)
+        res._store_or_update(res.CREATE, res.IN_PROGRESS, 'test_store')
+        db_res = self.stack.resource_rows[res.id]
+
+        self.patchobject(db_api, 'resource_get')
+        res._store_or_update(res.CREATE, res.COMPLETE, 'test_update')
+        self.assertFalse(db_api.resource_get.called)
+        self.assertEqual(res.COMPLETE, db_res.status)
+        self.assertEqual('test_update', db_res.status_reason)
+
+    def test_set_without_read(self):
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo')
+        res = generic_rsrc.GenericResource('test_res_upd', tmpl, self.stack)
+        res._store_or_update(res.CREATE, res.IN_PROGRESS, 'test_store')
+        res_id = res.id
+
+        self.patchobject(db_api, 'resource_get')
+        res.resource_id_set('phys_id')
+        res.metadata_set({'foo': 'bar'})
+        self.assertFalse(db_api.resource_get.called)
+
+        res.context.session.expire_all()
+        db_res = self.stack.resource_rows[res_id]
+        self.assertEqual('phys_id', db_res.nova_instance)
+        self.assertEqual({'foo': 'bar'}, db_res.rsrc_metadata)
+
     def test_parsed_template(self):
         join_func = cfn_funcs.Join(None,
                                    'Fn::Join', [' ', ['bar', 'baz', 'quux']])
@@ -593,6 +649,51 @@ class ResourceTest(common.HeatTestCase):
         self.assertEqual((res.CREATE, res.COMPLETE), res.state)
         self.m.VerifyAll()
 
+    def test_create_over_limit_retry(self):
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo',
+                                            {'Foo': 'abc'})
+        res = generic_rsrc.ResourceWithProps('test_resource', tmpl, self.stack)
+        res.default_client_name = 'nova'
+        self.m.StubOutWithMock(timeutils, 'retry_backoff_delay')
+        self.m.StubOutWithMock(generic_rsrc.ResourceWithProps, 'handle_create')
+        self.m.StubOutWithMock(generic_rsrc.ResourceWithProps, 'handle_delete')
+
+        # first attempt to create is over limit
+        generic_rsrc.ResourceWithProps.handle_create().AndRaise(
+            nova_exceptions.OverLimit(413))
+        generic_rsrc.ResourceWithProps.handle_delete().AndReturn(None)
+
+        # second attempt to create succeeds
+        timeutils.retry_backoff_delay(1, jitter_max=2.0).AndReturn(0.01)
+        generic_rsrc.ResourceWithProps.handle_create().AndReturn(None)
+        self.m.ReplayAll()
+
+        scheduler.TaskRunner(res.create)()
+        self.assertEqual((res.CREATE, res.COMPLETE), res.state)
+        self.m.VerifyAll()
+
+        # the limit was halved (to a minimum of one) then raised again
+        self.assertEqual(2, throttle.creates._type_limit('Foo'))
+
+    def test_create_throttled(self):
+        cfg.CONF.set_override('max_concurrent_creates_per_stack', 1)
+        tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo',
+                                            {'Foo': 'abc'})
+        res = generic_rsrc.ResourceWithProps('test_resource', tmpl, self.stack)
+        handle_create = self.patchobject(generic_rsrc.ResourceWithProps,
+                                         'handle_create', return_value=None)
+
+        self.assertTrue(throttle.creates.acquire(self.stack.id, 'Bar'))
+        runner = scheduler.TaskRunner(res.create)
+        runner.start()
+        self.assertFalse(runner.step())
+        self.assertFalse(handle_create.called)
+
+        throttle.creates.release(self.stack.id, 'Bar')
+        runner.run_to_completion()
+        self.assertEqual((res.CREATE, res.COMPLETE), res.state)
+        self.assertTrue(throttle.creates.acquire(self.stack.id, 'Foo'))
+
     def test_create_fail_retry_disabled(self):
         cfg.CONF.set_override('action_retry_limit', 0)
         tmpl = rsrc_defn.ResourceDefinition('test_resource', 'Foo',
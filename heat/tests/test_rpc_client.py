@@ -20,6 +20,7 @@ Unit Tests for heat.rpc.client
 import copy
 
 import mock
+from oslo.config import cfg
 from oslo.messaging._drivers import common as rpc_common
 import stubout
 import testtools
@@ -27,7 +28,9 @@ import testtools
 from heat.common import exception
 from heat.common import identifier
 from heat.common import messaging
+from heat.engine import service
 from heat.rpc import client as rpc_client
+from heat.tests import common
 from heat.tests import utils
 
 
@@ -338,3 +341,76 @@ class EngineRpcAPITestCase(testtools.TestCase):
         self._test_engine_api('delete_snapshot', 'call',
                               stack_identity=self.identity,
                               snapshot_id=snapshot_id)
+
+
+class FakeEngine(object):
+
+    def __init__(self):
+        self.calls = []
+
+    @service.request_context
+    def show_software_config(self, cnxt, config_id):
+        self.calls.append((cnxt, config_id))
+        if config_id is None:
+            raise exception.NotFound()
+        return {'id': config_id, 'inputs': ('a', 'b')}
+
+
+class EngineClientLoopbackTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(EngineClientLoopbackTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.engine = FakeEngine()
+        self.rpcapi = rpc_client.EngineClient()
+        self.rpcapi._client = mock.Mock()
+        rpc_client.set_local_engine(self.engine)
+
+    def test_call_local(self):
+        sc = self.rpcapi.show_software_config(self.ctx, config_id='1234')
+
+        self.assertEqual({'id': '1234', 'inputs': ('a', 'b')}, sc)
+        self.assertFalse(self.rpcapi._client.call.called)
+        cnxt, config_id = self.engine.calls[0]
+        self.assertEqual('1234', config_id)
+        self.assertIsNot(self.ctx, cnxt)
+        self.assertEqual(self.ctx.to_dict(), cnxt.to_dict())
+
+    def test_call_local_error(self):
+        ex = self.assertRaises(exception.NotFound,
+                               self.rpcapi.show_software_config,
+                               self.ctx, config_id=None)
+        self.rpcapi.ignore_error_named(ex, 'NotFound')
+
+    def test_call_local_serialize(self):
+        cfg.CONF.set_override('rpc_loopback_serialize', True)
+
+        sc = self.rpcapi.show_software_config(self.ctx, config_id='1234')
+
+        self.assertEqual({'id': '1234', 'inputs': ['a', 'b']}, sc)
+        cnxt, config_id = self.engine.calls[0]
+        self.assertEqual(self.ctx.tenant_id, cnxt.tenant_id)
+        self.assertEqual(self.ctx.auth_token, cnxt.auth_token)
+
+    def test_call_loopback_disabled(self):
+        cfg.CONF.set_override('rpc_loopback', False)
+
+        self.rpcapi.show_software_config(self.ctx, config_id='1234')
+
+        self.assertEqual([], self.engine.calls)
+        self.rpcapi._client.call.assert_called_once_with(
+            self.ctx, 'show_software_config', config_id='1234')
+
+    def test_call_no_local_engine(self):
+        rpc_client.set_local_engine(None)
+
+        self.rpcapi.show_software_config(self.ctx, config_id='1234')
+
+        self.assertEqual([], self.engine.calls)
+        self.assertTrue(self.rpcapi._client.call.called)
+
+    def test_cast_not_local(self):
+        self.rpcapi.delete_stack(self.ctx, {'stack_id': '1'})
+
+        self.assertEqual([], self.engine.calls)
+        self.assertTrue(self.rpcapi._client.cast.called)
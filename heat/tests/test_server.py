@@ -326,6 +326,30 @@ class ServersTest(common.HeatTestCase):
 
         self.m.VerifyAll()
 
+    def test_server_attributes_share_server(self):
+        return_server = self.fc.servers.list()[1]
+        return_server.id = '5678'
+        server = self._create_test_server(return_server,
+                                          'srv_attributes_share')
+        self.m.StubOutWithMock(self.fc.servers, 'get')
+        self.fc.servers.get('5678').AndReturn(return_server)
+        self.fc.servers.get('5678').AndReturn(return_server)
+        self.m.ReplayAll()
+
+        private_ip = return_server.networks['private'][0]
+        public_ip = return_server.networks['public'][0]
+        self.assertEqual(public_ip, server.FnGetAtt('networks')['public'][0])
+        self.assertIn(server.FnGetAtt('first_address'),
+                      (private_ip, public_ip))
+        self.assertEqual('192.0.2.0', server.FnGetAtt('accessIPv4'))
+
+        # once the resource performs an action the server is fetched again
+        server.attributes.reset_resolved_values()
+        server.state_set(server.CHECK, server.COMPLETE)
+        self.assertEqual('192.0.2.0', server.FnGetAtt('accessIPv4'))
+        self.assertEqual('::babe:4317:0A83', server.FnGetAtt('accessIPv6'))
+        self.m.VerifyAll()
+
     def test_server_create_metadata(self):
         return_server = self.fc.servers.list()[1]
         stack_name = 'create_metadata_test_stack'
@@ -14,6 +14,7 @@
 import datetime
 
 from keystoneclient import exceptions as kc_exceptions
+import mock
 from oslo.config import cfg
 
 from heat.common import exception
@@ -43,6 +44,21 @@ test_template_signal = '''
 '''
 
 
+test_template_signals = '''
+{
+  "AWSTemplateFormatVersion" : "2010-09-09",
+  "Description" : "Just a test.",
+  "Parameters" : {},
+  "Resources" : {
+    "signal_handler1" : {"Type" : "SignalResourceType"},
+    "signal_handler2" : {"Type" : "SignalResourceType"},
+    "signal_handler3" : {"Type" : "SignalResourceType"},
+    "resource_X" : {"Type" : "GenericResourceType"}
+  }
+}
+'''
+
+
 class SignalTest(common.HeatTestCase):
 
     def setUp(self):
@@ -367,3 +383,161 @@ class SignalTest(common.HeatTestCase):
                           rsrc.signal, details=test_d)
 
         self.m.VerifyAll()
+
+
+class ProvisionStackUsersTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(ProvisionStackUsersTest, self).setUp()
+
+        resource._register_class('SignalResourceType',
+                                 generic_resource.SignalResource)
+        resource._register_class('GenericResourceType',
+                                 generic_resource.GenericResource)
+
+        cfg.CONF.set_default('heat_waitcondition_server_url',
+                             'http://server.test:8000/v1/waitcondition')
+        cfg.CONF.set_override('max_concurrent_stack_users', 2)
+
+        templ = template.Template(
+            template_format.parse(test_template_signals))
+        self.stack = parser.Stack(utils.dummy_context(), 'test_stack', templ,
+                                  disable_rollback=True)
+        self.stack.store()
+
+        self.fkc = self.stub_keystoneclient(access='anaccesskey',
+                                            secret='verysecret')
+        for name in ('create_stack_domain_user',
+                     'create_stack_domain_user_keypair',
+                     'delete_stack_domain_user'):
+            self.patchobject(self.fkc, name,
+                             side_effect=getattr(self.fkc, name))
+
+    def handlers(self):
+        return [self.stack['signal_handler%d' % i] for i in range(1, 4)]
+
+    def test_create(self):
+        states = []
+        self.fkc.create_stack_domain_user.side_effect = (
+            lambda **kwargs: states.append(
+                [r.state for r in self.handlers()]) or '1234')
+
+        self.stack.create()
+
+        self.assertEqual((self.stack.CREATE, self.stack.COMPLETE),
+                         self.stack.state)
+        self.assertEqual('aprojectid', self.stack.stack_user_project_id)
+        # All of the users were created before any of the resources
+        self.assertEqual(3, len(states))
+        for handler_states in states:
+            self.assertEqual([('INIT', 'COMPLETE')] * 3, handler_states)
+        self.assertEqual(3,
+                         self.fkc.create_stack_domain_user_keypair.call_count)
+        for rsrc in self.handlers():
+            self.assertEqual('1234', rsrc.resource_id)
+            rs_data = db_api.resource_data_get_all(rsrc)
+            self.assertEqual('anaccesskey', rs_data.get('access_key'))
+            self.assertEqual('verysecret', rs_data.get('secret_key'))
+
+    def test_create_failed(self):
+        self.fkc.create_stack_domain_user.side_effect = [
+            '1234', kc_exceptions.Forbidden(), '1234', '1234']
+
+        self.stack.create()
+
+        # The user that could not be created in advance was created by its
+        # resource
+        self.assertEqual((self.stack.CREATE, self.stack.COMPLETE),
+                         self.stack.state)
+        self.assertEqual(4, self.fkc.create_stack_domain_user.call_count)
+        self.assertEqual(3,
+                         self.fkc.create_stack_domain_user_keypair.call_count)
+        for rsrc in self.handlers():
+            self.assertEqual('1234', rsrc.resource_id)
+
+    def test_create_disabled(self):
+        cfg.CONF.set_override('max_concurrent_stack_users', 0)
+
+        with mock.patch.object(self.stack,
+                               '_store_resources') as store_resources:
+            self.stack.create()
+
+        self.assertEqual((self.stack.CREATE, self.stack.COMPLETE),
+                         self.stack.state)
+        self.assertFalse(store_resources.called)
+        self.assertEqual(3, self.fkc.create_stack_domain_user.call_count)
+
+    def test_delete(self):
+        self.stack.create()
+        self.stack.delete()
+
+        self.assertEqual((self.stack.DELETE, self.stack.COMPLETE),
+                         self.stack.state)
+        self.fkc.delete_stack_domain_user.assert_has_calls(
+            [mock.call(user_id='1234', project_id='aprojectid')] * 3)
+        self.assertEqual(3, self.fkc.delete_stack_domain_user.call_count)
+
+    def test_delete_failed(self):
+        self.stack.create()
+        self.fkc.delete_stack_domain_user.side_effect = [
+            None, kc_exceptions.Forbidden(), None, None]
+
+        self.stack.delete()
+
+        # The user that could not be deleted in advance was deleted by its
+        # resource
+        self.assertEqual((self.stack.DELETE, self.stack.COMPLETE),
+                         self.stack.state)
+        self.assertEqual(4, self.fkc.delete_stack_domain_user.call_count)
+
+    def test_create_failed_delete(self):
+        # The signal handlers are never created, because the resource they
+        # depend on fails
+        tmpl = template_format.parse(test_template_signals)
+        for i in range(1, 4):
+            tmpl['Resources']['signal_handler%d' % i]['DependsOn'] = (
+                'resource_X')
+        self.stack = parser.Stack(utils.dummy_context(), 'test_stack',
+                                  template.Template(tmpl),
+                                  disable_rollback=True)
+        self.stack.store()
+        self.patchobject(generic_resource.GenericResource, 'handle_create',
+                         side_effect=exception.Error('Boom'))
+
+        self.stack.create()
+        self.assertEqual((self.stack.CREATE, self.stack.FAILED),
+                         self.stack.state)
+        self.assertEqual(3, self.fkc.create_stack_domain_user.call_count)
+        for rsrc in self.handlers():
+            self.assertEqual((rsrc.INIT, rsrc.COMPLETE), rsrc.state)
+
+        self.stack.delete()
+
+        # The users created in advance are deleted, even though their
+        # resources never were
+        self.assertEqual((self.stack.DELETE, self.stack.COMPLETE),
+                         self.stack.state)
+        self.fkc.delete_stack_domain_user.assert_has_calls(
+            [mock.call(user_id='1234', project_id='aprojectid')] * 3)
+        self.assertEqual(3, self.fkc.delete_stack_domain_user.call_count)
+
+    def test_create_failed_delete_disabled(self):
+        tmpl = template_format.parse(test_template_signals)
+        tmpl['Resources']['signal_handler1']['DependsOn'] = 'resource_X'
+        self.stack = parser.Stack(utils.dummy_context(), 'test_stack',
+                                  template.Template(tmpl),
+                                  disable_rollback=True)
+        self.stack.store()
+        self.stack._provision_stack_users()
+        self.patchobject(generic_resource.GenericResource, 'handle_create',
+                         side_effect=exception.Error('Boom'))
+        self.stack.create()
+
+        # Even with concurrency disabled by the time of the delete, the user
+        # of the resource that was never created is deleted
+        cfg.CONF.set_override('max_concurrent_stack_users', 0)
+        self.stack.delete()
+
+        self.assertEqual((self.stack.DELETE, self.stack.COMPLETE),
+                         self.stack.state)
+        self.assertEqual(3, self.fkc.delete_stack_domain_user.call_count)
@@ -0,0 +1,65 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import eventlet
+import mock
+
+from heat.common import singleflight
+from heat.tests import common
+
+
+class SingleFlightTest(common.HeatTestCase):
+
+    def test_do_once(self):
+        flights = singleflight.SingleFlight()
+        call = mock.Mock(return_value=None)
+        self.assertIsNone(flights.do('a', call))
+        self.assertIsNone(flights.do('a', call))
+        self.assertEqual(1, call.call_count)
+        flights.do('b', call)
+        self.assertEqual(2, call.call_count)
+
+    def test_do_waits_for_call_in_progress(self):
+        flights = singleflight.SingleFlight()
+        calls = []
+
+        def call():
+            calls.append(None)
+            eventlet.sleep(0)
+            return 'result'
+
+        pool = eventlet.GreenPool()
+        results = list(pool.imap(lambda i: flights.do('a', call), range(3)))
+        self.assertEqual(['result'] * 3, results)
+        self.assertEqual(1, len(calls))
+
+    def test_do_failure_not_remembered(self):
+        flights = singleflight.SingleFlight()
+        call = mock.Mock(side_effect=[KeyError('a'), 'result'])
+        self.assertRaises(KeyError, flights.do, 'a', call)
+        self.assertEqual('result', flights.do('a', call))
+        self.assertEqual('result', flights.do('a', call))
+        self.assertEqual(2, call.call_count)
+
+    def test_do_failure_sent_to_waiters(self):
+        flights = singleflight.SingleFlight()
+
+        def call():
+            eventlet.sleep(0)
+            raise KeyError('a')
+
+        first = eventlet.spawn(flights.do, 'a', call)
+        eventlet.sleep(0)
+        waiter = eventlet.spawn(flights.do, 'a', call)
+        self.assertRaises(KeyError, first.wait)
+        self.assertRaises(KeyError, waiter.wait)
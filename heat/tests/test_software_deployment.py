@@ -12,6 +12,7 @@
 #    under the License.
 
 import copy
+import time
 
 import mock
 import six
@@ -23,6 +24,7 @@ from heat.engine import parser
 from heat.engine.resources.software_config import software_deployment as sd
 from heat.engine import rsrc_defn
 from heat.engine import template
+from heat.engine import wakeup
 from heat.tests import common
 from heat.tests import utils
 
@@ -414,6 +416,44 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         sd['status'] = self.deployment.IN_PROGRESS
         self.assertFalse(self.deployment.check_create_complete(sd))
 
+    def test_check_create_complete_wait_for_signal(self):
+        self._create_stack(self.template)
+        self.mock_software_config()
+        self.mock_derived_software_config()
+        sd = self.mock_deployment()
+        self.rpc_client.update_software_deployment.return_value = sd
+        self.deployment.resource_id = sd['id']
+        self.deployment.handle_update(
+            json_snippet=None, tmpl_diff=None, prop_diff=None)
+        show_sd = self.rpc_client.show_software_deployment
+        show_sd.reset_mock()
+        show_sd.return_value = {'status': 'IN_PROGRESS'}
+
+        # the first check polls, later ones wait to be woken
+        self.assertFalse(self.deployment.check_update_complete(sd))
+        self.assertFalse(self.deployment.check_update_complete(sd))
+        self.assertEqual(1, show_sd.call_count)
+
+        show_sd.return_value = {'status': 'COMPLETE'}
+        self.assertTrue(wakeup.waiters.wake(sd['id']))
+        self.assertTrue(self.deployment.check_update_complete(sd))
+        self.assertEqual(2, show_sd.call_count)
+        self.assertFalse(wakeup.waiters.wake(sd['id']))
+
+    def test_check_create_complete_poll_interval(self):
+        self._create_stack(self.template)
+        sd = self.mock_deployment()
+        self.deployment.resource_id = sd['id']
+        self.deployment._next_poll = 0
+        show_sd = self.rpc_client.show_software_deployment
+        show_sd.return_value = {'status': 'IN_PROGRESS'}
+        self.patchobject(time, 'time', side_effect=[100, 129, 130])
+
+        self.assertFalse(self.deployment.check_create_complete(sd))
+        self.assertFalse(self.deployment.check_create_complete(sd))
+        self.assertFalse(self.deployment.check_create_complete(sd))
+        self.assertEqual(2, show_sd.call_count)
+
     def test_check_create_complete_none(self):
         self._create_stack(self.template)
         self.assertTrue(self.deployment.check_create_complete(sd=None))
@@ -511,6 +551,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         self.assertFalse(self.deployment.check_delete_complete(sd))
 
         sd['status'] = self.deployment.COMPLETE
+        wakeup.waiters.wake(sd['id'])
         self.assertTrue(self.deployment.check_delete_complete(sd))
 
     def test_handle_delete_notfound(self):
@@ -613,6 +654,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         self.assertFalse(self.deployment.check_suspend_complete(sd))
 
         sd['status'] = 'COMPLETE'
+        wakeup.waiters.wake(sd['id'])
         self.assertTrue(self.deployment.check_suspend_complete(sd))
 
         # now, handle the resume
@@ -630,6 +672,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         self.assertFalse(self.deployment.check_resume_complete(sd))
 
         sd['status'] = 'COMPLETE'
+        wakeup.waiters.wake(sd['id'])
         self.assertTrue(self.deployment.check_resume_complete(sd))
 
     def test_handle_signal_ok_zero(self):
@@ -17,10 +17,12 @@ import uuid
 
 import mock
 import mox
+from oslo.config import cfg
 from oslo.utils import timeutils
 import six
 
 from heat.common import context
+from heat.common import crypt
 from heat.common import exception
 from heat.common import template_format
 from heat.db.sqlalchemy import api as db_api
@@ -1364,6 +1366,43 @@ class DBAPIStackTest(common.HeatTestCase):
         self.assertRaises(exception.NotFound, db_api.stack_update, self.ctx,
                           UUID2, values)
 
+    def test_stack_update_state(self):
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        self.assertTrue(db_api.stack_update_state(self.ctx, stack.id,
+                                                  'update', 'failed',
+                                                  'update_failed'))
+        self.ctx.session.expire_all()
+        stack = db_api.stack_get(self.ctx, stack.id)
+        self.assertEqual('update', stack.action)
+        self.assertEqual('failed', stack.status)
+        self.assertEqual('update_failed', stack.status_reason)
+
+        self.assertFalse(db_api.stack_update_state(self.ctx, UUID2,
+                                                   'update', 'failed', ''))
+
+    def test_stack_update_state_expected_state(self):
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        self.assertFalse(db_api.stack_update_state(
+            self.ctx, stack.id, 'update', 'complete', '',
+            expected_state=('update', 'in_progress')))
+        self.assertTrue(db_api.stack_update_state(
+            self.ctx, stack.id, 'update', 'in_progress', '',
+            expected_state=('create', 'complete')))
+        self.assertEqual(('update', 'in_progress'),
+                         (stack.action, stack.status))
+
+    def test_stack_update_state_deleted(self):
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        db_api.stack_delete(self.ctx, stack.id)
+        self.assertFalse(db_api.stack_update_state(self.ctx, stack.id,
+                                                   'update', 'failed', ''))
+
+    def test_stack_update_state_other_tenant(self):
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        self.ctx.tenant_id = UUID1
+        self.assertFalse(db_api.stack_update_state(self.ctx, stack.id,
+                                                   'update', 'failed', ''))
+
     def test_stack_get_returns_a_stack(self):
         stack = create_stack(self.ctx, self.template, self.user_creds)
         ret_stack = db_api.stack_get(self.ctx, stack.id, show_deleted=False)
@@ -1570,6 +1609,46 @@ class DBAPIResourceTest(common.HeatTestCase):
         self.assertEqual('{"foo": "123"}', json.dumps(ret_res.rsrc_metadata))
         self.assertEqual(self.stack.id, ret_res.stack_id)
 
+    def test_resource_create_all(self):
+        values = [{'name': name, 'action': 'INIT', 'status': 'COMPLETE',
+                   'stack_id': self.stack.id}
+                  for name in ('res1', 'res2', 'res3')]
+        resources = db_api.resource_create_all(self.ctx, values)
+        self.assertEqual(['res1', 'res2', 'res3'],
+                         [r.name for r in resources])
+
+        ret_res = db_api.resource_get_all_by_stack(self.ctx, self.stack.id)
+        self.assertEqual(3, len(ret_res))
+        for res in resources:
+            self.assertEqual(res.id, ret_res[res.name].id)
+            self.assertEqual('INIT', ret_res[res.name].action)
+            self.assertEqual('COMPLETE', ret_res[res.name].status)
+
+    def test_resource_update(self):
+        res = create_resource(self.ctx, self.stack)
+        values = {'action': 'update', 'status_reason': 'x' * 300,
+                  'rsrc_metadata': {'bar': '456'}}
+        self.assertTrue(db_api.resource_update(self.ctx, res.id, values))
+        self.ctx.session.expire_all()
+        ret_res = db_api.resource_get(self.ctx, res.id)
+        self.assertEqual('update', ret_res.action)
+        self.assertEqual('complete', ret_res.status)
+        self.assertEqual('x' * 255, ret_res.status_reason)
+        self.assertEqual({'bar': '456'}, ret_res.rsrc_metadata)
+
+        self.assertFalse(db_api.resource_update(self.ctx, UUID2, values))
+
+    def test_resource_update_expected_state(self):
+        res = create_resource(self.ctx, self.stack)
+        self.assertFalse(db_api.resource_update(
+            self.ctx, res.id, {'status': 'failed'},
+            expected_state=('create', 'in_progress')))
+        self.assertEqual('complete', res.status)
+        self.assertTrue(db_api.resource_update(
+            self.ctx, res.id, {'status': 'failed'},
+            expected_state=('create', 'complete')))
+        self.assertEqual('failed', res.status)
+
     def test_resource_get(self):
         res = create_resource(self.ctx, self.stack)
         ret_res = db_api.resource_get(self.ctx, res.id)
@@ -1664,6 +1743,12 @@ class DBAPIStackLockTest(common.HeatTestCase):
         observed = db_api.stack_lock_create(self.stack.id, UUID2)
         self.assertEqual(UUID1, observed)
 
+    def test_stack_lock_get_engine_id(self):
+        self.assertIsNone(db_api.stack_lock_get_engine_id(self.stack.id))
+        db_api.stack_lock_create(self.stack.id, UUID1)
+        self.assertEqual(UUID1,
+                         db_api.stack_lock_get_engine_id(self.stack.id))
+
     def test_stack_lock_steal_success(self):
         db_api.stack_lock_create(self.stack.id, UUID1)
         observed = db_api.stack_lock_steal(self.stack.id, UUID1, UUID2)
@@ -1752,6 +1837,52 @@ class DBAPIResourceDataTest(common.HeatTestCase):
                           self.ctx, self.resource.id, 'test_resource_key')
         self.assertIsNotNone(res_data)
 
+    def _decrypt_count(self):
+        decrypt = self.patchobject(db_api.crypt, 'oslo_decrypt_v1',
+                                   side_effect=crypt.oslo_decrypt_v1)
+        db_api._decrypted_cache.clear()
+        self.addCleanup(db_api._decrypted_cache.clear)
+        self.addCleanup(timeutils.clear_time_override)
+        return decrypt
+
+    def test_resource_data_decrypt_cached(self):
+        create_resource_data(self.ctx, self.resource, redact=True)
+        decrypt = self._decrypt_count()
+
+        timeutils.set_time_override()
+        for i in range(3):
+            vals = db_api.resource_data_get_all(self.resource)
+            self.assertEqual('test_value', vals['test_resource_key'])
+        self.assertEqual('test_value',
+                         db_api.resource_data_get(self.resource,
+                                                  'test_resource_key'))
+        self.assertEqual(1, decrypt.call_count)
+
+        # A changed value is decrypted again
+        create_resource_data(self.ctx, self.resource, value='foo',
+                             redact=True)
+        vals = db_api.resource_data_get_all(self.resource)
+        self.assertEqual('foo', vals['test_resource_key'])
+        self.assertEqual(2, decrypt.call_count)
+
+        # Decrypted values expire
+        timeutils.advance_time_seconds(61)
+        vals = db_api.resource_data_get_all(self.resource)
+        self.assertEqual('foo', vals['test_resource_key'])
+        self.assertEqual(3, decrypt.call_count)
+        self.assertEqual(1, len(db_api._decrypted_cache))
+
+    def test_resource_data_decrypt_cache_disabled(self):
+        cfg.CONF.set_override('decrypted_data_cache_ttl', 0)
+        create_resource_data(self.ctx, self.resource, redact=True)
+        decrypt = self._decrypt_count()
+
+        for i in range(3):
+            vals = db_api.resource_data_get_all(self.resource)
+            self.assertEqual('test_value', vals['test_resource_key'])
+        self.assertEqual(3, decrypt.call_count)
+        self.assertEqual(0, len(db_api._decrypted_cache))
+
 
 class DBAPIEventTest(common.HeatTestCase):
     def setUp(self):
@@ -1924,6 +2055,14 @@ class DBAPIWatchRuleTest(common.HeatTestCase):
         wrs = db_api.watch_rule_get_all_by_stack(self.ctx, self.stack1.id)
         self.assertEqual(2, len(wrs))
 
+    def test_watch_rule_summary(self):
+        self.assertEqual((0, None),
+                         tuple(db_api.watch_rule_summary(self.ctx)))
+        wrs = [create_watch_rule(self.ctx, self.stack, name=name)
+               for name in ('rule1', 'rule2')]
+        self.assertEqual((2, wrs[1].id),
+                         tuple(db_api.watch_rule_summary(self.ctx)))
+
     def test_watch_rule_update(self):
         watch_rule = create_watch_rule(self.ctx, self.stack)
         values = {
@@ -1969,6 +2108,87 @@ class DBAPIWatchDataTest(common.HeatTestCase):
         self.assertEqual('{"foo": "bar"}', json.dumps(ret_data[0].data))
         self.assertEqual(self.watch_rule.id, ret_data[0].watch_rule_id)
 
+    def test_watch_data_create_all(self):
+        values = [{'data': {'foo': 'd%d' % i},
+                   'watch_rule_id': self.watch_rule.id} for i in range(3)]
+        refs = db_api.watch_data_create_all(self.ctx, values)
+        self.assertEqual(3, len(refs))
+        self.assertTrue(all(ref.id is not None for ref in refs))
+
+        data = [wd.data for wd in db_api.watch_data_get_all(self.ctx)]
+        self.assertEqual(sorted(v['data'] for v in values), sorted(data))
+
+    def test_watch_data_get_raw_before(self):
+        now = timeutils.utcnow()
+        old = [create_watch_data(self.ctx, self.watch_rule,
+                                 created_at=now - datetime.timedelta(
+                                     minutes=m)) for m in (3, 5, 4)]
+        create_watch_data(self.ctx, self.watch_rule, created_at=now)
+        create_watch_data(self.ctx, self.watch_rule, period=60,
+                          created_at=now - datetime.timedelta(minutes=10))
+        before = now - datetime.timedelta(minutes=1)
+
+        wds = db_api.watch_data_get_raw_before(self.ctx, self.watch_rule.id,
+                                               before, 10)
+        self.assertEqual([old[1].id, old[2].id, old[0].id],
+                         [wd.id for wd in wds])
+        wds = db_api.watch_data_get_raw_before(self.ctx, self.watch_rule.id,
+                                               before, 2)
+        self.assertEqual([old[1].id, old[2].id], [wd.id for wd in wds])
+
+    def test_watch_data_get_rollups(self):
+        minute = datetime.datetime(2015, 1, 1, 12, 0, 0)
+        earlier = minute - datetime.timedelta(minutes=1)
+        rollup = create_watch_data(self.ctx, self.watch_rule, period=60,
+                                   created_at=minute)
+        create_watch_data(self.ctx, self.watch_rule, period=60,
+                          created_at=earlier)
+        create_watch_data(self.ctx, self.watch_rule, created_at=minute)
+
+        wds = db_api.watch_data_get_rollups(self.ctx, self.watch_rule.id,
+                                            [minute])
+        self.assertEqual([rollup.id], [wd.id for wd in wds])
+
+    def test_watch_data_rollup(self):
+        wds = [create_watch_data(self.ctx, self.watch_rule)
+               for i in range(3)]
+        values = {'data': {'foo': 'rolled'}, 'period': 60,
+                  'watch_rule_id': self.watch_rule.id}
+        self.assertTrue(db_api.watch_data_rollup(
+            self.ctx, [wds[0].id, wds[1].id], [values]))
+
+        data = db_api.watch_data_get_all(self.ctx)
+        self.assertEqual([wds[2].id],
+                         [wd.id for wd in data if wd.period is None])
+        self.assertEqual([{'foo': 'rolled'}],
+                         [wd.data for wd in data if wd.period == 60])
+
+    def test_watch_data_rollup_conflict(self):
+        wd = create_watch_data(self.ctx, self.watch_rule)
+        values = {'data': {'foo': 'rolled'}, 'period': 60,
+                  'watch_rule_id': self.watch_rule.id}
+        self.assertFalse(db_api.watch_data_rollup(
+            self.ctx, [wd.id, wd.id + 1], [values]))
+        self.assertEqual([wd.id],
+                         [d.id for d in db_api.watch_data_get_all(self.ctx)])
+
+    def test_watch_data_delete_before(self):
+        now = timeutils.utcnow()
+        for m in (10, 11, 12):
+            create_watch_data(self.ctx, self.watch_rule,
+                              created_at=now - datetime.timedelta(minutes=m))
+        recent = create_watch_data(self.ctx, self.watch_rule, created_at=now)
+        before = now - datetime.timedelta(minutes=5)
+
+        self.assertEqual(2, db_api.watch_data_delete_before(self.ctx,
+                                                            before, 2))
+        self.assertEqual(1, db_api.watch_data_delete_before(self.ctx,
+                                                            before, 2))
+        self.assertEqual(0, db_api.watch_data_delete_before(self.ctx,
+                                                            before, 2))
+        self.assertEqual([recent.id],
+                         [d.id for d in db_api.watch_data_get_all(self.ctx)])
+
     def test_watch_data_get_all(self):
         values = [
             {'data': json.loads('{"foo": "d1"}')},
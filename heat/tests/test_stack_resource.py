@@ -447,6 +447,18 @@ class StackResourceTest(common.HeatTestCase):
             self.parent_resource.update_with_template,
             template, {'WebServer': 'foo'})
 
+    def test_update_with_template_skip_validation(self):
+        create_result = self.parent_resource.create_with_template(
+            self.simple_template, {})
+        while not create_result.step():
+            pass
+
+        validate = self.patchobject(parser.Stack, 'validate')
+        updater = self.parent_resource.update_with_template(
+            self.simple_template, {}, validate=False)
+        updater.run_to_completion()
+        self.assertFalse(validate.called)
+
     def test_load_nested_ok(self):
         self.parent_resource.create_with_template(self.templ,
                                                   {"KeyName": "key"})
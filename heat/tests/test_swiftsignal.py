@@ -28,6 +28,7 @@ from heat.common import template_format
 from heat.engine.clients.os import swift
 from heat.engine import environment
 from heat.engine import resource
+from heat.engine.resources import swiftsignal
 from heat.engine import rsrc_defn
 from heat.engine import scheduler
 from heat.engine import stack
@@ -101,15 +102,16 @@ def create_stack(template, stack_id=None):
     return st
 
 
-def cont_index(obj_name, num_version_hist):
+def cont_index(obj_name, num_version_hist, hash_prefix='9214'):
     objects = [{'bytes': 11,
                 'last_modified': '2014-07-03T19:42:03.281640',
-                'hash': '9214b4e4460fcdb9f3a369941400e71e',
-                'name': "02b" + obj_name + '/1404416326.51383',
-                'content_type': 'application/octet-stream'}] * num_version_hist
+                'hash': '%sb4e4460fcdb9f3a369941400e71%d' % (hash_prefix, i),
+                'name': "02b" + obj_name + '/1404416326.5138%d' % i,
+                'content_type': 'application/octet-stream'}
+               for i in range(num_version_hist)]
     objects.append({'bytes': 8,
                     'last_modified': '2014-07-03T19:42:03.849870',
-                    'hash': '9ab7c0738852d7dd6a2dc0b261edc300',
+                    'hash': '%sc0738852d7dd6a2dc0b261edc300' % hash_prefix,
                     'name': obj_name,
                     'content_type': 'application/x-www-form-urlencoded'})
     return (container_header, objects)
@@ -349,7 +351,11 @@ class SwiftSignalTest(common.HeatTestCase):
         }
         obj_name = "%s-%s-abcdefghijkl" % (st.name, handle.name)
         mock_name.return_value = obj_name
-        mock_swift_object.get_container.return_value = cont_index(obj_name, 2)
+        mock_swift_object.get_container.side_effect = (
+            cont_index(obj_name, 2),
+            # The objects have been replaced by new signals
+            cont_index(obj_name, 2, hash_prefix='9ab7'),
+        )
         mock_swift_object.get_object.side_effect = (
             (obj_header, json.dumps({'id': 1})),
             (obj_header, json.dumps({'id': 1})),
@@ -853,3 +859,78 @@ class SwiftSignalTest(common.HeatTestCase):
         self.assertEqual(('CREATE', 'COMPLETE'), st.state)
         wc = st['test_wait_condition']
         self.assertEqual("null", wc.FnGetAtt('data'))
+
+
+class ContainerWatcherTest(common.HeatTestCase):
+    def setUp(self):
+        super(ContainerWatcherTest, self).setUp()
+        self.client = mock.Mock()
+        self.client_plugin = swift.SwiftClientPlugin(
+            utils.dummy_context())
+        self.watcher = swiftsignal.ContainerWatcher('a-container')
+
+    def _read(self, reader):
+        return self.watcher.read(reader, self.client, self.client_plugin)
+
+    def test_get_shared(self):
+        watcher = swiftsignal.ContainerWatcher.get('a-container')
+        self.assertIs(watcher,
+                      swiftsignal.ContainerWatcher.get('a-container'))
+        self.assertIsNot(watcher,
+                         swiftsignal.ContainerWatcher.get('b-container'))
+
+    def test_read_shared_listing(self):
+        self.client.get_container.return_value = cont_index('sig', 1)
+        self.client.get_object.side_effect = [(obj_header, 'one'),
+                                              (obj_header, 'two')]
+        expected = [('02bsig/1404416326.51380', 'one'), ('sig', 'two')]
+
+        self.assertEqual(expected, self._read('a'))
+        self.assertEqual(expected, self._read('b'))
+        self.assertEqual(1, self.client.get_container.call_count)
+
+        # the listing is refreshed when a reader reads again
+        self.assertEqual(expected, self._read('a'))
+        self.assertEqual(2, self.client.get_container.call_count)
+        self.assertEqual(2, self.client.get_object.call_count)
+
+    def test_read_changed_objects(self):
+        changed = cont_index('sig', 1)
+        changed[1][1] = dict(changed[1][1], hash='changed')
+        self.client.get_container.side_effect = [cont_index('sig', 1),
+                                                 changed]
+        self.client.get_object.side_effect = [(obj_header, 'one'),
+                                              (obj_header, 'two'),
+                                              (obj_header, 'three')]
+
+        self._read('a')
+        self.assertEqual([('02bsig/1404416326.51380', 'one'),
+                          ('sig', 'three')],
+                         self._read('a'))
+        self.client.get_object.assert_called_with('a-container', 'sig')
+        self.assertEqual(3, self.client.get_object.call_count)
+
+    def test_read_container_not_found(self):
+        self.client.get_container.side_effect = (
+            swiftclient_client.ClientException('Container GET failed',
+                                               http_status=404))
+        self.assertIsNone(self._read('a'))
+
+    def test_read_object_not_found(self):
+        self.client.get_container.return_value = cont_index('sig', 1)
+        self.client.get_object.side_effect = [
+            swiftclient_client.ClientException('Object GET failed',
+                                               http_status=404),
+            (obj_header, 'two')]
+
+        self.assertEqual([('sig', 'two')], self._read('a'))
+
+    def test_read_error(self):
+        self.client.get_container.side_effect = (
+            swiftclient_client.ClientException('Container GET failed',
+                                               http_status=500))
+        self.assertRaises(swiftclient_client.ClientException,
+                          self._read, 'a')
+        self.client.get_container.side_effect = None
+        self.client.get_container.return_value = (container_header, [])
+        self.assertIsNone(self._read('a'))
@@ -11,6 +11,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+
 import fixtures
 from oslotest import mockpatch
 import six
@@ -18,9 +20,15 @@ from stevedore import extension
 
 from heat.common import exception
 from heat.common import template_format
+from heat.engine import environment
 from heat.engine import function
+from heat.engine.hot import functions as hot_funcs
+from heat.engine import parser
+from heat.engine import resource
 from heat.engine import template
 from heat.tests import common
+from heat.tests import generic_resource as generic_rsrc
+from heat.tests import utils
 
 
 class TemplatePluginFixture(fixtures.Fixture):
@@ -240,3 +248,124 @@ Outputs:
         err = self.assertRaises(exception.InvalidTemplateSection,
                                 tmpl.validate)
         self.assertIn('parameteers', six.text_type(err))
+
+
+class TestTemplateCompile(common.HeatTestCase):
+
+    hot_tmpl = template_format.parse('''
+    heat_template_version: 2013-05-23
+    parameters:
+      foo:
+        type: string
+    resources:
+      res:
+        type: ResourceWithPropsType
+        properties:
+          Foo:
+            str_replace:
+              template: x_foo
+              params: {foo: {get_param: foo}}
+    outputs:
+      stack_id:
+        value: {get_param: OS::stack_id}
+      res_id:
+        value: {get_resource: res}
+    ''')
+
+    def setUp(self):
+        super(TestTemplateCompile, self).setUp()
+        self.ctx = utils.dummy_context()
+        resource._register_class('ResourceWithPropsType',
+                                 generic_rsrc.ResourceWithProps)
+        self.useFixture(mockpatch.PatchObject(template, '_compiled',
+                                              collections.OrderedDict()))
+
+    def _stack(self, tmpl, foo='bar'):
+        env = environment.Environment({'foo': foo})
+        return parser.Stack(self.ctx, 'test_stack', tmpl, env=env)
+
+    def test_static_functions_folded(self):
+        stack = self._stack(template.Template(self.hot_tmpl))
+        outputs = stack.t[stack.t.OUTPUTS]
+
+        props = stack['res'].t._properties
+        self.assertIsInstance(props['Foo'], function.Constant)
+        self.assertEqual('x_bar', function.resolve(props['Foo']))
+        self.assertNotIsInstance(
+            stack.resolve_static_data(outputs['stack_id']['Value']),
+            function.Constant)
+        self.assertNotIsInstance(
+            stack.resolve_static_data(outputs['res_id']['Value']),
+            function.Constant)
+
+    def test_compiled_cache(self):
+        tmpl = template.Template(self.hot_tmpl)
+        tmpl.store(self.ctx)
+
+        stack = self._stack(tmpl)
+        self.assertEqual('x_bar', stack['res'].properties['Foo'])
+
+        mock_result = self.patchobject(hot_funcs.Replace, 'result')
+        stack = self._stack(template.Template.load(self.ctx, tmpl.id))
+        self.assertEqual('x_bar', stack['res'].properties['Foo'])
+        self.assertFalse(mock_result.called)
+
+    def test_compiled_cache_static_only(self):
+        tmpl = template.Template(self.hot_tmpl)
+        tmpl.store(self.ctx)
+        stack = self._stack(tmpl)
+
+        dumps = self.patchobject(template.jsonutils, 'dumps',
+                                 side_effect=template.jsonutils.dumps)
+        tmpl.parse(stack, {'get_resource': 'res'})
+        tmpl.parse(stack, {'get_param': 'OS::stack_id'})
+        self.assertFalse(dumps.called)
+
+        tmpl.parse(stack, {'get_param': 'foo'})
+        self.assertEqual(1, dumps.call_count)
+
+    def test_compiled_cache_parameters(self):
+        tmpl = template.Template(self.hot_tmpl)
+        tmpl.store(self.ctx)
+
+        stack = self._stack(tmpl)
+        self.assertEqual('x_bar', stack['res'].properties['Foo'])
+
+        stack = self._stack(template.Template.load(self.ctx, tmpl.id),
+                            foo='baz')
+        self.assertEqual('x_baz', stack['res'].properties['Foo'])
+
+    def test_compiled_cache_template_updated(self):
+        tmpl_data = template_format.parse('''
+        heat_template_version: 2013-05-23
+        resources:
+          res:
+            type: ResourceWithPropsType
+            properties:
+              Foo: {get_file: foo.txt}
+        ''')
+        tmpl = template.Template(tmpl_data, files={'foo.txt': 'one'})
+        tmpl.store(self.ctx)
+        self.assertEqual('one', self._stack(tmpl)['res'].properties['Foo'])
+
+        # the stored template is updated through another Template object,
+        # as it would be by another engine
+        other = template.Template.load(self.ctx, tmpl.id)
+        other.files = {'foo.txt': 'two'}
+        other.store(self.ctx)
+        stack = self._stack(template.Template.load(self.ctx, tmpl.id))
+        self.assertEqual('two', stack['res'].properties['Foo'])
+
+        tmpl.files = {'foo.txt': 'three'}
+        self.assertEqual('three', self._stack(tmpl)['res'].properties['Foo'])
+
+    def test_compiled_cache_results_copied(self):
+        tmpl = template.Template(self.hot_tmpl)
+        tmpl.store(self.ctx)
+        stack = self._stack(tmpl)
+        snippet = {'Fn::Split': [',', 'a,b']}
+
+        first = function.resolve(tmpl.parse(stack, snippet))
+        first.append('c')
+        self.assertEqual(['a', 'b'], function.resolve(tmpl.parse(stack,
+                                                                 snippet)))
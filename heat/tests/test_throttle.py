@@ -0,0 +1,138 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo.config import cfg
+
+from heat.common import template_format
+from heat.engine import resource
+from heat.engine import throttle
+from heat.tests import common
+from heat.tests import generic_resource
+from heat.tests import utils
+
+
+class CreateThrottleTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(CreateThrottleTest, self).setUp()
+        self.throttle = throttle.CreateThrottle()
+
+    def test_unlimited(self):
+        for i in range(100):
+            self.assertTrue(self.throttle.acquire('stack', 'OS::Nova::Server'))
+
+    def test_engine_limit(self):
+        cfg.CONF.set_override('max_concurrent_creates', 2)
+        self.assertTrue(self.throttle.acquire('stack1', 'OS::Nova::Server'))
+        self.assertTrue(self.throttle.acquire('stack2', 'OS::Cinder::Volume'))
+        self.assertFalse(self.throttle.acquire('stack3', 'OS::Nova::Server'))
+
+        self.throttle.release('stack1', 'OS::Nova::Server')
+        self.assertTrue(self.throttle.acquire('stack3', 'OS::Nova::Server'))
+
+    def test_stack_limit(self):
+        cfg.CONF.set_override('max_concurrent_creates_per_stack', 1)
+        self.assertTrue(self.throttle.acquire('stack1', 'OS::Nova::Server'))
+        self.assertFalse(self.throttle.acquire('stack1', 'OS::Nova::Server'))
+        self.assertTrue(self.throttle.acquire('stack2', 'OS::Nova::Server'))
+
+        self.throttle.release('stack1', 'OS::Nova::Server')
+        self.assertTrue(self.throttle.acquire('stack1', 'OS::Nova::Server'))
+
+    def test_type_limit(self):
+        cfg.CONF.set_override('max_concurrent_creates_by_type',
+                              ['OS::Nova::Server=1', 'bogus'])
+        self.assertTrue(self.throttle.acquire('stack1', 'OS::Nova::Server'))
+        self.assertFalse(self.throttle.acquire('stack2', 'OS::Nova::Server'))
+        self.assertTrue(self.throttle.acquire('stack1', 'OS::Cinder::Volume'))
+
+        self.throttle.release('stack1', 'OS::Nova::Server')
+        self.assertTrue(self.throttle.acquire('stack2', 'OS::Nova::Server'))
+
+    def test_type_limit_parsed_once(self):
+        cfg.CONF.set_override('max_concurrent_creates_by_type',
+                              ['OS::Nova::Server=1', 'bogus'])
+        warn = self.patchobject(throttle.LOG, 'warn')
+        self.assertTrue(self.throttle.acquire('stack1', 'OS::Nova::Server'))
+        for i in range(3):
+            self.assertFalse(self.throttle.acquire('stack2',
+                                                   'OS::Nova::Server'))
+        self.assertEqual(1, warn.call_count)
+
+        cfg.CONF.set_override('max_concurrent_creates_by_type',
+                              ['OS::Nova::Server=2'])
+        self.assertTrue(self.throttle.acquire('stack2', 'OS::Nova::Server'))
+
+    def test_over_limit(self):
+        for i in range(8):
+            self.assertTrue(self.throttle.acquire('stack', 'OS::Nova::Server'))
+
+        # halve the number in progress, then raise the limit again by one
+        # with each success
+        self.throttle.over_limit('OS::Nova::Server')
+        self.assertEqual(4, self.throttle._type_limit('OS::Nova::Server'))
+        self.throttle.succeeded('OS::Nova::Server')
+        self.assertEqual(5, self.throttle._type_limit('OS::Nova::Server'))
+
+        for i in range(4):
+            self.throttle.release('stack', 'OS::Nova::Server')
+        self.assertTrue(self.throttle.acquire('stack', 'OS::Nova::Server'))
+        self.assertFalse(self.throttle.acquire('stack', 'OS::Nova::Server'))
+
+    def test_over_limit_recovers_configured_limit(self):
+        cfg.CONF.set_override('max_concurrent_creates_by_type',
+                              ['OS::Nova::Server=4'])
+        self.throttle.over_limit('OS::Nova::Server')
+        self.assertEqual(2, self.throttle._type_limit('OS::Nova::Server'))
+        self.throttle.over_limit('OS::Nova::Server')
+        self.assertEqual(1, self.throttle._type_limit('OS::Nova::Server'))
+        self.throttle.over_limit('OS::Nova::Server')
+        self.assertEqual(1, self.throttle._type_limit('OS::Nova::Server'))
+
+        for i in range(3):
+            self.throttle.succeeded('OS::Nova::Server')
+        self.assertEqual(4, self.throttle._type_limit('OS::Nova::Server'))
+        self.throttle.succeeded('OS::Nova::Server')
+        self.assertEqual(4, self.throttle._type_limit('OS::Nova::Server'))
+
+
+class ThrottledStackTest(common.HeatTestCase):
+
+    tmpl = '''
+heat_template_version: 2013-05-23
+resources:
+  group:
+    type: OS::Heat::ResourceGroup
+    properties:
+      count: 3
+      resource_def:
+        type: ResourceWithProps
+        properties:
+          Foo: bar
+'''
+
+    def setUp(self):
+        super(ThrottledStackTest, self).setUp()
+        resource._register_class('ResourceWithProps',
+                                 generic_resource.ResourceWithProps)
+
+    def test_nested_stack_create(self):
+        # the group must not hold the only slot while its members are
+        # being created
+        cfg.CONF.set_override('max_concurrent_creates', 1)
+        stack = utils.parse_stack(template_format.parse(self.tmpl))
+        stack.timeout_mins = 1
+        stack.create()
+
+        self.assertEqual((stack.CREATE, stack.COMPLETE), stack.state)
+        self.assertEqual(3, len(stack['group'].nested()))
@@ -11,6 +11,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
+
+import fixtures
 from oslo.config import cfg
 import requests
 from requests import exceptions
@@ -21,8 +24,10 @@ from heat.tests import common
 
 
 class Response(object):
-    def __init__(self, buf=''):
+    def __init__(self, buf='', status_code=200, headers=None):
         self.buf = buf
+        self.status_code = status_code
+        self.headers = headers or {}
 
     def iter_content(self, chunk_size=1):
         while self.buf:
@@ -130,3 +135,73 @@ class UrlFetchTest(common.HeatTestCase):
                                       urlfetch.get, url)
         self.assertIn("Template exceeds", six.text_type(exception))
         self.m.VerifyAll()
+
+
+class UrlFetchCacheTest(common.HeatTestCase):
+    url = 'http://example.com/template'
+    data = '{ "foo": "bar" }'
+
+    def setUp(self):
+        super(UrlFetchCacheTest, self).setUp()
+        self.m.StubOutWithMock(requests, 'get')
+        self.cache_dir = self.useFixture(fixtures.TempDir()).path
+        cfg.CONF.set_override('template_cache_dir', self.cache_dir)
+        cfg.CONF.set_override('template_cache_ttl', 60)
+        self.now = 1000.0
+        self.patchobject(time, 'time', side_effect=lambda: self.now)
+
+    def test_fetch_once_within_ttl(self):
+        response = Response(self.data, headers={'ETag': '"abc"'})
+        requests.get(self.url, stream=True).AndReturn(response)
+        self.m.ReplayAll()
+
+        self.assertEqual(self.data, urlfetch.get(self.url))
+        self.now += 59
+        self.assertEqual(self.data, urlfetch.get(self.url))
+        self.m.VerifyAll()
+
+    def test_revalidate_not_modified(self):
+        headers = {'ETag': '"abc"',
+                   'Last-Modified': 'Wed, 01 Jan 2014 00:00:00 GMT'}
+        requests.get(self.url, stream=True).AndReturn(
+            Response(self.data, headers=headers))
+        requests.get(self.url, stream=True,
+                     headers={'If-None-Match': '"abc"',
+                              'If-Modified-Since':
+                              'Wed, 01 Jan 2014 00:00:00 GMT'}
+                     ).AndReturn(Response(status_code=304))
+        self.m.ReplayAll()
+
+        self.assertEqual(self.data, urlfetch.get(self.url))
+        self.now += 61
+        self.assertEqual(self.data, urlfetch.get(self.url))
+        # The revalidation restarts the TTL
+        self.now += 59
+        self.assertEqual(self.data, urlfetch.get(self.url))
+        self.m.VerifyAll()
+
+    def test_revalidate_modified(self):
+        new_data = '{ "foo": "baz" }'
+        requests.get(self.url, stream=True).AndReturn(
+            Response(self.data, headers={'ETag': '"abc"'}))
+        requests.get(self.url, stream=True,
+                     headers={'If-None-Match': '"abc"'}
+                     ).AndReturn(Response(new_data,
+                                          headers={'ETag': '"def"'}))
+        self.m.ReplayAll()
+
+        self.assertEqual(self.data, urlfetch.get(self.url))
+        self.now += 61
+        self.assertEqual(new_data, urlfetch.get(self.url))
+        self.assertEqual(new_data, urlfetch.get(self.url))
+        self.m.VerifyAll()
+
+    def test_too_large_not_cached(self):
+        cfg.CONF.set_override('max_template_size', 5)
+        requests.get(self.url, stream=True).AndReturn(Response(self.data))
+        requests.get(self.url, stream=True).AndReturn(Response(self.data))
+        self.m.ReplayAll()
+
+        self.assertRaises(urlfetch.URLFetchError, urlfetch.get, self.url)
+        self.assertRaises(urlfetch.URLFetchError, urlfetch.get, self.url)
+        self.m.VerifyAll()
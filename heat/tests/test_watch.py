@@ -14,7 +14,9 @@
 
 import datetime
 
+import mock
 import mox
+from oslo.config import cfg
 from oslo.utils import timeutils
 
 from heat.common import exception
@@ -786,6 +788,196 @@ class WatchRuleTest(common.HeatTestCase):
                                            u'group_x'}]}}
         self.assertFalse(watchrule.rule_can_use_sample(self.wr, data))
 
+    def _store_metric_rule(self, name, group=None, **kwargs):
+        rule = {u'EvaluationPeriods': u'1',
+                u'Period': u'300',
+                u'ComparisonOperator': u'GreaterThanThreshold',
+                u'Statistic': u'SampleCount',
+                u'Threshold': u'2',
+                u'MetricName': u'CreateDataMetric'}
+        if group is not None:
+            rule[u'Dimensions'] = [{u'Name': u'AutoScalingGroupName',
+                                    u'Value': group}]
+        wr = watchrule.WatchRule(context=self.ctx, watch_name=name,
+                                 stack_id=self.stack_id, rule=rule, **kwargs)
+        wr.store()
+        return wr
+
+    def _group_sample(self, group):
+        return {u'Namespace': u'system/linux',
+                u'CreateDataMetric': {
+                    u'Unit': u'Counter',
+                    u'Value': u'1',
+                    u'Dimensions': [{u'AutoScalingGroupName': group}]}}
+
+    def test_create_watch_data_indexed(self):
+        wr_x = self._store_metric_rule('rule_x', 'group_x')
+        wr_any = self._store_metric_rule('rule_any')
+        self._store_metric_rule('rule_y', 'group_y')
+        self._store_metric_rule('rule_suspended', 'group_x',
+                                state=watchrule.WatchRule.SUSPENDED)
+
+        self.patchobject(db_api, 'watch_rule_get',
+                         side_effect=db_api.watch_rule_get)
+        create_all = self.patchobject(db_api, 'watch_data_create_all')
+        data = self._group_sample(u'group_x')
+        self.assertEqual(2, watchrule.create_watch_data(self.ctx, data))
+
+        # only the rules filed under the sample's metric and dimensions
+        # are read, and their data is stored in a single batch
+        self.assertEqual(3, db_api.watch_rule_get.call_count)
+        create_all.assert_called_once_with(self.ctx, mock.ANY)
+        values = create_all.call_args[0][1]
+        self.assertEqual(set([wr_x.id, wr_any.id]),
+                         set(v['watch_rule_id'] for v in values))
+        self.assertEqual([data, data], [v['data'] for v in values])
+
+    def test_create_watch_data_no_match(self):
+        self._store_metric_rule('rule_y', 'group_y')
+        data = self._group_sample(u'group_x')
+        self.assertEqual(0, watchrule.create_watch_data(self.ctx, data))
+        self.assertEqual([], db_api.watch_data_get_all(self.ctx))
+
+    def test_create_watch_data_index_reused(self):
+        self._store_metric_rule('rule_x', 'group_x')
+        get_all = self.patchobject(db_api, 'watch_rule_get_all',
+                                   side_effect=db_api.watch_rule_get_all)
+        data = self._group_sample(u'group_x')
+        self.assertEqual(1, watchrule.create_watch_data(self.ctx, data))
+        self.assertEqual(1, watchrule.create_watch_data(self.ctx, data))
+        self.assertEqual(1, get_all.call_count)
+        self.assertEqual(2, len(db_api.watch_data_get_all(self.ctx)))
+
+    def test_create_watch_data_index_refreshed(self):
+        wr_x = self._store_metric_rule('rule_x', 'group_x')
+        data = self._group_sample(u'group_x')
+        self.assertEqual(1, watchrule.create_watch_data(self.ctx, data))
+
+        # a rule created by another engine is noticed through the database
+        db_api.watch_rule_create(self.ctx, {
+            'name': 'rule_x2', 'rule': wr_x.rule,
+            'state': watchrule.WatchRule.NODATA, 'stack_id': self.stack_id})
+        self.assertEqual(2, watchrule.create_watch_data(self.ctx, data))
+
+        # changing the dimensions of a rule moves it in the index
+        wr_x.rule[u'Dimensions'][0][u'Value'] = u'group_y'
+        wr_x.store()
+        self.assertEqual(1, watchrule.create_watch_data(self.ctx, data))
+        self.assertEqual(1, watchrule.create_watch_data(
+            self.ctx, self._group_sample(u'group_y')))
+
+        wr_x.destroy()
+        self.assertEqual(0, watchrule.create_watch_data(
+            self.ctx, self._group_sample(u'group_y')))
+
+    def _prune_setup(self):
+        self.now = datetime.datetime(2015, 1, 1, 12, 0, 0)
+        timeutils.set_time_override(self.now)
+        self.addCleanup(timeutils.clear_time_override)
+        rule = {u'EvaluationPeriods': u'2',
+                u'Period': u'60',
+                u'ComparisonOperator': u'GreaterThanThreshold',
+                u'Statistic': u'Average',
+                u'Threshold': u'2',
+                u'MetricName': u'CPU'}
+        self.wr = watchrule.WatchRule(context=self.ctx, watch_name='prune',
+                                      stack_id=self.stack_id, rule=rule)
+        self.wr.store()
+
+    def _store_sample(self, seconds_ago, value, instance='i1'):
+        data = {u'Namespace': u'system/linux',
+                u'CPU': {u'Unit': u'Percent', u'Value': value,
+                         u'Dimensions': [{u'AutoScalingGroupName': u'g',
+                                          u'InstanceId': instance}]}}
+        created_at = self.now - datetime.timedelta(seconds=seconds_ago)
+        return db_api.watch_data_create(self.ctx, {
+            'data': data, 'watch_rule_id': self.wr.id,
+            'created_at': created_at})
+
+    def _aggregates(self):
+        wds = [wd for wd in db_api.watch_data_get_all(self.ctx)
+               if wd.period is not None]
+        return sorted((wd.created_at, wd.data[u'CPU']) for wd in wds)
+
+    def test_prune_watch_data_rollup(self):
+        self._prune_setup()
+        self._store_sample(1195, u'1')
+        self._store_sample(1190, u'2', instance='i2')
+        self._store_sample(1150, u'6')
+        self._store_sample(900, u'4')
+        self._store_sample(890, u'bad')
+        recent = self._store_sample(400, u'8')
+
+        watchrule.prune_watch_data(self.ctx)
+
+        raw = [wd.id for wd in db_api.watch_data_get_all(self.ctx)
+               if wd.period is None]
+        self.assertEqual([recent.id], raw)
+        minute = datetime.timedelta(minutes=1)
+        dims = [{u'AutoScalingGroupName': u'g'}]
+        self.assertEqual(
+            [(self.now - 20 * minute,
+              {'Unit': u'Percent', 'Value': 3.0, 'Dimensions': dims,
+               'SampleCount': 3, 'Sum': 9.0, 'Minimum': 1.0, 'Maximum': 6.0}),
+             (self.now - 15 * minute,
+              {'Unit': u'Percent', 'Value': 4.0,
+               'Dimensions': [dict(dims[0], InstanceId=u'i1')],
+               'SampleCount': 1, 'Sum': 4.0, 'Minimum': 4.0,
+               'Maximum': 4.0})],
+            self._aggregates())
+
+        # the aggregates are not rolled up again
+        watchrule.prune_watch_data(self.ctx)
+        self.assertEqual(3, len(db_api.watch_data_get_all(self.ctx)))
+
+    def test_prune_watch_data_batches(self):
+        self.patchobject(watchrule, 'PRUNE_BATCH_SIZE', new=2)
+        self._prune_setup()
+        self._store_sample(1200, u'1')
+        self._store_sample(1140, u'2')
+        self._store_sample(1130, u'4')
+        self._store_sample(1080, u'3')
+
+        watchrule.prune_watch_data(self.ctx)
+
+        self.assertEqual([1, 2, 1],
+                         [d['SampleCount'] for t, d in self._aggregates()])
+        self.assertEqual(3, len(db_api.watch_data_get_all(self.ctx)))
+
+    def test_prune_watch_data_batches_same_minute(self):
+        self.patchobject(watchrule, 'PRUNE_BATCH_SIZE', new=2)
+        self._prune_setup()
+        self._store_sample(1200, u'1')
+        self._store_sample(1199, u'2')
+        self._store_sample(1198, u'6')
+        self._store_sample(1197, u'3')
+        self._store_sample(1196, u'bad')
+
+        watchrule.prune_watch_data(self.ctx)
+
+        self.assertEqual(
+            [(self.now - datetime.timedelta(minutes=20),
+              {'Unit': u'Percent', 'Value': 3.0,
+               'Dimensions': [{u'AutoScalingGroupName': u'g',
+                               u'InstanceId': u'i1'}],
+               'SampleCount': 4, 'Sum': 12.0, 'Minimum': 1.0,
+               'Maximum': 6.0})],
+            self._aggregates())
+        self.assertEqual(1, len(db_api.watch_data_get_all(self.ctx)))
+
+    def test_prune_watch_data_max_age(self):
+        self._prune_setup()
+        self._store_sample(8 * 24 * 3600, u'1')
+        self._store_sample(6 * 24 * 3600, u'2')
+
+        cfg.CONF.set_override('watch_data_max_age', 0)
+        watchrule.prune_watch_data(self.ctx)
+        self.assertEqual(2, len(self._aggregates()))
+
+        cfg.CONF.set_override('watch_data_max_age', 7)
+        watchrule.prune_watch_data(self.ctx)
+        self.assertEqual([2.0], [d['Sum'] for t, d in self._aggregates()])
+
     def test_destroy(self):
         rule = {'EvaluationPeriods': '1',
                 'MetricName': 'test_metric',